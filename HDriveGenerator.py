@@ -8,9 +8,20 @@ import adsk.core
 import adsk.fusion
 import adsk.cam
 import traceback
+import hashlib
+import itertools
+import json
 import math
+import queue
 import sys
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from functools import lru_cache
+
+import numpy as np
 
 # Agregar el directorio actual al path para importar nuestros módulos
 current_dir = os.path.dirname(os.path.realpath(__file__))
@@ -18,19 +29,191 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 # Importar nuestra biblioteca
-from core.calculations import HarmonicDriveParams, HarmonicDriveCalculator
-from geometry.involute_profile import HarmonicDriveInvoluteProfile
+from core.batch import ERROR_BITS, validate_bulk
+from core.calculations import (
+    MATERIALS, STANDARD_MODULES, HarmonicDriveParams, get_calculator
+)
+from geometry.dxf_export import write_dxf
+from geometry.involute_profile import get_profile_generator
+from geometry.lod import LOD_TARGETS, get_tooth_lod
+from geometry.spline_fit import FLANK_FIT_TOLERANCE, ellipse_nurbs
+from fusion_lib.fusion_utils import FusionWrapper, appearance_cache
 
 # Variables globales
 _app = None
 _ui = None
 _handlers = []
+_job = None
+_custom_event = None
 
 # Constantes
 COMMAND_ID = 'HDriveGeneratorCmd'
 COMMAND_NAME = '⚙️ Harmonic Drive Generator'
 COMMAND_DESCRIPTION = 'Genera un Harmonic Drive con perfil involuta real'
 
+# Comando de generación por lotes (catálogo de variantes)
+BATCH_COMMAND_ID = 'HDriveBatchCmd'
+BATCH_COMMAND_NAME = '🗂️ Harmonic Drive por Lotes'
+BATCH_COMMAND_DESCRIPTION = 'Genera varias variantes de Harmonic Drive en una sola corrida'
+
+# Distribución de las variantes: 'grid' las ordena en cuadrícula en el diseño
+# activo, 'documents' crea un documento por variante
+BATCH_LAYOUTS = ('grid', 'documents')
+
+# Ángulos de presión que ofrece el comando por lotes
+BATCH_PRESSURE_ANGLES = (20.0, 25.0, 30.0)
+
+# Separación (mm) entre variantes de la cuadrícula, además del mayor diámetro
+BATCH_GRID_GAP = 20.0
+
+# Separación (mm) entre una copia nueva y los HD que ya están en el diseño
+DRIVE_GAP = 20.0
+
+# Errores de validación que no impiden generar una variante (se informan)
+BATCH_SOFT_ERRORS = ERROR_BITS['strain'] | ERROR_BITS['contact_ratio']
+
+# Máximo de dientes que se dibujan uno a uno en el sketch (con 4 entidades
+# por diente); en modo automático el límite real es de entidades
+SKETCH_TEETH_LIMIT = 200
+SKETCH_ENTITY_LIMIT = SKETCH_TEETH_LIMIT * 4
+
+# Modos de generación de dientes: 'sketch' dibuja todos los dientes,
+# 'pattern' dibuja uno y lo replica con un patrón circular, 'sharded' los
+# dibuja por sectores, cada uno en su sketch, y los une al anillo y 'dxf'
+# escribe el anillo en un DXF temporal y lo importa de una vez
+TOOTH_MODES = ('auto', 'sketch', 'pattern', 'sharded', 'dxf')
+
+# Entidades de dientes por sketch en el modo por sectores (el cálculo de
+# perfiles de Fusion crece más que linealmente con las entidades)
+SHARD_ENTITY_BUDGET = 200
+
+# Perfiles de diente: 'trapezoid' (por defecto) dibuja trapecios de 4
+# puntos, 'involute' emite cada flanco como una spline ajustada y 'polyline'
+# la involuta como polilínea de los puntos por diente
+TOOTH_PROFILES = ('trapezoid', 'involute', 'polyline')
+
+# Niveles de detalle: None deja los dientes como se eligieron a mano
+LOD_OPTIONS = (None,) + LOD_TARGETS
+
+# Modos de construcción: 'parametric' usa sketch + extrusiones en el timeline,
+# 'direct' crea los cuerpos con B-Rep temporal y los inserta como Base Feature
+BUILD_MODES = ('parametric', 'direct')
+
+# Grupo de atributos con que se marcan los componentes generados
+ATTRIBUTE_GROUP = 'HDriveGenerator'
+
+# Parte de un HD insertado entero desde un documento biblioteca
+LIBRARY_PART = 'library'
+
+# Parámetros de usuario que dirigen las cotas de los componentes paramétricos
+# (el nombre completo lleva el prefijo del HD: HD_thickness, HD2_thickness...)
+PARAM_PREFIX = 'HD'
+PARAM_THICKNESS = 'thickness'
+PARAM_CUP_BASE = 'cup_base'
+PARAM_CUP_FACTOR = 'cup_factor'
+PARAM_CUP_LENGTH = 'cup_length'
+PARAM_FS_BOTTOM = 'fs_bottom'
+PARAM_WG_HEIGHT = 'wg_height'
+PARAM_NAMES = (PARAM_THICKNESS, PARAM_CUP_BASE, PARAM_CUP_FACTOR, PARAM_CUP_LENGTH,
+               PARAM_FS_BOTTOM, PARAM_WG_HEIGHT)
+
+# Evento personalizado que avanza la generación por partes
+GENERATION_EVENT_ID = 'HDriveGeneratorStep'
+
+# Dientes emitidos por paso de la generación por partes
+TEETH_PER_CHUNK = 20
+
+# Lotes de dientes que el hilo de trabajo calcula por adelantado
+PREFETCH_DEPTH = 4
+
+# Vista previa: muestras por flanco, segmentos por círculo y contornos en caché
+PREVIEW_FLANK_SAMPLES = 6
+PREVIEW_CIRCLE_SEGMENTS = 96
+PREVIEW_CACHE_SIZE = 16
+
+# Límites de los spinners de relación y módulo (mm) del diálogo
+RATIO_RANGE = (30, 160)
+MODULE_RANGE = (0.3, 2.0)
+
+# Precálculo especulativo tras cada cambio del diálogo: relaciones vecinas a
+# cada lado, módulos estándar vecinos a cada lado, segundos sin cambios antes
+# de empezar y resúmenes de información en caché
+SPECULATIVE_RATIO_STEPS = 5
+SPECULATIVE_MODULE_STEPS = 1
+SPECULATIVE_IDLE_DELAY = 0.15
+SUMMARY_CACHE_SIZE = 64
+
+# Colores (RGB) de la vista previa por parte
+PREVIEW_COLORS = {
+    'cs': (120, 120, 140),
+    'fs': (60, 170, 60),
+    'wg': (220, 130, 40)
+}
+
+def _read_inputs(inputs):
+    """
+    Lee los inputs del comando
+    
+    Returns:
+        (params, options): HarmonicDriveParams y los argumentos de generate()
+    """
+    ratio = inputs.itemById('reductionRatio').value
+    # IMPORTANTE: Fusion devuelve valores en cm, convertir a mm (redondeado
+    # para que 0.07 cm dé la misma clave de caché que el módulo 0.7)
+    module = round(inputs.itemById('module').value * 10, 6)  # cm a mm
+    pressure_angle_text = inputs.itemById('pressureAngle').selectedItem.name
+    pressure_angle = float(pressure_angle_text.replace('°', '').split()[0])
+    material_idx = inputs.itemById('material').selectedItem.index
+    tolerance = inputs.itemById('printTolerance').value * 10  # cm a mm
+    
+    # Mapear material
+    materials = ['steel', 'aluminum', 'plastic', 'tpu']
+    
+    params = HarmonicDriveParams(
+        teeth_cs=ratio * 2,
+        module=module,
+        pressure_angle=pressure_angle,
+        material=materials[material_idx],
+        print_tolerance=tolerance
+    )
+    options = {
+        'thickness_mm': inputs.itemById('thickness').value * 10,  # cm a mm
+        'cup_factor': inputs.itemById('cupFactor').valueOne,
+        'generate_teeth': inputs.itemById('generateTeeth').value,
+        'points_per_tooth': int(inputs.itemById('pointsPerTooth').valueOne),
+        'tooth_mode': TOOTH_MODES[inputs.itemById('toothMode').selectedItem.index],
+        'tooth_profile': TOOTH_PROFILES[inputs.itemById('toothProfile').selectedItem.index],
+        'build_mode': BUILD_MODES[inputs.itemById('buildMode').selectedItem.index],
+        'lod': LOD_OPTIONS[inputs.itemById('lod').selectedItem.index],
+        'new_copy': inputs.itemById('newCopy').value,
+        'library': tuple(
+            name.strip() for name in inputs.itemById('library').value.split(',')
+            if name.strip()
+        )
+    }
+    return params, options
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
+def _dialog_summary(params):
+    """Texto de información del diálogo para unos parámetros (en caché)"""
+    strain_data = get_calculator(params).calculate_strain()
+    
+    info_text = (
+        '<b>📊 Información Calculada:</b><br>' +
+        f'• Dientes CS: {params.teeth_cs}<br>' +
+        f'• Dientes FS: {params.teeth_fs}<br>' +
+        f'• Diámetro primitivo: {params.module * params.teeth_cs:.1f} mm<br>' +
+        f'• Excentricidad: {params.eccentricity:.3f} mm<br>'
+    )
+    
+    if strain_data['is_safe']:
+        info_text += f'• Deformación: {strain_data["strain_percent"]:.2f}% (OK)<br>'
+        info_text += '• <font color="green">✓ Configuración válida</font>'
+    else:
+        info_text += f'• Deformación: {strain_data["strain_percent"]:.2f}% (ALTO)<br>'
+        info_text += '• <font color="red">✗ Deformación excesiva para el material</font>'
+    return info_text
+
 class HDriveCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
     """Manejador para cuando se crea el comando"""
     
@@ -64,7 +247,7 @@ class HDriveCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             ratio_input = basic_inputs.addIntegerSpinnerCommandInput(
                 'reductionRatio', 
                 'Relación de Reducción', 
-                30, 160, 1, 80
+                *RATIO_RANGE, 1, 80
             )
             ratio_input.tooltip = 'Relación de reducción deseada (30:1 a 160:1)'
             
@@ -73,7 +256,7 @@ class HDriveCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
                 'module', 
                 'Módulo (mm)', 
                 'mm', 
-                0.3, 2.0, 0.1, 0.5
+                *MODULE_RANGE, 0.1, 0.5
             )
             module_input.tooltip = 'Tamaño del diente (0.3-2.0 mm)'
             
@@ -170,6 +353,81 @@ class HDriveCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             points_per_tooth.valueOne = 20
             points_per_tooth.tooltip = 'Más puntos = más precisión pero más lento'
             
+            # Modo de generación de dientes
+            tooth_mode = advanced_inputs.addDropDownCommandInput(
+                'toothMode',
+                'Modo de dientes',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            tooth_mode.listItems.add('Automático', True)
+            tooth_mode.listItems.add('Sketch completo', False)
+            tooth_mode.listItems.add('Patrón circular', False)
+            tooth_mode.listItems.add('Sketch por sectores', False)
+            tooth_mode.listItems.add('Importar DXF', False)
+            tooth_mode.tooltip = (
+                f'Automático usa patrón circular por encima de {SKETCH_ENTITY_LIMIT} '
+                f'entidades de dientes por sketch ({SKETCH_TEETH_LIMIT} dientes de 4 entidades)'
+            )
+            
+            # Perfil de los dientes
+            tooth_profile = advanced_inputs.addDropDownCommandInput(
+                'toothProfile',
+                'Perfil de dientes',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            tooth_profile.listItems.add('Trapezoidal', True)
+            tooth_profile.listItems.add('Involuta (splines)', False)
+            tooth_profile.listItems.add('Involuta (polilínea)', False)
+            tooth_profile.tooltip = ('Trapezoidal: 4 puntos por diente. '
+                                     'Involuta: una spline por flanco ajustada a los puntos por diente')
+            
+            # Nivel de detalle automático
+            lod = advanced_inputs.addDropDownCommandInput(
+                'lod',
+                'Nivel de detalle',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            lod.listItems.add('Manual (opciones de arriba)', True)
+            lod.listItems.add('Vista previa', False)
+            lod.listItems.add('Visual', False)
+            lod.listItems.add('Fabricación', False)
+            lod.tooltip = (
+                'Elige por componente círculos, trapecios, polilínea o splines '
+                'según los dientes, el módulo y la tolerancia de cuerda'
+            )
+            
+            # Modo de construcción
+            build_mode = advanced_inputs.addDropDownCommandInput(
+                'buildMode',
+                'Construcción',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            build_mode.listItems.add('Paramétrica (editable)', True)
+            build_mode.listItems.add('Directa (sin historial, más rápida)', False)
+            build_mode.tooltip = 'Directa crea los cuerpos sin sketches ni extrusiones'
+            
+            # Copias y biblioteca
+            new_copy = advanced_inputs.addBoolValueInput(
+                'newCopy',
+                'Agregar como copia nueva',
+                True,
+                '',
+                False
+            )
+            new_copy.tooltip = (
+                'Instancia los componentes idénticos que ya estén en el diseño '
+                'en lugar de actualizar la generación anterior'
+            )
+            library = advanced_inputs.addStringValueInput(
+                'library',
+                'Documentos biblioteca',
+                ''
+            )
+            library.tooltip = (
+                'Nombres de documentos abiertos, separados por comas, de donde '
+                'insertar un Harmonic Drive idéntico ya generado'
+            )
+            
             # Agregar handlers
             onExecute = HDriveCommandExecuteHandler()
             cmd.execute.add(onExecute)
@@ -183,6 +441,14 @@ class HDriveCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             cmd.validateInputs.add(onValidate)
             _handlers.append(onValidate)
             
+            onPreview = HDriveCommandPreviewHandler()
+            cmd.executePreview.add(onPreview)
+            _handlers.append(onPreview)
+            
+            onDestroy = HDriveCommandDestroyHandler()
+            cmd.destroy.add(onDestroy)
+            _handlers.append(onDestroy)
+            
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -216,53 +482,16 @@ class HDriveCommandInputChangedHandler(adsk.core.InputChangedEventHandler):
             
             # Si cambiaron los parámetros principales, actualizar info
             if changed.id in ['reductionRatio', 'module', 'material']:
-                ratio = inputs.itemById('reductionRatio').value
-                module = inputs.itemById('module').value * 10  # cm a mm
-                material_idx = inputs.itemById('material').selectedItem.index
-                
-                # Mapear material
-                materials = ['steel', 'aluminum', 'plastic', 'tpu']
-                material = materials[material_idx]
-                
-                # Calcular parámetros
-                teeth_cs = ratio * 2
-                teeth_fs = teeth_cs - 2
-                pitch_dia = module * teeth_cs
-                eccentricity = (2 * module) / math.pi
-                
-                # Validar strain
-                params = HarmonicDriveParams(
-                    teeth_cs=teeth_cs,
-                    module=module,
-                    pressure_angle=30,
-                    material=material
-                )
+                params, options = _read_inputs(inputs)
                 
                 try:
-                    calc = HarmonicDriveCalculator(params)
-                    strain_data = calc.calculate_strain()
-                    
-                    # Actualizar info
-                    info_text = (
-                        '<b>📊 Información Calculada:</b><br>' +
-                        f'• Dientes CS: {teeth_cs}<br>' +
-                        f'• Dientes FS: {teeth_fs}<br>' +
-                        f'• Diámetro primitivo: {pitch_dia:.1f} mm<br>' +
-                        f'• Excentricidad: {eccentricity:.3f} mm<br>'
-                    )
-                    
-                    if strain_data['is_safe']:
-                        info_text += f'• Deformación: {strain_data["strain_percent"]:.2f}% (OK)<br>'
-                        info_text += '• <font color="green">✓ Configuración válida</font>'
-                    else:
-                        info_text += f'• Deformación: {strain_data["strain_percent"]:.2f}% (ALTO)<br>'
-                        info_text += '• <font color="red">✗ Deformación excesiva para el material</font>'
-                    
                     info = inputs.itemById('info')
-                    info.text = info_text
-                    
+                    info.text = _dialog_summary(params)
                 except Exception as e:
                     pass
+                
+                # Mientras el usuario decide, precalcular los valores vecinos
+                _precompute.schedule(params, options)
             
         except:
             pass
@@ -283,6 +512,43 @@ class HDriveCommandValidateHandler(adsk.core.ValidateInputsEventHandler):
         except:
             args.areInputsValid = False
 
+class HDriveCommandPreviewHandler(adsk.core.CommandEventHandler):
+    """Manejador de la vista previa (executePreview)"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            params, options = _read_inputs(args.command.commandInputs)
+            _preview.update(
+                params,
+                thickness_mm=options['thickness_mm'],
+                generate_teeth=options['generate_teeth'],
+                points_per_tooth=options['points_per_tooth'],
+                tooth_profile=options['tooth_profile'],
+                lod=options['lod']
+            )
+            # Sólo gráficos: Execute debe generar el modelo real
+            args.isValidResult = False
+            
+        except:
+            # Parámetros inválidos: sin vista previa
+            _preview.clear()
+
+class HDriveCommandDestroyHandler(adsk.core.CommandEventHandler):
+    """Manejador para cuando se cierra el comando"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            _preview.clear()
+            _precompute.cancel()
+        except:
+            pass
+
 class HDriveCommandExecuteHandler(adsk.core.CommandEventHandler):
     """Manejador para ejecutar el comando"""
     
@@ -291,80 +557,293 @@ class HDriveCommandExecuteHandler(adsk.core.CommandEventHandler):
     
     def notify(self, args):
         try:
-            inputs = args.command.commandInputs
-            
-            # Obtener valores de entrada
-            ratio = inputs.itemById('reductionRatio').value
-            # IMPORTANTE: Fusion devuelve valores en cm, convertir a mm
-            module = inputs.itemById('module').value * 10  # cm a mm
-            pressure_angle_text = inputs.itemById('pressureAngle').selectedItem.name
-            pressure_angle = float(pressure_angle_text.replace('°', '').split()[0])
-            thickness = inputs.itemById('thickness').value * 10  # cm a mm
-            cup_factor = inputs.itemById('cupFactor').valueOne
-            material_idx = inputs.itemById('material').selectedItem.index
-            tolerance = inputs.itemById('printTolerance').value * 10  # cm a mm
-            generate_teeth = inputs.itemById('generateTeeth').value
-            points_per_tooth = int(inputs.itemById('pointsPerTooth').valueOne)
-            
-            # Mapear material
-            materials = ['steel', 'aluminum', 'plastic', 'tpu']
-            material = materials[material_idx]
-            
-            # Calcular número de dientes
-            teeth_cs = ratio * 2
-            
-            # Crear parámetros
-            params = HarmonicDriveParams(
-                teeth_cs=teeth_cs,
-                module=module,
-                pressure_angle=pressure_angle,
-                material=material,
-                print_tolerance=tolerance
-            )
-            
-            # Generar el Harmonic Drive
+            if _job is not None and _job.running:
+                _ui.messageBox('⏳ Ya hay una generación en curso')
+                return
+            
+            # La vista previa no debe quedar sobre los componentes reales
+            _preview.clear()
+            
+            params, options = _read_inputs(args.command.commandInputs)
+            teeth_cs = params.teeth_cs
+            module = params.module
+            
+            # Generar el Harmonic Drive por partes; cada parte corre en un
+            # evento personalizado y Fusion sigue respondiendo entre partes
             generator = HarmonicDriveGenerator(params)
-            success = generator.generate(
-                thickness_mm=thickness,
-                cup_factor=cup_factor,
-                generate_teeth=generate_teeth,
-                points_per_tooth=points_per_tooth
-            )
-            
-            if success:
-                _ui.messageBox(
-                    f'✅ ¡Harmonic Drive generado exitosamente!\n\n' +
-                    f'📊 Especificaciones:\n' +
-                    f'• Relación: {ratio}:1\n' +
-                    f'• Dientes CS/FS: {teeth_cs}/{teeth_cs-2}\n' +
-                    f'• Módulo: {module} mm\n' +
-                    f'• Diámetro: {module * teeth_cs:.1f} mm\n' +
-                    f'• Material: {material}\n\n' +
-                    f'Los componentes se han creado en el diseño activo.'
-                )
-            else:
-                _ui.messageBox('❌ Error al generar el Harmonic Drive')
+            steps = generator.generate_steps(**options)
+            summary = lambda: (
+                f'✅ ¡Harmonic Drive generado exitosamente!\n\n' +
+                f'📊 Especificaciones:\n' +
+                f'• Relación: {teeth_cs // 2}:1\n' +
+                f'• Dientes CS/FS: {teeth_cs}/{teeth_cs-2}\n' +
+                f'• Módulo: {module} mm\n' +
+                f'• Diámetro: {module * teeth_cs:.1f} mm\n' +
+                f'• Material: {params.material}\n\n' +
+                f'Los componentes se han creado en el diseño activo.' +
+                ''.join(f'\n\n⚠️ {warning}' for warning in generator.warnings)
+            )
+            start_job(generator, steps, summary)
+            
+        except Exception as e:
+            if _ui:
+                _ui.messageBox(f'Error: {str(e)}\n\n{traceback.format_exc()}')
+
+class GenerationStepHandler(adsk.core.CustomEventHandler):
+    """Manejador del evento personalizado que avanza la generación"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            if _job is not None:
+                _job.step()
+        except:
+            if _ui:
+                _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+def _parse_values(text, convert):
+    """Valores separados por comas ('50, 80, 100'); ValueError si no hay ninguno"""
+    values = [convert(item) for item in text.split(',') if item.strip()]
+    if not values:
+        raise ValueError(f"Lista vacía: '{text}'")
+    return values
+
+def _selected_items(dropdown):
+    """Índices de los ítems marcados de un desplegable con casillas"""
+    items = dropdown.listItems
+    return [i for i in range(items.count) if items.item(i).isSelected]
+
+def _read_batch_inputs(inputs):
+    """
+    Lee los inputs del comando por lotes
+    
+    Returns:
+        (variants, layout, options): variantes, distribución y los
+        argumentos de generate_steps comunes a todas
+    """
+    variants = batch_variants(
+        _parse_values(inputs.itemById('ratios').value, int),
+        _parse_values(inputs.itemById('modules').value, float),
+        [MATERIALS[i] for i in _selected_items(inputs.itemById('materials'))],
+        [BATCH_PRESSURE_ANGLES[i] for i in _selected_items(inputs.itemById('pressureAngles'))]
+    )
+    layout = BATCH_LAYOUTS[inputs.itemById('layout').selectedItem.index]
+    options = {
+        'thickness_mm': inputs.itemById('thickness').value * 10,  # cm a mm
+        'lod': LOD_OPTIONS[inputs.itemById('lod').selectedItem.index],
+        'build_mode': BUILD_MODES[inputs.itemById('buildMode').selectedItem.index]
+    }
+    return variants, layout, options
+
+class HDriveBatchCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
+    """Manejador para cuando se crea el comando por lotes"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            cmd = args.command
+            cmd.isRepeatable = False
+            inputs = cmd.commandInputs
+            
+            inputs.addTextBoxCommandInput(
+                'title',
+                '',
+                '<h2>🗂️ Harmonic Drive por Lotes</h2>' +
+                '<p>Genera todas las combinaciones de los valores indicados</p>',
+                2,
+                True
+            )
+            
+            # Valores de cada eje de la cuadrícula
+            ratios = inputs.addStringValueInput('ratios', 'Relaciones', '50, 80, 100')
+            ratios.tooltip = 'Relaciones de reducción separadas por comas'
+            modules = inputs.addStringValueInput('modules', 'Módulos (mm)', '0.5, 1.0')
+            modules.tooltip = 'Módulos en mm separados por comas'
+            
+            materials = inputs.addDropDownCommandInput(
+                'materials',
+                'Materiales',
+                adsk.core.DropDownStyles.CheckBoxDropDownStyle
+            )
+            materials.listItems.add('Acero', False)
+            materials.listItems.add('Aluminio', False)
+            materials.listItems.add('Plástico', True)
+            materials.listItems.add('TPU Flexible', False)
+            
+            pressure_angles = inputs.addDropDownCommandInput(
+                'pressureAngles',
+                'Ángulos de presión',
+                adsk.core.DropDownStyles.CheckBoxDropDownStyle
+            )
+            for angle in BATCH_PRESSURE_ANGLES:
+                pressure_angles.listItems.add(f'{angle:g}°', angle == 30)
+            
+            # Opciones comunes a todas las variantes
+            inputs.addFloatSpinnerCommandInput(
+                'thickness',
+                'Espesor (mm)',
+                'mm',
+                5.0, 50.0, 5.0, 20.0
+            )
+            
+            lod = inputs.addDropDownCommandInput(
+                'lod',
+                'Nivel de detalle',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            lod.listItems.add('Manual (dientes completos)', False)
+            lod.listItems.add('Vista previa', False)
+            lod.listItems.add('Visual', True)
+            lod.listItems.add('Fabricación', False)
+            
+            build_mode = inputs.addDropDownCommandInput(
+                'buildMode',
+                'Construcción',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            build_mode.listItems.add('Paramétrica (editable)', True)
+            build_mode.listItems.add('Directa (sin historial, más rápida)', False)
+            
+            layout = inputs.addDropDownCommandInput(
+                'layout',
+                'Distribución',
+                adsk.core.DropDownStyles.TextListDropDownStyle
+            )
+            layout.listItems.add('Cuadrícula en el diseño activo', True)
+            layout.listItems.add('Un documento por variante', False)
+            
+            inputs.addTextBoxCommandInput('batchInfo', '', '', 2, True)
+            
+            # Agregar handlers
+            onExecute = HDriveBatchCommandExecuteHandler()
+            cmd.execute.add(onExecute)
+            _handlers.append(onExecute)
+            
+            onValidate = HDriveBatchCommandValidateHandler()
+            cmd.validateInputs.add(onValidate)
+            _handlers.append(onValidate)
+            
+        except:
+            if _ui:
+                _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+class HDriveBatchCommandValidateHandler(adsk.core.ValidateInputsEventHandler):
+    """Valida las listas del comando por lotes y muestra cuántas variantes hay"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            inputs = args.inputs
+            variants, _, _ = _read_batch_inputs(inputs)
+            inputs.itemById('batchInfo').text = f'<b>{len(variants)}</b> variantes'
+            args.areInputsValid = len(variants) > 0
+            
+        except:
+            args.areInputsValid = False
+
+class HDriveBatchCommandExecuteHandler(adsk.core.CommandEventHandler):
+    """Manejador para ejecutar el comando por lotes"""
+    
+    def __init__(self):
+        super().__init__()
+    
+    def notify(self, args):
+        try:
+            if _job is not None and _job.running:
+                _ui.messageBox('⏳ Ya hay una generación en curso')
+                return
+            
+            variants, layout, options = _read_batch_inputs(args.command.commandInputs)
+            batch = HarmonicDriveBatch(variants, layout, **options)
+            
+            # El resumen con los tiempos se arma al terminar
+            start_job(batch, batch.generate_steps(), batch.report)
             
         except Exception as e:
             if _ui:
                 _ui.messageBox(f'Error: {str(e)}\n\n{traceback.format_exc()}')
 
+def _teeth_settings(params, lod, generate_teeth, tooth_profile, points_per_tooth):
+    """Ajustes de dientes de unos parámetros (ver HarmonicDriveGenerator.teeth_settings)"""
+    if tooth_profile not in TOOTH_PROFILES:
+        raise ValueError(f"Perfil de dientes desconocido: {tooth_profile}")
+    if lod is not None and lod not in LOD_TARGETS:
+        raise ValueError(f"Nivel de detalle desconocido: {lod}")
+    
+    settings = {}
+    for part in ('cs', 'fs'):
+        if lod is None:
+            settings[part] = {
+                'generate_teeth': generate_teeth,
+                'tooth_profile': tooth_profile,
+                'points_per_tooth': points_per_tooth,
+                'tolerance': FLANK_FIT_TOLERANCE
+            }
+            continue
+        
+        chosen = get_tooth_lod(params, part, lod)
+        settings[part] = {
+            'generate_teeth': chosen.representation != 'circle',
+            'tooth_profile': (
+                'involute' if chosen.representation == 'spline' else 'polyline'
+            ),
+            'points_per_tooth': chosen.points_per_tooth or points_per_tooth,
+            'tolerance': (
+                chosen.tolerance if chosen.representation == 'spline'
+                else FLANK_FIT_TOLERANCE
+            )
+        }
+    return settings
+
 class HarmonicDriveGenerator:
     """Generador principal del Harmonic Drive en Fusion 360"""
     
     def __init__(self, params: HarmonicDriveParams):
         self.params = params
-        self.calc = HarmonicDriveCalculator(params)
-        self.profile_gen = HarmonicDriveInvoluteProfile(params)
+        self.calc = get_calculator(params)
+        self.profile_gen = get_profile_generator(params)
         
         # Referencias de Fusion
         self.app = adsk.core.Application.get()
         self.ui = self.app.userInterface
         self.design = self.app.activeProduct
         self.root = self.design.rootComponent
+        self.fusion = FusionWrapper()
+        
+        # Modo y perfil de dientes de la generación en curso
+        self.tooth_mode = 'auto'
+        self.tooth_profile = 'trapezoid'
+        self.fit_tolerance = FLANK_FIT_TOLERANCE
+        self.batch_size = TEETH_PER_CHUNK
+        
+        # Posición (x, y) en cm y prefijo de los parámetros de usuario; el
+        # prefijo identifica al HD en el diseño y cada HD distinto usa el
+        # suyo (ver next_parameter_prefix)
+        self.origin = (0.0, 0.0)
+        self.parameter_prefix = PARAM_PREFIX
+        
+        # Ocurrencias creadas, parámetros cambiados y ocurrencias movidas
+        # por la generación en curso (para rollback)
+        self._occurrences = []
+        self._parameter_undo = []
+        self._transform_undo = []
+        
+        # Problemas no fatales de la última generación (p. ej. apariencias)
+        self.warnings = []
+        
+        # Marca del HD en sus ocurrencias (ver _tag_drive)
+        self._drive = {}
     
     def generate(self, thickness_mm=20, cup_factor=0.8, 
-                generate_teeth=True, points_per_tooth=20):
+                generate_teeth=True, points_per_tooth=20, tooth_mode='auto',
+                tooth_profile='trapezoid', build_mode='parametric', lod=None,
+                new_copy=False, library=()):
         """
         Genera el Harmonic Drive completo
         
@@ -373,123 +852,417 @@ class HarmonicDriveGenerator:
             cup_factor: Factor de longitud de la copa (0.5-1.5)
             generate_teeth: Si generar dientes reales o solo círculos
             points_per_tooth: Puntos por diente para el perfil
+            tooth_mode: Modo de dientes (ver TOOTH_MODES)
+            tooth_profile: Perfil de dientes (ver TOOTH_PROFILES)
+            build_mode: Modo de construcción (ver BUILD_MODES)
+            lod: Nivel de detalle (ver LOD_TARGETS); si se indica, elige por
+                 componente generate_teeth, tooth_profile y points_per_tooth
+            new_copy: Agregar otra copia en lugar de actualizar la anterior
+            library: Nombres de documentos abiertos de donde insertar un HD
+                     idéntico ya generado
         
         Returns:
             True si se generó exitosamente
         """
         try:
-            # Obtener geometrías calculadas
-            cs_geo = self.calc.get_circular_spline_geometry()
-            fs_geo = self.calc.get_flex_spline_geometry()
-            wg_geo = self.calc.get_wave_generator_geometry()
-            
-            # Generar componentes
-            self._create_circular_spline(cs_geo, thickness_mm, generate_teeth, points_per_tooth)
-            self._create_flex_spline(fs_geo, thickness_mm, cup_factor, generate_teeth, points_per_tooth)
-            self._create_wave_generator(wg_geo, thickness_mm)
-            
+            for _ in self.generate_steps(
+                thickness_mm, cup_factor, generate_teeth, points_per_tooth,
+                tooth_mode, tooth_profile, build_mode, lod, new_copy, library
+            ):
+                pass
             return True
             
         except Exception as e:
+            self.rollback()
             self.ui.messageBox(f'Error generando HD: {str(e)}')
             return False
     
+    def generate_steps(self, thickness_mm=20, cup_factor=0.8,
+                       generate_teeth=True, points_per_tooth=20, tooth_mode='auto',
+                       tooth_profile='trapezoid', build_mode='parametric', lod=None,
+                       new_copy=False, library=(), batch_size=TEETH_PER_CHUNK):
+        """
+        Genera el Harmonic Drive por partes (mismos argumentos que generate)
+        
+        Es un generador: cada next() emite un componente o un lote de
+        batch_size dientes y entrega (mensaje, hecho, total) para mostrar el
+        progreso. Cerrarlo a medias (close()) deja los sketches consistentes;
+        rollback() elimina lo ya creado.
+        
+        Si el diseño ya tiene componentes de una generación anterior, los que
+        no cambiaron se conservan: en modo paramétrico las cotas (espesor,
+        copa, alturas) son parámetros de usuario y sólo se actualizan sus
+        expresiones. Un componente se reconstruye sólo si cambió lo que
+        define su sketch (ver _signatures); el anterior se elimina al final.
+        
+        Un HD son todas las ocurrencias marcadas con su prefijo, copias
+        incluidas: un componente reconstruido reemplaza a todas y cada copia
+        pasa al componente nuevo en su lugar.
+        
+        Con new_copy la generación anterior no se toca y la copia se coloca
+        a la derecha de los HD del diseño (ver _place_copy). Una copia
+        idéntica a un HD existente usa su prefijo e instancia sus
+        componentes (misma definición, otra ocurrencia); cualquier otra
+        toma un prefijo libre para no cambiar los parámetros de los demás y
+        sólo instancia los componentes con la misma firma. Si el diseño no
+        tiene el HD y un documento de library tiene sólo ese HD, con el
+        mismo hash de contenido (ver _content_hash), se inserta el
+        documento. El HD insertado queda marcado como los demás: repetir
+        la generación lo conserva y, si cambió, se reemplaza entero.
+        """
+        if tooth_mode not in TOOTH_MODES:
+            raise ValueError(f"Modo de dientes desconocido: {tooth_mode}")
+        if tooth_profile not in TOOTH_PROFILES:
+            raise ValueError(f"Perfil de dientes desconocido: {tooth_profile}")
+        if build_mode not in BUILD_MODES:
+            raise ValueError(f"Modo de construcción desconocido: {build_mode}")
+        self.tooth_mode = tooth_mode
+        self.batch_size = batch_size
+        self._occurrences = []
+        self._parameter_undo = []
+        self._transform_undo = []
+        self.warnings = []
+        
+        # Dientes de cada componente (elegidos a mano o por nivel de detalle)
+        settings = self.teeth_settings(lod, generate_teeth, tooth_profile, points_per_tooth)
+        cs_teeth = lambda: self._use_teeth(settings['cs'])
+        fs_teeth = lambda: self._use_teeth(settings['fs'])
+        
+        # Componentes ya generados en el diseño y lo que define cada uno
+        generated = self._generated_occurrences()
+        if new_copy:
+            self._place_copy(generated, settings, build_mode, thickness_mm, cup_factor)
+        signatures = self._signatures(settings, build_mode, thickness_mm, cup_factor)
+        content_hash = self._content_hash(signatures, thickness_mm, cup_factor)
+        self._drive = {
+            'prefix': self.parameter_prefix,
+            'radius': self.calc.get_circular_spline_geometry()['outer_diameter'] / 20,
+            'content': content_hash
+        }
+        
+        # Ocurrencias de este HD por parte: (ocurrencia, firma, origen)
+        existing = {}
+        if not new_copy:
+            for occurrence, part, signature, drive in generated:
+                if drive['prefix'] == self.parameter_prefix:
+                    existing.setdefault(part, []).append((occurrence, signature, drive['origin']))
+        
+        # Componentes que una copia puede instanciar; en modo paramétrico
+        # sólo los del mismo prefijo, porque sus cotas siguen sus parámetros
+        instances = {} if not new_copy else {
+            signature: occurrence.component
+            for occurrence, part, signature, drive in generated
+            if part != LIBRARY_PART and (
+                build_mode == 'direct' or drive['prefix'] == self.parameter_prefix
+            )
+        }
+        inserted = {} if not new_copy else {
+            signature: occurrence.component
+            for occurrence, part, signature, _ in generated if part == LIBRARY_PART
+        }
+        
+        # Lugares donde está el HD; se actualiza donde ya estaba
+        placements = sorted({origin for entries in existing.values() for _, _, origin in entries})
+        if placements and self.origin not in placements:
+            self.origin = placements[0]
+        placements = [self.origin] + [origin for origin in placements if origin != self.origin]
+        
+        # Un HD insertado de una biblioteca no se puede editar: si cambió,
+        # se reemplaza entero por otro documento o por una construcción
+        library_entries = existing.pop(LIBRARY_PART, [])
+        if library_entries and not existing and all(
+            signature == content_hash for _, signature, _ in library_entries
+        ):
+            yield ('Sin cambios', 1, 1)
+            return
+        
+        # Un HD idéntico de la biblioteca se inserta sin construir nada
+        if not existing and not set(signatures.values()) & set(instances):
+            if content_hash in inserted:
+                self._insert_library_drive(placements, component=inserted[content_hash])
+                yield ('Instanciado desde la biblioteca', 1, 1)
+                return
+            found = self._find_library_document(library, content_hash)
+            if found is not None:
+                document, library_origin = found
+                self._insert_library_drive(placements, document, library_origin)
+                for occurrence, _, _ in library_entries:
+                    occurrence.deleteMe()
+                yield (f'Insertado desde {document.name}', 1, 1)
+                return
+        
+        # Obtener geometrías calculadas
+        cs_geo = self.calc.get_circular_spline_geometry()
+        fs_geo = self.calc.get_flex_spline_geometry()
+        wg_geo = self.calc.get_wave_generator_geometry()
+        
+        # Partes: (parte, nombre, función que la crea, unidades de trabajo)
+        if build_mode == 'direct':
+            parts = [
+                ('cs', 'Circular Spline', lambda: self._create_circular_spline_direct(
+                    cs_geo, thickness_mm, *cs_teeth())),
+                ('fs', 'Flex Spline', lambda: self._create_flex_spline_direct(
+                    fs_geo, thickness_mm, cup_factor, *fs_teeth())),
+                ('wg', 'Wave Generator', lambda: self._create_wave_generator_direct(
+                    wg_geo, thickness_mm))
+            ]
+        else:
+            self._update_user_parameters(thickness_mm, cup_factor)
+            parts = [
+                ('cs', 'Circular Spline', lambda: self._create_circular_spline(
+                    cs_geo, thickness_mm, *cs_teeth())),
+                ('fs', 'Flex Spline', lambda: self._create_flex_spline(
+                    fs_geo, thickness_mm, cup_factor, *fs_teeth())),
+                ('wg', 'Wave Generator', lambda: self._create_wave_generator(
+                    wg_geo, thickness_mm))
+            ]
+        
+        offsets = {'cs': 0.0, 'fs': thickness_mm / 10 * 0.1, 'wg': thickness_mm / 10 * 0.2}
+        replaced = [occurrence for occurrence, _, _ in library_entries]
+        
+        # Una unidad por diente más una por componente
+        units = [self.params.teeth_cs + 1, self.params.teeth_fs + 1, 1]
+        total = sum(units)
+        done = 0
+        
+        for (part, name, create), part_units in zip(parts, units):
+            part_start = done
+            previous = existing.get(part, [])
+            
+            # Sin cambios en su sketch: basta con los parámetros y la posición
+            if previous and all(signature == signatures[part] for _, signature, _ in previous):
+                for occurrence, _, origin in previous:
+                    self._move_occurrence(occurrence, offsets[part], origin)
+                done = part_start + part_units
+                yield (f'{name} actualizado', done, total)
+                continue
+            
+            # Copia nueva de un componente que ya está en el diseño
+            if signatures[part] in instances:
+                occurrence = self.root.occurrences.addExistingComponent(
+                    instances[signatures[part]], self._translation(offsets[part])
+                )
+                self._occurrences.append(occurrence)
+                self._tag_drive(occurrence)
+                done = part_start + part_units
+                yield (f'{name} instanciado', done, total)
+                continue
+            
+            steps = create()
+            
+            # Las partes con dientes en sketch ceden tras cada lote
+            if steps is not None:
+                for teeth in steps:
+                    done += teeth
+                    yield (f'{name}: {done - part_start} dientes', done, total)
+            
+            self._tag_occurrence(self._occurrences[-1], part, signatures[part])
+            
+            # Las copias del HD en otros lugares pasan al componente nuevo
+            component = self._occurrences[-1].component
+            for origin in placements[1:]:
+                occurrence = self.root.occurrences.addExistingComponent(
+                    component, self._translation(offsets[part], origin)
+                )
+                self._occurrences.append(occurrence)
+                self._tag_drive(occurrence, origin)
+            replaced += [occurrence for occurrence, _, _ in previous]
+            
+            done = part_start + part_units
+            yield (f'{name} creado', done, total)
+        
+        # Los componentes reemplazados se eliminan sólo al terminar, así
+        # cancelar a medias deja intacta la generación anterior
+        for occurrence in replaced:
+            if occurrence.isValid:
+                occurrence.deleteMe()
+    
+    def teeth_settings(self, lod, generate_teeth, tooth_profile, points_per_tooth):
+        """
+        Dientes de CS y FS: {'cs': ajustes, 'fs': ajustes}
+        
+        Cada ajuste es un diccionario con 'generate_teeth', 'tooth_profile',
+        'points_per_tooth' y 'tolerance' (del ajuste de splines, mm). Sin
+        nivel de detalle todos los componentes usan los valores dados; con
+        él se toma la representación de get_tooth_lod para cada uno.
+        """
+        return _teeth_settings(self.params, lod, generate_teeth, tooth_profile, points_per_tooth)
+    
+    def _use_teeth(self, settings):
+        """Activa los ajustes de dientes de un componente (ver teeth_settings)"""
+        self.tooth_profile = settings['tooth_profile']
+        self.fit_tolerance = settings['tolerance']
+        return settings['generate_teeth'], settings['points_per_tooth']
+    
+    def _entities_per_tooth(self, points_per_tooth):
+        """Entidades de sketch por diente con el perfil en uso"""
+        if self.tooth_profile == 'polyline':
+            return 2 * max(points_per_tooth // 2, 2)
+        # Involuta: 2 splines y 2 arcos; trapecio: 4 líneas
+        return 4
+    
+    def _resolve_tooth_mode(self, generate_teeth, num_teeth, points_per_tooth=20):
+        """
+        Modo efectivo de dientes para un componente (None = sin dientes)
+        
+        En modo automático se usa el patrón cuando el sketch pasaría de
+        SKETCH_ENTITY_LIMIT entidades de dientes.
+        """
+        if not generate_teeth:
+            return None
+        if self.tooth_mode == 'auto':
+            entities = num_teeth * self._entities_per_tooth(points_per_tooth)
+            return 'sketch' if entities <= SKETCH_ENTITY_LIMIT else 'pattern'
+        return self.tooth_mode
+    
     def _create_circular_spline(self, geometry, thickness_mm, generate_teeth, points_per_tooth):
-        """Crea el Circular Spline"""
+        """Crea el Circular Spline (generador: cede los dientes de cada lote)"""
         
         # Crear componente
-        occs = self.root.occurrences
-        transform = adsk.core.Matrix3D.create()
-        cs_occ = occs.addNewComponent(transform)
-        cs_comp = cs_occ.component
-        cs_comp.name = f"CircularSpline_{self.params.teeth_cs}T_{self.params.ratio:.0f}to1"
+        cs_comp = self._add_component(
+            f"CircularSpline_{self.params.teeth_cs}T_{self.params.ratio:.0f}to1"
+        )
+        
+        tooth_mode = self._resolve_tooth_mode(
+            generate_teeth, self.params.teeth_cs, points_per_tooth
+        )
+        
+        # Círculo exterior (carcasa)
+        outer_radius_cm = geometry['outer_diameter'] / 20  # mm a cm
         
         # Crear sketch
         sketches = cs_comp.sketches
         xy_plane = cs_comp.xYConstructionPlane
-        sketch = sketches.add(xy_plane)
+        if tooth_mode == 'dxf':
+            # Anillo completo (dientes y carcasa) importado de una vez
+            sketch = yield from self._import_teeth_dxf(
+                cs_comp, geometry, True, points_per_tooth, (outer_radius_cm,)
+            )
+        else:
+            sketch = sketches.add(xy_plane)
         
         # Dibujar círculos principales
         circles = sketch.sketchCurves.sketchCircles
         center = adsk.core.Point3D.create(0, 0, 0)
-        
-        # Círculo exterior (carcasa)
-        outer_radius_cm = geometry['outer_diameter'] / 20  # mm a cm
-        outer_circle = circles.addByCenterRadius(center, outer_radius_cm)
+        if tooth_mode != 'dxf':
+            outer_circle = circles.addByCenterRadius(center, outer_radius_cm)
         
         # Círculo de dientes (interno)
         pitch_radius_cm = geometry['pitch_radius'] / 10
         
-        if generate_teeth and self.params.teeth_cs <= 200:
-            # Generar dientes reales (limitado a 200 dientes por rendimiento)
-            self._draw_teeth(sketch, geometry, True, points_per_tooth)
+        if tooth_mode == 'sketch':
+            # Generar dientes reales dibujando cada diente (por lotes)
+            yield from self._draw_teeth_steps(sketch, geometry, True, points_per_tooth)
+            profile = self._ring_profile(sketch)
+        elif tooth_mode == 'dxf':
+            profile = self._ring_profile(sketch)
         else:
-            # Solo dibujar círculo interno
-            inner_radius_cm = geometry['addendum_diameter'] / 20
+            # Solo dibujar círculo interno (los dientes del patrón o de los
+            # sectores se cortan después)
+            if tooth_mode in ('pattern', 'sharded'):
+                inner_radius_cm = self._pattern_ring_radius(geometry, True, points_per_tooth)
+            else:
+                inner_radius_cm = geometry['addendum_diameter'] / 20
             inner_circle = circles.addByCenterRadius(center, inner_radius_cm)
+            profile = self._ring_profile(sketch)
         
         # Extruir
-        profile = sketch.profiles.item(0)
         extrudes = cs_comp.features.extrudeFeatures
         extrude_input = extrudes.createInput(
             profile,
             adsk.fusion.FeatureOperations.NewBodyFeatureOperation
         )
-        distance = adsk.core.ValueInput.createByReal(thickness_mm / 10)
+        distance = adsk.core.ValueInput.createByString(self._parameter(PARAM_THICKNESS))
         extrude_input.setDistanceExtent(False, distance)
         extrude = extrudes.add(extrude_input)
         
+        if tooth_mode == 'pattern':
+            # Cortar un hueco entre dientes y replicarlo alrededor del eje
+            self._pattern_teeth(
+                cs_comp, geometry, True, self._parameter(PARAM_THICKNESS), points_per_tooth
+            )
+        elif tooth_mode == 'sharded':
+            # Cortar los huecos sector por sector
+            yield from self._shard_teeth_steps(
+                cs_comp, geometry, True, self._parameter(PARAM_THICKNESS), points_per_tooth
+            )
+        
         # Aplicar apariencia
         if extrude.bodies.count > 0:
             self._apply_appearance(extrude.bodies.item(0), 'Steel', 180, 180, 190)
     
     def _create_flex_spline(self, geometry, thickness_mm, cup_factor, generate_teeth, points_per_tooth):
-        """Crea el Flex Spline"""
+        """Crea el Flex Spline (generador: cede los dientes de cada lote)"""
         
         # Crear componente con offset en Z
-        occs = self.root.occurrences
-        transform = adsk.core.Matrix3D.create()
-        transform.translation = adsk.core.Vector3D.create(0, 0, thickness_mm / 10 * 0.1)
-        fs_occ = occs.addNewComponent(transform)
-        fs_comp = fs_occ.component
-        fs_comp.name = f"FlexSpline_{self.params.teeth_fs}T_Flexible"
+        fs_comp = self._add_component(
+            f"FlexSpline_{self.params.teeth_fs}T_Flexible", thickness_mm / 10 * 0.1
+        )
+        
+        tooth_mode = self._resolve_tooth_mode(
+            generate_teeth, self.params.teeth_fs, points_per_tooth
+        )
         
         # Crear sketch para la copa
         sketches = fs_comp.sketches
         xy_plane = fs_comp.xYConstructionPlane
-        sketch = sketches.add(xy_plane)
+        if tooth_mode == 'dxf':
+            # Dientes y círculo interior importados de una vez
+            inner_radius_cm = geometry['inner_diameter'] / 20
+            sketch = yield from self._import_teeth_dxf(
+                fs_comp, geometry, False, points_per_tooth, (inner_radius_cm,)
+            )
+        else:
+            sketch = sketches.add(xy_plane)
         
         # Dibujar perfil de la copa
         circles = sketch.sketchCurves.sketchCircles
         center = adsk.core.Point3D.create(0, 0, 0)
         
-        if generate_teeth and self.params.teeth_fs <= 200:
-            # Generar dientes reales
-            self._draw_teeth(sketch, geometry, False, points_per_tooth)
+        if tooth_mode == 'dxf':
+            profile = self._ring_profile(sketch)
+        elif tooth_mode == 'sketch':
+            # Generar dientes reales (por lotes)
+            yield from self._draw_teeth_steps(sketch, geometry, False, points_per_tooth)
             # Círculo interior
             inner_radius_cm = geometry['inner_diameter'] / 20
             inner_circle = circles.addByCenterRadius(center, inner_radius_cm)
+            profile = self._ring_profile(sketch)
         else:
-            # Solo círculos
-            outer_radius_cm = geometry['addendum_diameter'] / 20
+            # Solo círculos; con patrón o sectores la copa llega a la raíz y
+            # los dientes se unen después
+            if tooth_mode in ('pattern', 'sharded'):
+                outer_radius_cm = self._pattern_ring_radius(geometry, False, points_per_tooth)
+            else:
+                outer_radius_cm = geometry['addendum_diameter'] / 20
             inner_radius_cm = geometry['inner_diameter'] / 20
             outer_circle = circles.addByCenterRadius(center, outer_radius_cm)
             inner_circle = circles.addByCenterRadius(center, inner_radius_cm)
+            profile = self._ring_profile(sketch)
         
         # Extruir copa
-        profile = sketch.profiles.item(0)
         extrudes = fs_comp.features.extrudeFeatures
         extrude_input = extrudes.createInput(
             profile,
             adsk.fusion.FeatureOperations.NewBodyFeatureOperation
         )
         
-        # Longitud de la copa
-        cup_length_cm = geometry['cup_length'] * cup_factor / 10
-        distance = adsk.core.ValueInput.createByReal(cup_length_cm)
+        # Longitud de la copa (HD_cup_base * HD_cup_factor)
+        distance = adsk.core.ValueInput.createByString(self._parameter(PARAM_CUP_LENGTH))
         extrude_input.setDistanceExtent(False, distance)
         cup_extrude = extrudes.add(extrude_input)
         
+        if tooth_mode == 'pattern':
+            # Unir un diente a la copa y replicarlo alrededor del eje
+            self._pattern_teeth(
+                fs_comp, geometry, False, self._parameter(PARAM_CUP_LENGTH), points_per_tooth
+            )
+        elif tooth_mode == 'sharded':
+            # Unir los dientes a la copa sector por sector
+            yield from self._shard_teeth_steps(
+                fs_comp, geometry, False, self._parameter(PARAM_CUP_LENGTH), points_per_tooth
+            )
+        
         # Crear fondo de la copa
         bottom_sketch = sketches.add(xy_plane)
         bottom_circle = bottom_sketch.sketchCurves.sketchCircles.addByCenterRadius(
@@ -501,28 +1274,22 @@ class HarmonicDriveGenerator:
             bottom_profile,
             adsk.fusion.FeatureOperations.JoinFeatureOperation
         )
-        bottom_thickness = adsk.core.ValueInput.createByReal(self.params.module / 10 * 3)
+        bottom_thickness = adsk.core.ValueInput.createByString(self._parameter(PARAM_FS_BOTTOM))
         bottom_extrude_input.setDistanceExtent(False, bottom_thickness)
         bottom_extrude = extrudes.add(bottom_extrude_input)
         
         # Aplicar apariencia
         for i in range(fs_comp.bRepBodies.count):
             body = fs_comp.bRepBodies.item(i)
-            if self.params.material == 'tpu':
-                self._apply_appearance(body, 'TPU_Orange', 255, 150, 100)
-            else:
-                self._apply_appearance(body, 'Plastic_Green', 100, 200, 100)
+            self._apply_appearance(body, *self._fs_appearance())
     
     def _create_wave_generator(self, geometry, thickness_mm):
         """Crea el Wave Generator"""
         
         # Crear componente con offset en Z
-        occs = self.root.occurrences
-        transform = adsk.core.Matrix3D.create()
-        transform.translation = adsk.core.Vector3D.create(0, 0, thickness_mm / 10 * 0.2)
-        wg_occ = occs.addNewComponent(transform)
-        wg_comp = wg_occ.component
-        wg_comp.name = f"WaveGenerator_e{self.params.eccentricity:.2f}mm"
+        wg_comp = self._add_component(
+            f"WaveGenerator_e{self.params.eccentricity:.2f}mm", thickness_mm / 10 * 0.2
+        )
         
         # Crear sketch
         sketches = wg_comp.sketches
@@ -533,8 +1300,7 @@ class HarmonicDriveGenerator:
         self._draw_ellipse(
             sketch,
             geometry['major_radius'] / 10,
-            geometry['minor_radius'] / 10,
-            60
+            geometry['minor_radius'] / 10
         )
         
         # Agregar agujero central
@@ -552,7 +1318,7 @@ class HarmonicDriveGenerator:
                     profile,
                     adsk.fusion.FeatureOperations.NewBodyFeatureOperation
                 )
-                distance = adsk.core.ValueInput.createByReal(geometry['height'] / 10)
+                distance = adsk.core.ValueInput.createByString(self._parameter(PARAM_WG_HEIGHT))
                 extrude_input.setDistanceExtent(False, distance)
                 extrude = extrudes.add(extrude_input)
                 
@@ -560,10 +1326,789 @@ class HarmonicDriveGenerator:
                     self._apply_appearance(extrude.bodies.item(0), 'Aluminum_Red', 200, 100, 100)
                 break
     
-    def _draw_teeth(self, sketch, geometry, is_internal, points_per_tooth):
-        """Dibuja los dientes con perfil involuta simplificado"""
+    def _add_component(self, name, z_offset_cm=0.0):
+        """Crea un componente nuevo desplazado en Z (se registra para rollback)"""
+        occurrence = self.root.occurrences.addNewComponent(self._translation(z_offset_cm))
+        self._occurrences.append(occurrence)
+        component = occurrence.component
+        component.name = name
+        return component
+    
+    def rollback(self):
+        """
+        Elimina los componentes creados y restaura los parámetros cambiados
+        y la posición de las ocurrencias movidas
+        """
+        for occurrence in reversed(self._occurrences):
+            if occurrence.isValid:
+                occurrence.deleteMe()
+        self._occurrences = []
+        
+        for occurrence, transform in reversed(self._transform_undo):
+            if occurrence.isValid:
+                occurrence.transform = transform
+        self._transform_undo = []
+        
+        parameters = self.design.userParameters
+        for name, expression in reversed(self._parameter_undo):
+            parameter = parameters.itemByName(name)
+            if parameter is None:
+                continue
+            if expression is None:
+                parameter.deleteMe()
+            else:
+                parameter.expression = expression
+        self._parameter_undo = []
+    
+    def _user_parameters(self, thickness_mm, cup_factor):
+        """Parámetros de usuario: lista de (nombre, expresión, unidades, comentario)"""
+        fs_geo = self.calc.get_flex_spline_geometry()
+        wg_geo = self.calc.get_wave_generator_geometry()
+        mm = lambda value: f'{round(float(value), 6)} mm'
+        name = self._parameter
+        return [
+            (name(PARAM_THICKNESS), mm(thickness_mm), 'mm', 'Espesor del Circular Spline'),
+            (name(PARAM_CUP_BASE), mm(fs_geo['cup_length']), 'mm',
+             'Longitud nominal de la copa del Flex Spline'),
+            (name(PARAM_CUP_FACTOR), f'{round(float(cup_factor), 6)}', '',
+             'Factor de longitud de la copa'),
+            (name(PARAM_CUP_LENGTH), f'{name(PARAM_CUP_BASE)} * {name(PARAM_CUP_FACTOR)}', 'mm',
+             'Longitud de la copa del Flex Spline'),
+            (name(PARAM_FS_BOTTOM), mm(self.params.module * 3), 'mm',
+             'Espesor del fondo de la copa'),
+            (name(PARAM_WG_HEIGHT), mm(wg_geo['height']), 'mm', 'Altura del Wave Generator')
+        ]
+    
+    def _parameter(self, name):
+        """Nombre completo de un parámetro de usuario de este HD"""
+        return f'{self.parameter_prefix}_{name}'
+    
+    def parameter_prefixes(self):
+        """
+        Prefijos ya usados en el diseño
+        
+        Un prefijo está en uso si hay parámetros de usuario con él (p. ej.
+        HD2_thickness) o componentes generados marcados con él.
+        """
+        prefixes = {drive['prefix'] for _, _, _, drive in self._generated_occurrences()}
+        parameters = self.design.userParameters
+        for i in range(parameters.count):
+            prefix, _, name = parameters.item(i).name.partition('_')
+            if name in PARAM_NAMES:
+                prefixes.add(prefix)
+        return prefixes
+    
+    def free_origin(self, generated=None, radius_cm=None):
+        """
+        Origen (x, y) en cm libre para este HD, a la derecha de los del diseño
+        
+        Args:
+            generated: Resultado de _generated_occurrences (None = leerlo)
+            radius_cm: Radio que debe quedar libre (None = el del CS)
+        """
+        if generated is None:
+            generated = self._generated_occurrences()
+        radius = radius_cm or self.calc.get_circular_spline_geometry()['outer_diameter'] / 20
+        edges = [drive['origin'][0] + (drive['radius'] or radius) for _, _, _, drive in generated]
+        if not edges:
+            return self.origin
+        return (max(edges) + DRIVE_GAP / 10 + radius, self.origin[1])
+    
+    def _place_copy(self, generated, settings, build_mode, thickness_mm, cup_factor):
+        """
+        Prefijo y origen de una copia nueva
+        
+        Si un HD del diseño tiene el mismo hash de contenido que la copia,
+        ésta usa su prefijo (y sus parámetros, que ya tienen los mismos
+        valores); si no, toma el siguiente prefijo libre.
+        """
+        signatures = self._signatures(settings, build_mode, thickness_mm, cup_factor)
+        content_hash = self._content_hash(signatures, thickness_mm, cup_factor)
+        identical = [drive['prefix'] for _, _, _, drive in generated
+                     if drive['content'] == content_hash]
+        self.parameter_prefix = identical[0] if identical else self.next_parameter_prefix()
+        self.origin = self.free_origin(generated)
+    
+    def next_parameter_prefix(self, taken=()):
+        """
+        Primer prefijo libre del diseño: HD, HD2, HD3...
+        
+        Args:
+            taken: Prefijos reservados además de los del diseño
+        """
+        used = self.parameter_prefixes() | set(taken)
+        prefix, index = PARAM_PREFIX, 1
+        while prefix in used:
+            index += 1
+            prefix = f'{PARAM_PREFIX}{index}'
+        return prefix
+    
+    def _update_user_parameters(self, thickness_mm, cup_factor):
+        """Crea o actualiza los parámetros de usuario (se anotan para rollback)"""
+        for name, expression, units, comment in self._user_parameters(thickness_mm, cup_factor):
+            previous = self.fusion.parametro_usuario(name, expression, units, comment)
+            if previous != expression:
+                self._parameter_undo.append((name, previous))
+    
+    def _signatures(self, settings, build_mode, thickness_mm, cup_factor):
+        """
+        Firma de lo que define el sketch de cada componente: {'cs', 'fs', 'wg'}
+        
+        Cada parte firma sólo lo que usa: su geometría (get_*_geometry) y,
+        CS y FS, sus ajustes de dientes; el FS también su apariencia, que
+        depende del material. Así cambiar el material o la tolerancia de
+        impresión no reconstruye nada y el ángulo de presión no toca el WG.
+        No entran las cotas que son parámetros de usuario; en modo directo
+        no hay parámetros y el espesor y la copa también entran en la
+        firma. Tampoco el prefijo de los parámetros: HD idénticos con otro
+        prefijo tienen las mismas firmas y quien reutiliza un componente
+        paramétrico compara el prefijo aparte.
+        """
+        common = (build_mode, self.tooth_mode)
+        if build_mode == 'direct':
+            common += (thickness_mm, cup_factor)
+        
+        def signature(part, geometry, *values):
+            geometry = sorted(
+                (key, round(float(value), 9) if isinstance(value, (int, float)) else value)
+                for key, value in geometry.items()
+            )
+            content = common + (part, geometry) + values
+            return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()[:16]
+        
+        return {
+            'cs': signature('cs', self.calc.get_circular_spline_geometry(),
+                            sorted(settings['cs'].items())),
+            'fs': signature('fs', self.calc.get_flex_spline_geometry(),
+                            sorted(settings['fs'].items()), self._fs_appearance()),
+            'wg': signature('wg', self.calc.get_wave_generator_geometry())
+        }
+    
+    def _content_hash(self, signatures, thickness_mm, cup_factor):
+        """
+        Hash canónico de un HD completo: firmas de sus partes y cotas
+        
+        No depende del prefijo ni de la posición: el mismo HD en otro
+        diseño o bajo otro prefijo tiene el mismo hash.
+        """
+        content = (sorted(signatures.items()), float(thickness_mm), float(cup_factor))
+        return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()[:16]
+    
+    def _generated_occurrences(self, root=None):
+        """
+        Ocurrencias generadas antes en el diseño (o en otro componente raíz)
+        
+        Un HD insertado de una biblioteca es una sola ocurrencia de parte
+        LIBRARY_PART cuya firma es el hash de contenido del HD.
+        
+        Returns:
+            Lista de (ocurrencia, parte, firma, HD); el HD es la marca de la
+            ocurrencia (ver _tag_drive), con origin (x, y) en cm, radius en
+            cm y content en None si la ocurrencia no la tiene
+        """
+        generated = []
+        occurrences = (root or self.root).occurrences
+        for i in range(occurrences.count):
+            occurrence = occurrences.item(i)
+            tag = occurrence.attributes.itemByName(ATTRIBUTE_GROUP, 'drive')
+            drive = {'prefix': PARAM_PREFIX, 'origin': (0.0, 0.0), 'radius': None, 'content': None}
+            if tag is not None:
+                drive.update(json.loads(tag.value))
+                drive['origin'] = tuple(drive['origin'])
+            if drive.get('part') == LIBRARY_PART:
+                generated.append((occurrence, LIBRARY_PART, drive['content'], drive))
+                continue
+            
+            attributes = occurrence.component.attributes
+            part = attributes.itemByName(ATTRIBUTE_GROUP, 'part')
+            if part is None:
+                continue
+            signature = attributes.itemByName(ATTRIBUTE_GROUP, 'signature')
+            generated.append((occurrence, part.value, signature.value if signature else None, drive))
+        return generated
+    
+    def _find_library_document(self, library, content_hash):
+        """
+        Documento abierto de library con un HD de ese hash
+        
+        addByInsert trae el documento entero, así que sólo sirven los que
+        tienen ese único HD: todas sus ocurrencias marcadas con el mismo
+        prefijo y origen, sin copias ni otros componentes.
+        
+        Returns:
+            (documento, origen del HD en el documento) o None si no hay
+        """
+        if not library:
+            return None
+        documents = self.app.documents
+        for i in range(documents.count):
+            document = documents.item(i)
+            if document.name not in library or document.dataFile is None:
+                continue
+            design = document.products.itemByProductType('DesignProductType')
+            if design is None or design == self.design:
+                continue
+            root = design.rootComponent
+            generated = self._generated_occurrences(root)
+            drives = {(drive['prefix'], drive['origin'], drive['content'])
+                      for _, _, _, drive in generated}
+            if len(generated) != root.occurrences.count or len(drives) != 1:
+                continue
+            _, origin, content = drives.pop()
+            if content == content_hash:
+                return document, origin
+        return None
+    
+    def _insert_library_drive(self, placements, document=None, library_origin=(0.0, 0.0),
+                              component=None):
+        """
+        Inserta un HD de biblioteca en cada lugar y lo marca como HD del diseño
+        
+        Se inserta el documento o, si ya está en el diseño, se instancia su
+        componente. El HD del documento está en library_origin; la
+        ocurrencia se traslada para dejarlo en cada lugar.
+        """
+        occurrences = self.root.occurrences
+        for origin in placements:
+            if component is not None:
+                transform = self._translation(0.0, origin)
+                occurrence = occurrences.addExistingComponent(component, transform)
+            else:
+                shifted = (origin[0] - library_origin[0], origin[1] - library_origin[1])
+                occurrence = occurrences.addByInsert(
+                    document.dataFile, self._translation(0.0, shifted), True
+                )
+            self._occurrences.append(occurrence)
+            self._tag_drive(occurrence, origin, part=LIBRARY_PART)
+    
+    def _tag_occurrence(self, occurrence, part, signature):
+        """Marca el componente de una ocurrencia con su parte y su firma"""
+        attributes = occurrence.component.attributes
+        attributes.add(ATTRIBUTE_GROUP, 'part', part)
+        attributes.add(ATTRIBUTE_GROUP, 'signature', signature)
+        self._tag_drive(occurrence)
+    
+    def _tag_drive(self, occurrence, origin=None, part=None):
+        """
+        Marca una ocurrencia con el HD al que pertenece
+        
+        La marca va en la ocurrencia y no en el componente, que las copias
+        comparten: prefijo, origen (por defecto el del generador), radio
+        exterior y hash de contenido. Es la entrada del HD en el diseño,
+        también cuando el diseño sirve de biblioteca. Un HD de biblioteca
+        lleva además su parte (LIBRARY_PART), porque su componente es la
+        raíz del documento insertado y no se puede marcar.
+        """
+        drive = dict(self._drive, origin=list(origin or self.origin))
+        if part is not None:
+            drive['part'] = part
+        occurrence.attributes.add(ATTRIBUTE_GROUP, 'drive', json.dumps(drive))
+    
+    def _move_occurrence(self, occurrence, z_offset_cm, origin=None):
+        """
+        Lleva una ocurrencia existente a su desplazamiento en Z
+        
+        La posición anterior se anota para rollback; si no cambia, la
+        ocurrencia no se toca.
+        """
+        transform = self._translation(z_offset_cm, origin)
+        previous = occurrence.transform
+        if previous.isEqualTo(transform):
+            return
+        self._transform_undo.append((occurrence, previous))
+        occurrence.transform = transform
+    
+    def _translation(self, z_offset_cm, origin=None):
+        """Matriz de traslación al origen del HD (u otro), desplazada en Z"""
+        transform = adsk.core.Matrix3D.create()
+        x, y = origin or self.origin
+        if x or y or z_offset_cm:
+            transform.translation = adsk.core.Vector3D.create(x, y, z_offset_cm)
+        return transform
+    
+    def _cylinder(self, radius_cm, height_cm):
+        """Cilindro temporal sobre el eje Z desde z = 0"""
+        return adsk.fusion.TemporaryBRepManager.get().createCylinderOrCone(
+            adsk.core.Point3D.create(0, 0, 0), radius_cm,
+            adsk.core.Point3D.create(0, 0, height_cm), radius_cm
+        )
+    
+    def _tooth_loop(self, geometry, is_internal, points_per_tooth):
+        """
+        Contorno de todos los dientes como bordes de FusionWrapper.crear_prisma_brep
+        
+        Es el mismo contorno que dibuja _draw_teeth: flancos ajustados con
+        arcos de punta y raíz, o los trapecios o la polilínea como líneas.
+        """
+        if self.tooth_profile != 'involute':
+            points = self._tooth_points(geometry, is_internal, points_per_tooth)
+            points = [tuple(point) for point in points.reshape(-1, 2).tolist()]
+            return [('line', points[i], points[(i + 1) % len(points)])
+                    for i in range(len(points))]
+        
+        splines = self._tooth_splines(is_internal, points_per_tooth)
+        pitch = splines['tooth_pitch']
+        edges = []
+        for i in range(geometry['teeth']):
+            right = splines['right'].rotated(i * pitch)
+            left = splines['left'].rotated(i * pitch)
+            next_start = splines['right'].rotated((i + 1) * pitch).start_point
+            edges.append(('nurbs', right))
+            edges.append(('arc', right.end_point,
+                          self._arc_mid_point(right.end_point, left.start_point),
+                          left.start_point))
+            edges.append(('nurbs', left))
+            edges.append(('arc', left.end_point,
+                          self._arc_mid_point(left.end_point, next_start),
+                          next_start))
+        return edges
+    
+    def _create_circular_spline_direct(self, geometry, thickness_mm, generate_teeth, points_per_tooth):
+        """Crea el Circular Spline con B-Rep temporal (sin sketch ni extrusión)"""
+        tbm = adsk.fusion.TemporaryBRepManager.get()
+        height_cm = thickness_mm / 10
+        
+        body = self._cylinder(geometry['outer_diameter'] / 20, height_cm)
+        if generate_teeth:
+            hole = self.fusion.crear_prisma_brep(
+                self._tooth_loop(geometry, True, points_per_tooth), height_cm
+            )
+        else:
+            hole = self._cylinder(geometry['addendum_diameter'] / 20, height_cm)
+        tbm.booleanOperation(body, hole, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+        
+        cs_comp = self._add_component(
+            f"CircularSpline_{self.params.teeth_cs}T_{self.params.ratio:.0f}to1"
+        )
+        for inserted in self.fusion.insertar_cuerpos(cs_comp, [body]):
+            self._apply_appearance(inserted, 'Steel', 180, 180, 190)
+    
+    def _create_flex_spline_direct(self, geometry, thickness_mm, cup_factor,
+                                   generate_teeth, points_per_tooth):
+        """Crea el Flex Spline con B-Rep temporal (sin sketch ni extrusión)"""
+        tbm = adsk.fusion.TemporaryBRepManager.get()
+        cup_length_cm = geometry['cup_length'] * cup_factor / 10
+        inner_radius_cm = geometry['inner_diameter'] / 20
+        
+        if generate_teeth:
+            body = self.fusion.crear_prisma_brep(
+                self._tooth_loop(geometry, False, points_per_tooth), cup_length_cm
+            )
+        else:
+            body = self._cylinder(geometry['addendum_diameter'] / 20, cup_length_cm)
+        tbm.booleanOperation(
+            body, self._cylinder(inner_radius_cm, cup_length_cm),
+            adsk.fusion.BooleanTypes.DifferenceBooleanType
+        )
+        
+        # Fondo de la copa
+        tbm.booleanOperation(
+            body, self._cylinder(inner_radius_cm, self.params.module / 10 * 3),
+            adsk.fusion.BooleanTypes.UnionBooleanType
+        )
         
+        fs_comp = self._add_component(
+            f"FlexSpline_{self.params.teeth_fs}T_Flexible", thickness_mm / 10 * 0.1
+        )
+        for inserted in self.fusion.insertar_cuerpos(fs_comp, [body]):
+            self._apply_appearance(inserted, *self._fs_appearance())
+    
+    def _create_wave_generator_direct(self, geometry, thickness_mm):
+        """Crea el Wave Generator con B-Rep temporal (sin sketch ni extrusión)"""
+        tbm = adsk.fusion.TemporaryBRepManager.get()
+        height_cm = geometry['height'] / 10
+        major_cm = geometry['major_radius'] / 10
+        minor_cm = geometry['minor_radius'] / 10
+        
+        body = tbm.createEllipticalCylinderOrCone(
+            adsk.core.Point3D.create(0, 0, 0), major_cm, minor_cm,
+            adsk.core.Point3D.create(0, 0, height_cm), major_cm,
+            adsk.core.Vector3D.create(1, 0, 0)
+        )
+        tbm.booleanOperation(
+            body, self._cylinder(geometry['shaft_diameter'] / 20, height_cm),
+            adsk.fusion.BooleanTypes.DifferenceBooleanType
+        )
+        
+        wg_comp = self._add_component(
+            f"WaveGenerator_e{self.params.eccentricity:.2f}mm", thickness_mm / 10 * 0.2
+        )
+        for inserted in self.fusion.insertar_cuerpos(wg_comp, [body]):
+            self._apply_appearance(inserted, 'Aluminum_Red', 200, 100, 100)
+    
+    def _ring_profile(self, sketch):
+        """Perfil del anillo entre dos círculos concéntricos (el de 2 lazos)"""
+        profiles = sketch.profiles
+        for i in range(profiles.count):
+            profile = profiles.item(i)
+            if profile.profileLoops.count == 2:
+                return profile
+        return profiles.item(0)
+    
+    def _tooth_radii(self, geometry, is_internal):
+        """Radios (cm) de la base y la punta del diente trapezoidal"""
+        pitch_radius_cm = geometry['pitch_radius'] / 10
+        addendum_cm = self.params.addendum_factor * self.params.module / 10
+        dedendum_cm = self.params.dedendum_factor * self.params.module / 10
+        
+        if is_internal:
+            # Para engranaje interno la base queda fuera y la punta dentro
+            return pitch_radius_cm + dedendum_cm, pitch_radius_cm - addendum_cm
+        # Para engranaje externo
+        return pitch_radius_cm - dedendum_cm, pitch_radius_cm + addendum_cm
+    
+    def _tooth_seed_points(self, geometry, is_internal):
+        """
+        Polígono (cm) que se replica con el patrón circular
+        
+        Para el FS es un diente; para el CS es el hueco entre el diente 0 y
+        el 1. En ambos casos el lado que cierra el polígono es una cuerda
+        del círculo de raíz/punta, que queda dentro del cuerpo (FS) o del
+        agujero (CS), de modo que el patrón reproduce el contorno de _draw_teeth.
+        """
+        angle_per_tooth = 2 * math.pi / geometry['teeth']
+        tooth_width = angle_per_tooth * 0.35
+        space_width = angle_per_tooth * 0.35
+        base_r, tip_r = self._tooth_radii(geometry, is_internal)
+        
+        if is_internal:
+            polar = [
+                (tip_r, tooth_width / 4),                       # Punta derecha diente 0
+                (base_r, space_width / 2),                      # Base derecha diente 0
+                (base_r, angle_per_tooth - space_width / 2),    # Base izquierda diente 1
+                (tip_r, angle_per_tooth - tooth_width / 4),     # Punta izquierda diente 1
+            ]
+        else:
+            polar = [
+                (base_r, -space_width / 2),   # Base izquierda
+                (tip_r, -tooth_width / 4),    # Punta izquierda
+                (tip_r, tooth_width / 4),     # Punta derecha
+                (base_r, space_width / 2),    # Base derecha
+            ]
+        
+        return [(r * math.cos(angle), r * math.sin(angle)) for r, angle in polar]
+    
+    def _pattern_ring_radius(self, geometry, is_internal, points_per_tooth):
+        """
+        Radio (cm) del anillo sobre el que se replican los dientes del patrón
+        
+        Es el círculo de punta del CS (borde del agujero) o el de raíz del FS
+        (borde de la copa), según el perfil de diente en uso.
+        """
+        if self.tooth_profile != 'trapezoid':
+            splines = self._tooth_splines(is_internal, points_per_tooth)
+            return splines['tip_radius'] if is_internal else splines['root_radius']
+        
+        base_r, tip_r = self._tooth_radii(geometry, is_internal)
+        return tip_r if is_internal else base_r
+    
+    def _pattern_teeth(self, comp, geometry, is_internal, distance, points_per_tooth):
+        """
+        Dibuja un solo diente (o hueco), lo extruye y lo replica con un patrón
+        
+        El CS corta el hueco del anillo y el FS une el diente a la copa, así
+        el coste en el sketch es el de un diente para cualquier número de dientes.
+        """
+        sketch = comp.sketches.add(comp.xYConstructionPlane)
+        # Un solo diente no justifica la polilínea: se usan los flancos ajustados
+        if self.tooth_profile != 'trapezoid':
+            self._draw_involute_seed(
+                sketch, self._tooth_splines(is_internal, points_per_tooth), is_internal
+            )
+        else:
+            self.fusion.dibujar_polilinea(
+                sketch, self._tooth_seed_points(geometry, is_internal), cerrada=True
+            )
+        
+        operation = (
+            adsk.fusion.FeatureOperations.CutFeatureOperation if is_internal
+            else adsk.fusion.FeatureOperations.JoinFeatureOperation
+        )
+        extrudes = comp.features.extrudeFeatures
+        extrude_input = extrudes.createInput(sketch.profiles.item(0), operation)
+        extrude_input.setDistanceExtent(False, adsk.core.ValueInput.createByString(distance))
+        seed = extrudes.add(extrude_input)
+        
+        return self.fusion.patron_circular(
+            seed, comp.zConstructionAxis, geometry['teeth'], comp
+        )
+    
+    def _shard_teeth_steps(self, comp, geometry, is_internal, distance, points_per_tooth):
+        """
+        Dibuja los dientes (FS) o huecos (CS) por sectores y los extruye
+        
+        Cada sector tiene a lo sumo SHARD_ENTITY_BUDGET entidades en su propio
+        sketch, así el cálculo de perfiles de cada uno no crece con el número
+        de dientes. Los contornos son los del diente semilla de _pattern_teeth,
+        girados; cada sector se une a la copa (FS) o se corta del anillo (CS)
+        con una sola extrusión de todos sus perfiles. Cede los dientes de
+        cada sector.
+        """
+        shard_size = max(1, SHARD_ENTITY_BUDGET // self._entities_per_tooth(points_per_tooth))
+        operation = (
+            adsk.fusion.FeatureOperations.CutFeatureOperation if is_internal
+            else adsk.fusion.FeatureOperations.JoinFeatureOperation
+        )
+        extrudes = comp.features.extrudeFeatures
+        shards = prefetch(self._shard_outlines(geometry, is_internal, points_per_tooth, shard_size))
+        
+        with closing(shards):
+            for shard in shards:
+                sketch = comp.sketches.add(comp.xYConstructionPlane)
+                with self.fusion.calculo_diferido(sketch):
+                    for outline in shard:
+                        if self.tooth_profile == 'involute':
+                            self._draw_involute_seed(sketch, outline, is_internal)
+                        else:
+                            self.fusion.dibujar_polilinea(sketch, outline, cerrada=True)
+                
+                profiles = adsk.core.ObjectCollection.create()
+                for i in range(sketch.profiles.count):
+                    profiles.add(sketch.profiles.item(i))
+                extrude_input = extrudes.createInput(profiles, operation)
+                extrude_input.setDistanceExtent(
+                    False, adsk.core.ValueInput.createByString(distance)
+                )
+                extrudes.add(extrude_input)
+                yield len(shard)
+    
+    def _shard_outlines(self, geometry, is_internal, points_per_tooth, shard_size):
+        """
+        Contornos cerrados de cada diente (FS) o hueco (CS), por sectores
+        
+        No llama a la API de Fusion (ver prefetch). Con involuta cada
+        contorno es un diccionario de flancos para _draw_involute_seed; con
+        trapecio o polilínea, los vértices (n, 2) de un polígono cerrado.
+        """
+        num_teeth = geometry['teeth']
+        
+        if self.tooth_profile == 'involute':
+            splines = self._tooth_splines(is_internal, points_per_tooth)
+            pitch = splines['tooth_pitch']
+            outline = lambda i: dict(
+                splines,
+                right=splines['right'].rotated(i * pitch),
+                left=splines['left'].rotated(i * pitch)
+            )
+        elif self.tooth_profile == 'trapezoid':
+            seeds = _rotate_teeth(
+                np.array(self._tooth_seed_points(geometry, is_internal)),
+                2 * math.pi / num_teeth, num_teeth
+            )
+            outline = lambda i: seeds[i]
+        else:
+            points = self._tooth_points(geometry, is_internal, points_per_tooth)
+            half = points.shape[1] // 2
+            if is_internal:
+                # Hueco: flanco izquierdo de un diente y derecho del siguiente
+                outline = lambda i: np.vstack((points[i][half:], points[(i + 1) % num_teeth][:half]))
+            else:
+                outline = lambda i: points[i]
+        
+        for start in range(0, num_teeth, shard_size):
+            yield [outline(i) for i in range(start, min(start + shard_size, num_teeth))]
+    
+    def _tooth_splines(self, is_internal, points_per_tooth):
+        """Flancos ajustados del diente base en cm (ver get_tooth_splines)"""
+        if is_internal:
+            splines = self.profile_gen.get_cs_tooth_splines(points_per_tooth, self.fit_tolerance)
+        else:
+            splines = self.profile_gen.get_fs_tooth_splines(points_per_tooth, self.fit_tolerance)
+        
+        # El perfil está en mm y Fusion trabaja en cm
+        return {
+            'right': splines['right'].scaled(0.1),
+            'left': splines['left'].scaled(0.1),
+            'tip_radius': splines['tip_radius'] / 10,
+            'root_radius': splines['root_radius'] / 10,
+            'tooth_pitch': splines['tooth_pitch']
+        }
+    
+    def _tooth_points(self, geometry, is_internal, points_per_tooth):
+        """
+        Vértices (cm) de los dientes trapezoidales o en polilínea
+        
+        Returns:
+            Array (dientes, puntos, 2); el contorno es la concatenación de
+            todos los dientes, cerrado del último vértice al primero
+        """
+        if self.tooth_profile == 'trapezoid':
+            return np.array(self._trapezoid_points(geometry, is_internal)).reshape(-1, 4, 2)
+        
+        if is_internal:
+            polyline = self.profile_gen.get_cs_tooth_polyline(points_per_tooth)
+        else:
+            polyline = self.profile_gen.get_fs_tooth_polyline(points_per_tooth)
+        
+        # El perfil está en mm y Fusion trabaja en cm
+        tooth = np.vstack((polyline['right'], polyline['left'])) / 10
+        return _rotate_teeth(tooth, polyline['tooth_pitch'], geometry['teeth'])
+    
+    def _arc_mid_point(self, start, end):
+        """
+        Punto medio (x, y) del arco centrado en el origen entre start y end
+        
+        Se toma sobre el radio medio en el ángulo intermedio (el arco corto).
+        """
+        angle1 = math.atan2(start[1], start[0])
+        angle2 = math.atan2(end[1], end[0])
+        sweep = math.remainder(angle2 - angle1, 2 * math.pi)
+        radius = (math.hypot(*start) + math.hypot(*end)) / 2
+        mid_angle = angle1 + sweep / 2
+        return (radius * math.cos(mid_angle), radius * math.sin(mid_angle))
+    
+    def _add_arc(self, sketch, start, end, start_point, end_point):
+        """
+        Arco centrado en el origen entre dos SketchPoints existentes
+        
+        start/end son las coordenadas (x, y) de esos puntos.
+        """
+        x, y = self._arc_mid_point(start, end)
+        mid = adsk.core.Point3D.create(x, y, 0)
+        return sketch.sketchCurves.sketchArcs.addByThreePoints(start_point, mid, end_point)
+    
+    def _draw_involute_seed(self, sketch, splines, is_internal):
+        """
+        Contorno cerrado de un diente (FS) o de un hueco (CS) con flancos ajustados
+        
+        Equivale a _tooth_seed_points: el lado que cierra el contorno es una
+        cuerda del círculo de raíz (FS) o de punta (CS).
+        """
         lines = sketch.sketchCurves.sketchLines
+        
+        with self.fusion.calculo_diferido(sketch):
+            if is_internal:
+                # Hueco entre el flanco izquierdo del diente 0 y el derecho del 1
+                first_curve = splines['left']
+                second_curve = splines['right'].rotated(splines['tooth_pitch'])
+            else:
+                first_curve = splines['right']
+                second_curve = splines['left']
+            
+            first = self.fusion.dibujar_nurbs(sketch, first_curve)
+            second = self.fusion.dibujar_nurbs(sketch, second_curve)
+            
+            # Arco de raíz (CS) o de punta (FS) entre los dos flancos
+            self._add_arc(sketch, first_curve.end_point, second_curve.start_point,
+                          first.endSketchPoint, second.startSketchPoint)
+            lines.addByTwoPoints(second.endSketchPoint, first.startSketchPoint)
+    
+    def _tooth_batches(self, geometry, is_internal, points_per_tooth):
+        """
+        Geometría offline de los dientes en lotes de self.batch_size
+        
+        No llama a la API de Fusion, así que puede correr en el hilo de
+        trabajo (ver prefetch). Cada lote es una lista con, por diente, los
+        flancos (derecho, izquierdo) ajustados o los vértices del trapecio o
+        de la polilínea.
+        """
+        num_teeth = geometry['teeth']
+        
+        if self.tooth_profile == 'involute':
+            splines = self._tooth_splines(is_internal, points_per_tooth)
+            pitch = splines['tooth_pitch']
+            teeth = lambda i: (splines['right'].rotated(i * pitch),
+                               splines['left'].rotated(i * pitch))
+        else:
+            points = self._tooth_points(geometry, is_internal, points_per_tooth)
+            teeth = lambda i: points[i]
+        
+        for start in range(0, num_teeth, self.batch_size):
+            yield [teeth(i) for i in range(start, min(start + self.batch_size, num_teeth))]
+    
+    def _draw_teeth(self, sketch, geometry, is_internal, points_per_tooth):
+        """Dibuja los dientes con el perfil seleccionado"""
+        for _ in self._draw_teeth_steps(sketch, geometry, is_internal, points_per_tooth):
+            pass
+    
+    def _import_teeth_dxf(self, comp, geometry, is_internal, points_per_tooth, radii_cm=()):
+        """
+        Importa el anillo de dientes desde un DXF temporal y devuelve su sketch
+        
+        El contorno se calcula fuera de Fusion y se escribe de una vez, junto
+        con los círculos centrados de radii_cm, en lugar de crear cada entidad
+        con la API. R12 no tiene splines: la involuta llega como polilínea de
+        los puntos por diente. Fusion lee el DXF en la unidad de longitud del
+        diseño, así que se escribe en esa unidad. Cede los dientes importados.
+        """
+        units = self.design.unitsManager.defaultLengthUnits
+        outline = self._tooth_points(geometry, is_internal, points_per_tooth).reshape(-1, 2)
+        path = write_dxf([outline], [(0.0, 0.0, radius) for radius in radii_cm], units)
+        
+        try:
+            import_manager = self.app.importManager
+            options = import_manager.createDXF2DImportOptions(path, comp.xYConstructionPlane)
+            options.isSingleSketchResult = True
+            import_manager.importToTarget(options, comp)
+        finally:
+            os.remove(path)
+        
+        yield geometry['teeth']
+        return options.results.item(0)
+    
+    def _draw_teeth_steps(self, sketch, geometry, is_internal, points_per_tooth):
+        """
+        Dibuja los dientes por lotes, cediendo el número de dientes de cada lote
+        
+        Con involuta cada flanco es una spline fija de pocos puntos de control;
+        la punta y la raíz son arcos que comparten los extremos de los flancos,
+        así el contorno queda cerrado con 4 entidades por diente. Con trapecios
+        o polilínea el contorno es una sola polilínea que continúa de un lote
+        al siguiente.
+        La geometría de los lotes se calcula por adelantado en un hilo de trabajo.
+        """
+        batches = prefetch(self._tooth_batches(geometry, is_internal, points_per_tooth))
+        
+        with closing(batches), self.fusion.calculo_diferido(sketch):
+            if self.tooth_profile == 'involute':
+                first_right = None
+                previous_left = None
+                previous_left_end = None
+                
+                for batch in batches:
+                    for right_curve, left_curve in batch:
+                        right = self.fusion.dibujar_nurbs(sketch, right_curve)
+                        left = self.fusion.dibujar_nurbs(sketch, left_curve)
+                        
+                        # Punta del diente
+                        self._add_arc(sketch, right_curve.end_point, left_curve.start_point,
+                                      right.endSketchPoint, left.startSketchPoint)
+                        
+                        # Raíz entre el diente anterior y éste
+                        if previous_left is None:
+                            first_right = (right, right_curve)
+                        else:
+                            self._add_arc(sketch, previous_left_end, right_curve.start_point,
+                                          previous_left.endSketchPoint, right.startSketchPoint)
+                        
+                        previous_left = left
+                        previous_left_end = left_curve.end_point
+                    yield len(batch)
+                
+                # Cerrar con la raíz entre el último diente y el primero
+                right, right_curve = first_right
+                self._add_arc(sketch, previous_left_end, right_curve.start_point,
+                              previous_left.endSketchPoint, right.startSketchPoint)
+            else:
+                first_point = None
+                last_point = None
+                
+                for batch in batches:
+                    points = [point for tooth in batch for point in tooth]
+                    lines = self.fusion.dibujar_polilinea(
+                        sketch, points, cerrada=False, punto_inicial=last_point
+                    )
+                    if first_point is None:
+                        first_point = lines[0].startSketchPoint
+                    last_point = lines[-1].endSketchPoint
+                    yield len(batch)
+                
+                # Cerrar el contorno
+                sketch.sketchCurves.sketchLines.addByTwoPoints(last_point, first_point)
+    
+    def _trapezoid_points(self, geometry, is_internal):
+        """Vértices (cm) del contorno trapezoidal de todos los dientes"""
+        
         num_teeth = geometry['teeth']
         pitch_radius_cm = geometry['pitch_radius'] / 10
         
@@ -616,52 +2161,693 @@ class HarmonicDriveGenerator:
                 y = r * math.sin(angle)
                 all_points.append((x, y))
         
-        # Dibujar todas las líneas conectadas
-        for i in range(len(all_points)):
-            x1, y1 = all_points[i]
-            x2, y2 = all_points[(i + 1) % len(all_points)]  # Conectar con el siguiente (circular)
-            
-            p1 = adsk.core.Point3D.create(x1, y1, 0)
-            p2 = adsk.core.Point3D.create(x2, y2, 0)
-            lines.addByTwoPoints(p1, p2)
+        return all_points
     
-    def _draw_ellipse(self, sketch, major_radius_cm, minor_radius_cm, num_points):
-        """Dibuja una elipse usando spline"""
+    def outline_loops(self, part, generate_teeth=True, points_per_tooth=20):
+        """
+        Contornos (cm) de una parte para la vista previa, sin tocar la API
         
-        curves = sketch.sketchCurves
-        points = adsk.core.ObjectCollection.create()
+        Args:
+            part: 'cs', 'fs' o 'wg'
+            generate_teeth: Si dibujar los dientes o sólo su círculo
+            points_per_tooth: Puntos por diente del perfil involuta
         
-        for i in range(num_points):
-            angle = 2 * math.pi * i / num_points
-            x = major_radius_cm * math.cos(angle)
-            y = minor_radius_cm * math.sin(angle)
-            points.add(adsk.core.Point3D.create(x, y, 0))
+        Returns:
+            Lista de lazos cerrados, cada uno un array (n, 2)
+        """
+        if part == 'wg':
+            geometry = self.calc.get_wave_generator_geometry()
+            return [
+                _ellipse_points(geometry['major_radius'] / 10, geometry['minor_radius'] / 10),
+                _ellipse_points(geometry['shaft_diameter'] / 20)
+            ]
+        
+        is_internal = part == 'cs'
+        if is_internal:
+            geometry = self.calc.get_circular_spline_geometry()
+            other = _ellipse_points(geometry['outer_diameter'] / 20)
+        else:
+            geometry = self.calc.get_flex_spline_geometry()
+            other = _ellipse_points(geometry['inner_diameter'] / 20)
+        
+        if generate_teeth:
+            teeth = self._tooth_outline(geometry, is_internal, points_per_tooth)
+        else:
+            teeth = _ellipse_points(geometry['addendum_diameter'] / 20)
+        return [other, teeth]
+    
+    def _tooth_outline(self, geometry, is_internal, points_per_tooth):
+        """
+        Contorno (n, 2) en cm de todos los dientes con el perfil seleccionado
+        
+        Con involuta se muestrean los flancos ajustados del diente base y se
+        giran todos los dientes a la vez; puntas y raíces quedan como cuerdas,
+        suficiente para la vista previa.
+        """
+        if self.tooth_profile != 'involute':
+            return self._tooth_points(geometry, is_internal, points_per_tooth).reshape(-1, 2)
         
-        points.add(points.item(0))  # Cerrar la curva
-        spline = curves.sketchFittedSplines.add(points)
+        splines = self._tooth_splines(is_internal, points_per_tooth)
+        flanks = []
+        for curve in (splines['right'], splines['left']):
+            u = np.linspace(curve.knots[0], curve.knots[-1], PREVIEW_FLANK_SAMPLES)
+            flanks.append(curve.evaluate(u))
+        tooth = np.vstack(flanks)
+        return _rotate_teeth(tooth, splines['tooth_pitch'], geometry['teeth']).reshape(-1, 2)
+    
+    def _draw_ellipse(self, sketch, major_radius_cm, minor_radius_cm):
+        """Dibuja una elipse exacta como una sola spline NURBS"""
+        return self.fusion.dibujar_nurbs(sketch, ellipse_nurbs(major_radius_cm, minor_radius_cm))
+    
+    def _fs_appearance(self):
+        """Apariencia del Flex Spline según su material: (nombre, r, g, b)"""
+        if self.params.material == 'tpu':
+            return ('TPU_Orange', 255, 150, 100)
+        return ('Plastic_Green', 100, 200, 100)
     
     def _apply_appearance(self, body, name, r, g, b):
-        """Aplica apariencia a un cuerpo"""
+        """
+        Aplica apariencia a un cuerpo
+        
+        Una apariencia que no se puede crear no detiene la generación: el
+        error queda en el registro de Fusion y en self.warnings.
+        """
         try:
-            appearances = self.design.appearances
-            
-            appearance = None
-            for i in range(appearances.count):
-                if appearances.item(i).name == name:
-                    appearance = appearances.item(i)
-                    break
-            
-            if not appearance:
-                appearance = appearances.add()
-                appearance.name = name
-                color_prop = appearance.appearanceProperties.itemByName('Color')
-                if color_prop:
-                    color_value = adsk.core.Color.create(r, g, b, 255)
-                    color_prop.value = color_value
-            
-            body.appearance = appearance
-        except:
-            pass
+            body.appearance = appearance_cache.get(self.design, name, r, g, b)
+        except Exception as e:
+            message = f'Apariencia {name} no aplicada: {e}'
+            self.warnings.append(message)
+            self.app.log(message)
+
+def batch_variants(ratios, modules, materials=('steel',), pressure_angles=(30.0,),
+                   print_tolerance=0.2):
+    """
+    Variantes de la cuadrícula relación × módulo × material × ángulo de presión
+    
+    Returns:
+        Lista de HarmonicDriveParams sin repetidas, en el orden de la cuadrícula
+    """
+    variants = (
+        HarmonicDriveParams(
+            teeth_cs=int(ratio) * 2,
+            module=float(module),
+            pressure_angle=float(pressure_angle),
+            material=material,
+            print_tolerance=print_tolerance
+        )
+        for ratio, module, material, pressure_angle in itertools.product(
+            ratios, modules, materials, pressure_angles
+        )
+    )
+    return list(dict.fromkeys(variants))
+
+def _variant_label(params):
+    """Texto corto de una variante: relación, módulo, material y ángulo"""
+    return (f'{params.ratio:g}:1 m{params.module:g} {params.material} '
+            f'{params.pressure_angle:g}°')
+
+class HarmonicDriveBatch:
+    """
+    Genera varias variantes de Harmonic Drive en una sola corrida
+    
+    Las variantes comparten las cachés del proceso: calculadoras, perfiles
+    involuta con sus flancos y splines (get_involute_profile, que también
+    sirve el diente semilla del patrón) y las apariencias de cada diseño.
+    En cuadrícula todas quedan en el diseño activo, cada una con sus propios
+    parámetros de usuario (los prefijos libres del diseño: HD_, HD2_...) y
+    la cuadrícula a la derecha de los HD que ya había; con 'documents' cada
+    variante va a un documento nuevo. Tiene la misma interfaz que
+    HarmonicDriveGenerator para GenerationJob (generate_steps y rollback).
+    """
+    
+    def __init__(self, variants, layout='grid', **options):
+        """
+        Args:
+            variants: HarmonicDriveParams de cada variante (ver batch_variants)
+            layout: Distribución (ver BATCH_LAYOUTS)
+            **options: Argumentos de HarmonicDriveGenerator.generate_steps
+        """
+        if layout not in BATCH_LAYOUTS:
+            raise ValueError(f"Distribución desconocida: {layout}")
+        self.app = adsk.core.Application.get()
+        self.variants = list(variants)
+        self.layout = layout
+        self.options = options
+        
+        # Resultados: (params, segundos, nota) y (params, motivo de omisión)
+        self.timings = []
+        self.skipped = []
+        self.warnings = []
+        
+        self._generators = []
+        self._documents = []
+        self._grid_origin = (0.0, 0.0)
+    
+    def generate_steps(self):
+        """
+        Genera las variantes por partes
+        
+        Cada paso entrega (mensaje, hecho, total) como generate_steps del
+        generador. El tiempo de cada variante sólo cuenta sus pasos, no la
+        espera entre eventos.
+        """
+        self.timings, self.skipped, self.warnings = [], [], []
+        self._generators, self._documents = [], []
+        
+        variants = self._validate()
+        if not variants:
+            raise ValueError("Ninguna variante es válida")
+        
+        # Celdas de la cuadrícula del tamaño del mayor CS
+        columns = math.ceil(math.sqrt(len(variants)))
+        largest = max(
+            get_calculator(params).get_circular_spline_geometry()['outer_diameter']
+            for params, _ in variants
+        )
+        spacing_cm = (largest + BATCH_GRID_GAP) / 10
+        options = dict(self.options, new_copy=False)
+        
+        for index, (params, note) in enumerate(variants):
+            generator = self._start_variant(index, params, columns, spacing_cm)
+            label = f'[{index + 1}/{len(variants)}] {_variant_label(params)}'
+            elapsed = 0.0
+            
+            with closing(generator.generate_steps(**options)) as steps:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        message, done, total = next(steps)
+                    except StopIteration:
+                        break
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield (f'{label}: {message}',
+                           round(100 * (index + done / total)), 100 * len(variants))
+            
+            self.timings.append((params, elapsed, note))
+            self.warnings += generator.warnings
+    
+    def _validate(self):
+        """
+        Valida todas las variantes de una vez (ver validate_bulk)
+        
+        Returns:
+            Lista de (params, nota) de las que se pueden generar; las demás
+            quedan en self.skipped con su motivo
+        """
+        validation = validate_bulk(
+            [params.teeth_cs for params in self.variants],
+            [params.module for params in self.variants],
+            [params.material for params in self.variants],
+            [params.pressure_angle for params in self.variants]
+        )
+        notes = (
+            (validation.has_error('strain'), 'deformación alta'),
+            (validation.has_error('contact_ratio'), 'relación de contacto baja')
+        )
+        
+        variants = []
+        for row, params in enumerate(self.variants):
+            if int(validation.errors[row]) & ~BATCH_SOFT_ERRORS:
+                self.skipped.append((params, validation.messages(row)[0]))
+            else:
+                note = ', '.join(text for flagged, text in notes if flagged[row])
+                variants.append((params, note))
+        return variants
+    
+    def _start_variant(self, index, params, columns, spacing_cm):
+        """Prepara el documento o la celda de la cuadrícula de una variante"""
+        if self.layout == 'documents':
+            self._documents.append(self.app.documents.add(
+                adsk.core.DocumentTypes.FusionDesignDocumentType
+            ))
+            generator = HarmonicDriveGenerator(params)
+        else:
+            # Cada variante con un prefijo libre del diseño; la cuadrícula
+            # empieza a la derecha de los HD que ya había
+            generator = HarmonicDriveGenerator(params)
+            generator.parameter_prefix = generator.next_parameter_prefix(
+                taken={other.parameter_prefix for other in self._generators}
+            )
+            if index == 0:
+                self._grid_origin = generator.free_origin(radius_cm=spacing_cm / 2)
+            row, column = divmod(index, columns)
+            x, y = self._grid_origin
+            generator.origin = (x + column * spacing_cm, y - row * spacing_cm)
+        
+        self._generators.append(generator)
+        return generator
+    
+    def rollback(self):
+        """Elimina lo generado por la corrida y cierra los documentos creados"""
+        for generator in reversed(self._generators):
+            generator.rollback()
+        for document in reversed(self._documents):
+            document.close(False)
+        self._generators = []
+        self._documents = []
+    
+    def report(self):
+        """Resumen de la corrida con el tiempo de cada variante"""
+        total = sum(seconds for _, seconds, _ in self.timings)
+        lines = [f'✅ {len(self.timings)} variantes generadas en {total:.1f} s', '']
+        for params, seconds, note in self.timings:
+            line = f'• {_variant_label(params)}: {seconds:.2f} s'
+            lines.append(f'{line} ({note})' if note else line)
+        
+        if self.skipped:
+            lines += ['', f'⚠️ {len(self.skipped)} variantes omitidas:']
+            lines += [f'• {_variant_label(params)}: {reason}' for params, reason in self.skipped]
+        if self.warnings:
+            lines += ['', '⚠️ Avisos:'] + [f'• {warning}' for warning in self.warnings]
+        return '\n'.join(lines)
+
+def prefetch(iterable, depth=PREFETCH_DEPTH):
+    """
+    Consume un iterable en un hilo de trabajo, hasta depth elementos por delante
+    
+    Sólo para trabajo que no toca la API de Fusion (que debe llamarse desde
+    el hilo principal), p. ej. la geometría de los lotes de dientes. Los
+    errores del hilo se relanzan en quien consume; cerrar el generador
+    devuelto detiene el hilo.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+    
+    def put(entry):
+        # Espera lugar en la cola salvo que quien consume ya se haya ido
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((done, e))
+    
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+def neighbour_params(params, ratio_steps=SPECULATIVE_RATIO_STEPS,
+                     module_steps=SPECULATIVE_MODULE_STEPS):
+    """
+    Parámetros a los que probablemente se mueva el diálogo desde params
+    
+    Relaciones a ±1..±ratio_steps con el mismo módulo y los module_steps
+    módulos estándar más próximos a cada lado con la misma relación, dentro
+    de los límites de los spinners. Van de más cerca a más lejos, así los
+    que el usuario alcanza antes se calculan primero.
+    """
+    ratio = params.teeth_cs // 2
+    modules = [m for m in STANDARD_MODULES if MODULE_RANGE[0] <= m <= MODULE_RANGE[1]]
+    lower = [m for m in reversed(modules) if m < params.module - 1e-9][:module_steps]
+    higher = [m for m in modules if m > params.module + 1e-9][:module_steps]
+    
+    candidates = []
+    for step in range(1, max(ratio_steps, module_steps) + 1):
+        if step <= ratio_steps:
+            candidates += [(ratio + step, params.module), (ratio - step, params.module)]
+        candidates += [(ratio, m) for m in higher[step - 1:step] + lower[step - 1:step]]
+    
+    return [
+        HarmonicDriveParams(
+            teeth_cs=r * 2,
+            module=m,
+            pressure_angle=params.pressure_angle,
+            material=params.material,
+            print_tolerance=params.print_tolerance
+        )
+        for r, m in candidates
+        if RATIO_RANGE[0] <= r <= RATIO_RANGE[1]
+    ]
+
+def _warm_preview(params, generate_teeth=True, points_per_tooth=20,
+                  tooth_profile='trapezoid', lod=None, **options):
+    """
+    Llena las cachés del resumen y la vista previa de unos parámetros
+    
+    Calcula lo caro de HDrivePreview.update (geometría, nivel de detalle y
+    flancos del perfil elegido) sin tocar la API de Fusion, así se puede
+    llamar desde un hilo de trabajo.
+    """
+    _dialog_summary(params)
+    calc = get_calculator(params)
+    calc.get_wave_generator_geometry()
+    profile_gen = get_profile_generator(params)
+    
+    teeth = _teeth_settings(params, lod, generate_teeth, tooth_profile, points_per_tooth)
+    for part, settings in teeth.items():
+        if part == 'cs':
+            calc.get_circular_spline_geometry()
+        else:
+            calc.get_flex_spline_geometry()
+        if not settings['generate_teeth'] or settings['tooth_profile'] == 'trapezoid':
+            continue
+        
+        points = settings['points_per_tooth']
+        if settings['tooth_profile'] == 'involute':
+            fit = profile_gen.get_cs_tooth_splines if part == 'cs' else profile_gen.get_fs_tooth_splines
+            fit(points, settings['tolerance'])
+        elif part == 'cs':
+            profile_gen.get_cs_tooth_polyline(points)
+        else:
+            profile_gen.get_fs_tooth_polyline(points)
+
+class NeighbourPrecompute:
+    """
+    Precálculo especulativo de los valores vecinos del diálogo
+    
+    Tras cada cambio de relación, módulo o material, un hilo de trabajo
+    calcula el resumen y los perfiles de la vista previa de los parámetros
+    vecinos (ver neighbour_params). Sólo llena las cachés acotadas del
+    proceso (calculadoras, perfiles y sus flancos, niveles de detalle y
+    resúmenes), que no tocan la API de Fusion; el siguiente clic las
+    encuentra listas. Empieza tras delay segundos sin cambios, así no
+    compite con la vista previa del valor actual, y un cambio nuevo descarta
+    lo que quedaba del anterior.
+    """
+    
+    def __init__(self, delay=SPECULATIVE_IDLE_DELAY):
+        self.delay = delay
+        self.computed = 0  # Parámetros precalculados desde la creación
+        self._condition = threading.Condition()
+        self._pending = None  # (parámetros, opciones, instante de inicio)
+        self._generation = 0
+        self._busy = False
+        self._stopped = False
+        self._worker = None
+    
+    def schedule(self, params, options):
+        """Programa los vecinos de params con las opciones de la vista previa"""
+        with self._condition:
+            self._generation += 1
+            self._pending = (neighbour_params(params), dict(options),
+                             time.monotonic() + self.delay)
+            self._stopped = False
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+    
+    def cancel(self):
+        """Descarta el trabajo pendiente y el que está en curso"""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            self._condition.notify_all()
+    
+    def stop(self, timeout=1.0):
+        """Cancela y detiene el hilo de trabajo"""
+        with self._condition:
+            self._stopped = True
+        self.cancel()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+    
+    def wait(self, timeout=None):
+        """Espera a que no quede trabajo; False si venció el plazo"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+    
+    def _next(self):
+        """Próximo trabajo (parámetros, opciones, generación); None al detener"""
+        with self._condition:
+            while not self._stopped:
+                if self._pending is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._pending[2] - time.monotonic()
+                if remaining > 0:
+                    # Un cambio nuevo antes del plazo reemplaza este trabajo
+                    self._condition.wait(remaining)
+                    continue
+                variants, options, _ = self._pending
+                self._pending = None
+                self._busy = True
+                return variants, options, self._generation
+            return None
+    
+    def _run(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            variants, options, generation = job
+            try:
+                for params in variants:
+                    if self._generation != generation:
+                        break
+                    try:
+                        _warm_preview(params, **options)
+                    except Exception:
+                        # Un vecino inválido no detiene a los demás
+                        continue
+                    self.computed += 1
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+class GenerationJob:
+    """
+    Generación por partes con diálogo de progreso y cancelación
+    
+    Cada paso (un componente o un lote de dientes) corre en un evento
+    personalizado, así Fusion procesa la interfaz entre pasos. Al cancelar
+    o fallar se eliminan los componentes ya creados. summary es el texto
+    final o una función que lo arma al terminar.
+    """
+    
+    def __init__(self, app, generator, steps, summary):
+        self.app = app
+        self.ui = app.userInterface
+        self.generator = generator
+        self.steps = steps
+        self.summary = summary
+        self.running = False
+        self.result = None  # 'ok', 'cancelled' o 'error'
+        
+        self.progress = self.ui.createProgressDialog()
+        self.progress.isCancelButtonShown = True
+    
+    def start(self):
+        """Muestra el progreso y lanza el primer paso"""
+        self.running = True
+        self.progress.show('Harmonic Drive', 'Preparando...', 0, 1, 0)
+        self.app.fireCustomEvent(GENERATION_EVENT_ID)
+    
+    def step(self):
+        """Ejecuta un paso y programa el siguiente"""
+        if not self.running:
+            return
+        
+        if self.progress.wasCancelled:
+            self._finish('cancelled')
+            return
+        
+        try:
+            message, done, total = next(self.steps)
+        except StopIteration:
+            self._finish('ok')
+            return
+        except Exception as e:
+            self._finish('error', e)
+            return
+        
+        self.progress.maximumValue = total
+        self.progress.progressValue = done
+        self.progress.message = f'{message} (%v de %m)'
+        self.app.fireCustomEvent(GENERATION_EVENT_ID)
+    
+    def _finish(self, result, error=None):
+        """Cierra la generación; si no terminó, deshace lo creado"""
+        self.running = False
+        self.result = result
+        self.steps.close()
+        if result != 'ok':
+            self.generator.rollback()
+        self.progress.hide()
+        
+        if result == 'ok':
+            self.ui.messageBox(self.summary() if callable(self.summary) else self.summary)
+        elif result == 'cancelled':
+            self.ui.messageBox('Generación cancelada; se eliminaron los componentes creados')
+        else:
+            self.ui.messageBox(f'Error generando HD: {str(error)}')
+
+def _rotate_teeth(tooth, pitch, num_teeth):
+    """Diente base (n, 2) girado a cada posición: array (num_teeth, n, 2)"""
+    angles = np.arange(num_teeth) * pitch
+    cos = np.cos(angles)[:, np.newaxis]
+    sin = np.sin(angles)[:, np.newaxis]
+    x = cos * tooth[:, 0] - sin * tooth[:, 1]
+    y = sin * tooth[:, 0] + cos * tooth[:, 1]
+    return np.stack([x, y], axis=-1)
+
+def _ellipse_points(radius_x, radius_y=None, segments=PREVIEW_CIRCLE_SEGMENTS):
+    """Polígono (segments, 2) de una elipse (o círculo) centrada en el origen"""
+    if radius_y is None:
+        radius_y = radius_x
+    angles = np.linspace(0, 2 * math.pi, segments, endpoint=False)
+    return np.column_stack([radius_x * np.cos(angles), radius_y * np.sin(angles)])
+
+class HDrivePreview:
+    """
+    Vista previa del comando con gráficos personalizados
+    
+    Dibuja los contornos del CS, FS y WG como líneas sin crear componentes,
+    sketches ni features. Cada parte es un grupo de gráficos que sólo se
+    vuelve a dibujar si cambió lo que define su contorno; el espesor sólo
+    mueve los grupos en Z. Los contornos calculados se guardan en caché, así
+    volver a una combinación ya vista no recalcula nada. Si Fusion eliminó
+    los gráficos al abortar la vista previa anterior, se vuelven a crear.
+    """
+    
+    def __init__(self):
+        self._groups = {}  # parte -> (clave, grupo, z en cm)
+        self._outlines = OrderedDict()  # clave -> (coordenadas, longitudes)
+        self._generator = None
+    
+    def update(self, params, thickness_mm=20, generate_teeth=True,
+               points_per_tooth=20, tooth_profile='trapezoid', lod=None):
+        """
+        Actualiza la vista previa (argumentos como en generate)
+        
+        Returns:
+            Número de partes que se volvieron a dibujar
+        """
+        if self._generator is None or self._generator.params != params:
+            self._generator = HarmonicDriveGenerator(params)
+        root = self._generator.root
+        
+        teeth = self._generator.teeth_settings(
+            lod, generate_teeth, tooth_profile, points_per_tooth
+        )
+        keys = {'wg': (params, 'wg')}
+        for part in ('cs', 'fs'):
+            settings = dict(teeth[part])
+            # El trapecio no depende de los puntos por diente
+            if settings['tooth_profile'] == 'trapezoid':
+                settings['points_per_tooth'] = None
+            keys[part] = (params, part) + tuple(sorted(settings.items()))
+        offsets = {'cs': 0.0, 'fs': thickness_mm / 10 * 0.1, 'wg': thickness_mm / 10 * 0.2}
+        
+        redrawn = 0
+        for part, key in keys.items():
+            entry = self._groups.get(part)
+            if entry is not None and entry[0] == key and entry[1].isValid:
+                group, z = entry[1], entry[2]
+            else:
+                if entry is not None and entry[1].isValid:
+                    entry[1].deleteMe()
+                coordinates, lengths = self._outline(key, teeth.get(part))
+                group = self._draw(root, coordinates, lengths, PREVIEW_COLORS[part])
+                z = 0.0
+                redrawn += 1
+            
+            if z != offsets[part]:
+                transform = adsk.core.Matrix3D.create()
+                transform.translation = adsk.core.Vector3D.create(0, 0, offsets[part])
+                group.transform = transform
+            self._groups[part] = (key, group, offsets[part])
+        
+        return redrawn
+    
+    def clear(self):
+        """Elimina los gráficos de la vista previa"""
+        for _, group, _ in self._groups.values():
+            if group.isValid:
+                group.deleteMe()
+        self._groups = {}
+    
+    def _outline(self, key, settings):
+        """Coordenadas planas y longitudes de tira de una parte (con caché)"""
+        if key in self._outlines:
+            self._outlines.move_to_end(key)
+            return self._outlines[key]
+        
+        if settings is None:
+            loops = self._generator.outline_loops(key[1])
+        else:
+            loops = self._generator.outline_loops(
+                key[1], *self._generator._use_teeth(settings)
+            )
+        
+        # Cada lazo se cierra repitiendo su primer punto; z = 0
+        closed = [np.vstack([loop, loop[:1]]) for loop in loops]
+        points = np.vstack(closed)
+        coordinates = np.column_stack([points, np.zeros(len(points))]).ravel().tolist()
+        lengths = [len(loop) for loop in closed]
+        
+        self._outlines[key] = (coordinates, lengths)
+        if len(self._outlines) > PREVIEW_CACHE_SIZE:
+            self._outlines.popitem(last=False)
+        return coordinates, lengths
+    
+    def _draw(self, root, coordinates, lengths, rgb):
+        """Un grupo de gráficos con los lazos como tiras de líneas"""
+        group = root.customGraphicsGroups.add()
+        lines = group.addLines(
+            adsk.fusion.CustomGraphicsCoordinates.create(coordinates), [], True, lengths
+        )
+        lines.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(
+            adsk.core.Color.create(*rgb, 255)
+        )
+        lines.weight = 2
+        return group
+
+# Vista previa compartida por las ejecuciones del comando
+_preview = HDrivePreview()
+
+# Precálculo de los valores vecinos del diálogo, compartido por las ejecuciones
+_precompute = NeighbourPrecompute()
+
+def _ensure_custom_event():
+    """Registra el evento personalizado de la generación (una sola vez)"""
+    global _custom_event
+    if _custom_event is None:
+        _custom_event = _app.registerCustomEvent(GENERATION_EVENT_ID)
+        handler = GenerationStepHandler()
+        _custom_event.add(handler)
+        _handlers.append(handler)
+    return _custom_event
+
+def start_job(generator, steps, summary):
+    """Inicia una generación por partes y la deja como trabajo en curso"""
+    global _job
+    _ensure_custom_event()
+    _job = GenerationJob(_app, generator, steps, summary)
+    _job.start()
+    return _job
+
+# Comandos del Add-in: (id, nombre, descripción, manejador de creación)
+_COMMANDS = (
+    (COMMAND_ID, COMMAND_NAME, COMMAND_DESCRIPTION, HDriveCommandCreatedHandler),
+    (BATCH_COMMAND_ID, BATCH_COMMAND_NAME, BATCH_COMMAND_DESCRIPTION,
+     HDriveBatchCommandCreatedHandler)
+)
 
 def run(context):
     """Punto de entrada del Add-in"""
@@ -670,29 +2856,30 @@ def run(context):
         _app = adsk.core.Application.get()
         _ui = _app.userInterface
         
-        # Limpiar comandos anteriores
-        cmdDef = _ui.commandDefinitions.itemById(COMMAND_ID)
-        if cmdDef:
-            cmdDef.deleteMe()
-        
-        # Crear nuevo comando
-        cmdDef = _ui.commandDefinitions.addButtonDefinition(
-            COMMAND_ID,
-            COMMAND_NAME,
-            COMMAND_DESCRIPTION
-        )
-        
-        # Conectar al handler
-        commandCreated = HDriveCommandCreatedHandler()
-        cmdDef.commandCreated.add(commandCreated)
-        _handlers.append(commandCreated)
-        
-        # Agregar botón al panel
         addInsPanel = _ui.allToolbarPanels.itemById('SolidScriptsAddinsPanel')
-        cntrl = addInsPanel.controls.itemById(COMMAND_ID)
-        if cntrl:
-            cntrl.deleteMe()
-        addInsPanel.controls.addCommand(cmdDef).isPromoted = True
+        for command_id, name, description, handler_class in _COMMANDS:
+            # Limpiar comandos anteriores
+            cmdDef = _ui.commandDefinitions.itemById(command_id)
+            if cmdDef:
+                cmdDef.deleteMe()
+            
+            # Crear nuevo comando
+            cmdDef = _ui.commandDefinitions.addButtonDefinition(
+                command_id,
+                name,
+                description
+            )
+            
+            # Conectar al handler
+            commandCreated = handler_class()
+            cmdDef.commandCreated.add(commandCreated)
+            _handlers.append(commandCreated)
+            
+            # Agregar botón al panel
+            cntrl = addInsPanel.controls.itemById(command_id)
+            if cntrl:
+                cntrl.deleteMe()
+            addInsPanel.controls.addCommand(cmdDef).isPromoted = command_id == COMMAND_ID
         
         # Mensaje de éxito
         _ui.messageBox(
@@ -709,17 +2896,29 @@ def run(context):
 
 def stop(context):
     """Limpieza al detener el Add-in"""
+    global _job, _custom_event
     try:
-        # Eliminar botón
+        # Detener la generación en curso y liberar el evento personalizado
+        if _job is not None and _job.running:
+            _job._finish('cancelled')
+        _job = None
+        _preview.clear()
+        _precompute.stop()
+        if _custom_event is not None:
+            _app.unregisterCustomEvent(GENERATION_EVENT_ID)
+            _custom_event = None
+        
         addInsPanel = _ui.allToolbarPanels.itemById('SolidScriptsAddinsPanel')
-        cntrl = addInsPanel.controls.itemById(COMMAND_ID)
-        if cntrl:
-            cntrl.deleteMe()
-        
-        # Eliminar definición del comando
-        cmdDef = _ui.commandDefinitions.itemById(COMMAND_ID)
-        if cmdDef:
-            cmdDef.deleteMe()
+        for command_id, _, _, _ in _COMMANDS:
+            # Eliminar botón
+            cntrl = addInsPanel.controls.itemById(command_id)
+            if cntrl:
+                cntrl.deleteMe()
+            
+            # Eliminar definición del comando
+            cmdDef = _ui.commandDefinitions.itemById(command_id)
+            if cmdDef:
+                cmdDef.deleteMe()
             
     except:
         if _ui:
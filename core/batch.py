@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+batch.py - Evaluación vectorizada de muchos diseños de Harmonic Drive
+Array de entrada, arrays de salida: no se crea ningún objeto por diseño
+NO depende de Fusion 360 - puede ser testeado independientemente
+"""
+
+import sys
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.calculations import (
+    BASIC_PARAM_RULES,
+    DEFAULT_STRAIN_LIMIT,
+    MATERIALS,
+    MIN_CONTACT_RATIO,
+    QUICK_WARNING_RULES,
+    STANDARD_MODULES,
+    STRAIN_LIMITS,
+    HarmonicDriveParams
+)
+
+# Límite de strain indexado por código de material
+_STRAIN_LIMIT_TABLE = np.array([STRAIN_LIMITS[m] for m in MATERIALS])
+
+
+def material_codes(materials: Union[str, Sequence[str], np.ndarray]) -> np.ndarray:
+    """
+    Convierte nombres de material en códigos enteros (índices de MATERIALS)
+
+    Los nombres desconocidos reciben -1 y usan el límite de strain por
+    defecto, igual que HarmonicDriveCalculator.
+    """
+    names = np.asarray(materials)
+    codes = np.full(names.shape, -1, dtype=np.int64)
+    for code, name in enumerate(MATERIALS):
+        codes[names == name] = code
+    return codes
+
+
+def strain_limits(material: np.ndarray) -> np.ndarray:
+    """Límite de strain para cada código de material"""
+    material = np.asarray(material)
+    known = (material >= 0) & (material < len(MATERIALS))
+    return np.where(
+        known,
+        _STRAIN_LIMIT_TABLE[np.clip(material, 0, len(MATERIALS) - 1)],
+        DEFAULT_STRAIN_LIMIT
+    )
+
+
+def basic_params_valid(teeth_cs: np.ndarray, module: np.ndarray,
+                       pressure_angle: np.ndarray) -> np.ndarray:
+    """Máscara de filas que pasan todas las reglas de _validate_basic_params"""
+    valid = np.ones(np.broadcast(teeth_cs, module, pressure_angle).shape, dtype=bool)
+    for _, _, check in BASIC_PARAM_RULES:
+        valid &= ~check(teeth_cs, module, pressure_angle)
+    return valid
+
+
+def fs_strain(teeth_cs: np.ndarray, module: np.ndarray) -> np.ndarray:
+    """Strain del Flex Spline (HarmonicDriveCalculator.calculate_strain)"""
+    eccentricity = (2 * module) / np.pi
+    fs_pitch_radius = module * (teeth_cs - 2) / 2
+    return (2 * eccentricity) / fs_pitch_radius
+
+
+def contact_ratio(module: np.ndarray, pressure_angle: np.ndarray,
+                  addendum_factor=0.8) -> np.ndarray:
+    """Relación de contacto (HarmonicDriveCalculator.calculate_contact_ratio)"""
+    pressure_angle_rad = np.radians(pressure_angle)
+    action_length = 2 * addendum_factor * module / np.sin(pressure_angle_rad)
+    base_pitch = np.pi * module * np.cos(pressure_angle_rad)
+    return action_length / base_pitch
+
+
+def evaluate_batch(teeth_cs, module, pressure_angle=30.0, material=0,
+                   addendum_factor=0.8, dedendum_factor=1.0,
+                   wall_thickness_factor=1.5) -> Dict[str, np.ndarray]:
+    """
+    Evalúa get_full_summary para muchos diseños a la vez
+
+    Todas las entradas se combinan con broadcasting de NumPy, así que se
+    pueden mezclar arrays y escalares. Los diseños que no pasan la validación
+    básica no lanzan error: se marcan con params_valid = False.
+
+    Args:
+        teeth_cs: Dientes del Circular Spline
+        module: Módulo en mm
+        pressure_angle: Ángulo de presión en grados
+        material: Código de material (ver material_codes) o nombres
+        addendum_factor: Factor de addendum
+        dedendum_factor: Factor de dedendum
+        wall_thickness_factor: Factor de espesor de pared del FS
+
+    Returns:
+        Diccionario nombre -> array (estructura de arrays). Los nombres siguen
+        las claves de get_full_summary con prefijo cs_, fs_, wg_ o backlash_
+    """
+
+    material = np.asarray(material)
+    if material.dtype.kind in 'UO':
+        material = material_codes(material)
+
+    teeth_cs, module, pressure_angle, material, addendum_factor, dedendum_factor, \
+        wall_thickness_factor = np.broadcast_arrays(
+            np.asarray(teeth_cs, dtype=np.int64),
+            np.asarray(module, dtype=np.float64),
+            np.asarray(pressure_angle, dtype=np.float64),
+            material,
+            np.asarray(addendum_factor, dtype=np.float64),
+            np.asarray(dedendum_factor, dtype=np.float64),
+            np.asarray(wall_thickness_factor, dtype=np.float64)
+        )
+
+    # Parámetros derivados (HarmonicDriveParams.__post_init__)
+    teeth_fs = teeth_cs - 2
+    ratio = teeth_cs / 2
+    eccentricity = (2 * module) / np.pi
+
+    pressure_angle_rad = np.radians(pressure_angle)
+    cos_pa = np.cos(pressure_angle_rad)
+    addendum = addendum_factor * module
+    dedendum = dedendum_factor * module
+
+    # Circular Spline (interno)
+    cs_pitch_diameter = module * teeth_cs
+    cs_dedendum_diameter = cs_pitch_diameter + 2 * dedendum
+
+    # Flex Spline (externo)
+    fs_pitch_diameter = module * teeth_fs
+    fs_dedendum_diameter = fs_pitch_diameter - 2 * dedendum
+    fs_wall_thickness = wall_thickness_factor * module
+    fs_inner_diameter = fs_dedendum_diameter - 2 * fs_wall_thickness
+    fs_cup_length = 0.8 * fs_pitch_diameter
+
+    # Wave Generator
+    wg_clearance = 0.1 * module
+    wg_major_radius = fs_inner_diameter / 2 - wg_clearance
+    wg_minor_radius = wg_major_radius - 2 * eccentricity
+
+    # Strain
+    strain = fs_strain(teeth_cs, module)
+    max_strain = strain_limits(material)
+    is_safe = strain <= max_strain
+    with np.errstate(divide='ignore'):
+        safety_factor = np.where(strain > 0, max_strain / strain, np.inf)
+
+    # Relación de contacto
+    ratio_of_contact = contact_ratio(module, pressure_angle, addendum_factor)
+
+    # Backlash
+    backlash_tangential_nominal = 0.05 * module
+
+    params_valid = basic_params_valid(teeth_cs, module, pressure_angle)
+
+    return {
+        'teeth_cs': teeth_cs,
+        'teeth_fs': teeth_fs,
+        'module': module,
+        'pressure_angle': pressure_angle,
+        'material': material,
+        'reduction_ratio': ratio,
+        'eccentricity': eccentricity,
+
+        'cs_pitch_diameter': cs_pitch_diameter,
+        'cs_addendum_diameter': cs_pitch_diameter - 2 * addendum,
+        'cs_dedendum_diameter': cs_dedendum_diameter,
+        'cs_base_diameter': cs_pitch_diameter * cos_pa,
+        'cs_outer_diameter': cs_dedendum_diameter + 2 * 10 * module,
+        'cs_tooth_height': addendum + dedendum,
+
+        'fs_pitch_diameter': fs_pitch_diameter,
+        'fs_addendum_diameter': fs_pitch_diameter + 2 * addendum,
+        'fs_dedendum_diameter': fs_dedendum_diameter,
+        'fs_base_diameter': fs_pitch_diameter * cos_pa,
+        'fs_inner_diameter': fs_inner_diameter,
+        'fs_wall_thickness': fs_wall_thickness,
+        'fs_cup_length': fs_cup_length,
+        'fs_tooth_height': addendum + dedendum,
+
+        'wg_major_diameter': 2 * wg_major_radius,
+        'wg_minor_diameter': 2 * wg_minor_radius,
+        'wg_shaft_diameter': np.maximum(5.0, 5 * module),
+        'wg_height': 0.5 * fs_cup_length,
+        'wg_clearance': wg_clearance,
+
+        'strain': strain,
+        'max_strain': max_strain,
+        'is_safe': is_safe,
+        'safety_factor': safety_factor,
+        'contact_ratio': ratio_of_contact,
+
+        'backlash_tangential_min': 0.04 * module,
+        'backlash_tangential_max': 0.06 * module,
+        'backlash_tangential_nominal': backlash_tangential_nominal,
+        'backlash_radial_nominal': backlash_tangential_nominal / (2 * np.tan(pressure_angle_rad)),
+
+        'params_valid': params_valid,
+        'is_valid': params_valid & is_safe & (ratio_of_contact >= MIN_CONTACT_RATIO)
+    }
+
+
+# Bits de error y advertencia de validate_bulk, en el orden de las reglas
+ERROR_BITS = {
+    code: 1 << bit
+    for bit, code in enumerate(
+        [code for code, _, _ in BASIC_PARAM_RULES] + ['strain', 'contact_ratio']
+    )
+}
+WARNING_BITS = {code: 1 << bit for bit, (code, _, _) in enumerate(QUICK_WARNING_RULES)}
+
+# Filas procesadas por iteración (acota la memoria temporal)
+VALIDATION_CHUNK_SIZE = 1 << 16
+
+
+@dataclass
+class BulkValidation:
+    """
+    Resultado de validate_bulk: una máscara de bits por fila
+
+    errors y warnings tienen un bit por regla (ver ERROR_BITS y
+    WARNING_BITS). Los bits se calculan de forma independiente, así que una
+    fila con parámetros fuera de rango también indica si falla el strain.
+    Los mensajes de texto sólo se generan al pedirlos con messages().
+    """
+    teeth_cs: np.ndarray
+    module: np.ndarray
+    material: np.ndarray
+    pressure_angle: np.ndarray
+    errors: np.ndarray
+    warnings: np.ndarray
+
+    @property
+    def is_valid(self) -> np.ndarray:
+        """Máscara de filas sin errores"""
+        return self.errors == 0
+
+    def has_error(self, code: str) -> np.ndarray:
+        """Máscara de filas que fallan la regla indicada"""
+        return (self.errors & ERROR_BITS[code]) != 0
+
+    def has_warning(self, code: str) -> np.ndarray:
+        """Máscara de filas con la advertencia indicada"""
+        return (self.warnings & WARNING_BITS[code]) != 0
+
+    def messages(self, row: int) -> List[str]:
+        """
+        Mensajes de una fila con el mismo texto que quick_validation
+
+        Como en quick_validation, si fallan las reglas básicas sólo se
+        informa ese error.
+        """
+        errors = int(self.errors[row])
+        basic = [message for code, message, _ in BASIC_PARAM_RULES
+                 if errors & ERROR_BITS[code]]
+        if basic:
+            return [f"Errores de validación: {', '.join(basic)}"]
+
+        teeth_cs = self.teeth_cs[row]
+        module = self.module[row]
+        messages = []
+
+        if errors & ERROR_BITS['strain']:
+            strain = fs_strain(teeth_cs, module)
+            max_strain = strain_limits(self.material[row])
+            messages.append(
+                f"Deformación excesiva: {strain * 100:.2f}% > {max_strain * 100:.2f}%"
+            )
+
+        if errors & ERROR_BITS['contact_ratio']:
+            ratio = contact_ratio(module, self.pressure_angle[row])
+            messages.append(
+                f"Relación de contacto baja: {ratio:.2f} < {MIN_CONTACT_RATIO}"
+            )
+
+        warnings = int(self.warnings[row])
+        messages.extend(
+            f"ADVERTENCIA: {message}" for code, message, _ in QUICK_WARNING_RULES
+            if warnings & WARNING_BITS[code]
+        )
+        return messages
+
+
+def validate_bulk(teeth_cs, module, material=0, pressure_angle=30.0,
+                  chunk_size: int = VALIDATION_CHUNK_SIZE) -> BulkValidation:
+    """
+    Versión masiva de quick_validation
+
+    Aplica las mismas reglas que _validate_basic_params, calculate_strain y
+    quick_validation a todas las filas, por bloques para que la memoria
+    temporal no crezca con el número de filas.
+
+    Args:
+        teeth_cs: Dientes del Circular Spline
+        module: Módulo en mm
+        material: Código de material (ver material_codes) o nombres
+        pressure_angle: Ángulo de presión en grados (por fila o escalar)
+        chunk_size: Filas por bloque
+
+    Returns:
+        BulkValidation con las máscaras de bits por fila
+    """
+
+    material = np.asarray(material)
+    if material.dtype.kind in 'UO':
+        material = material_codes(material)
+
+    teeth_cs, module, material, pressure_angle = np.broadcast_arrays(
+        np.asarray(teeth_cs),
+        np.asarray(module, dtype=np.float64),
+        material,
+        np.asarray(pressure_angle, dtype=np.float64)
+    )
+    teeth_cs = teeth_cs.ravel()
+    module = module.ravel()
+    material = material.ravel()
+    pressure_angle = pressure_angle.ravel()
+
+    errors = np.zeros(len(teeth_cs), dtype=np.uint16)
+    warnings = np.zeros(len(teeth_cs), dtype=np.uint8)
+
+    for start in range(0, len(teeth_cs), chunk_size):
+        rows = slice(start, start + chunk_size)
+        z = teeth_cs[rows]
+        m = module[rows]
+        pa = pressure_angle[rows]
+
+        chunk_errors = errors[rows]
+        for code, _, check in BASIC_PARAM_RULES:
+            chunk_errors[check(z, m, pa)] |= ERROR_BITS[code]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unsafe = fs_strain(z, m) > strain_limits(material[rows])
+            low_contact = contact_ratio(m, pa) < MIN_CONTACT_RATIO
+        chunk_errors[unsafe] |= ERROR_BITS['strain']
+        chunk_errors[low_contact] |= ERROR_BITS['contact_ratio']
+
+        chunk_warnings = warnings[rows]
+        for code, _, check in QUICK_WARNING_RULES:
+            chunk_warnings[check(z, m)] |= WARNING_BITS[code]
+
+    return BulkValidation(
+        teeth_cs=teeth_cs,
+        module=module,
+        material=material,
+        pressure_angle=pressure_angle,
+        errors=errors,
+        warnings=warnings
+    )
+
+
+# Pesos por métrica de cada objetivo predefinido (mayor puntuación = mejor)
+RANKING_OBJECTIVES = {
+    'diameter': {'diameter': 1.0},           # Diseño más compacto
+    'strain_margin': {'strain_margin': 1.0},  # Mayor margen de deformación
+    'contact_ratio': {'contact_ratio': 1.0},  # Mayor relación de contacto
+}
+
+
+def _ranking_metrics(batch: Dict[str, np.ndarray], reduction_ratio: float,
+                     max_diameter: float) -> Dict[str, np.ndarray]:
+    """Métricas normalizadas para puntuar candidatos"""
+    return {
+        'diameter': -batch['cs_pitch_diameter'] / max_diameter,
+        'strain_margin': 1 - batch['strain'] / batch['max_strain'],
+        'contact_ratio': batch['contact_ratio'],
+        'ratio_error': np.abs(batch['reduction_ratio'] - reduction_ratio) / reduction_ratio
+    }
+
+
+def rank_parameters(reduction_ratio: float,
+                    max_diameter: float = 100,
+                    materials: Sequence[str] = ('steel',),
+                    pressure_angles: Sequence[float] = (20.0, 25.0, 30.0),
+                    modules: Sequence[float] = STANDARD_MODULES,
+                    teeth_window: int = 4,
+                    objective: Union[str, Mapping[str, float]] = 'diameter',
+                    ratio_weight: float = 10.0,
+                    top_k: int = 5) -> List[Dict]:
+    """
+    Búsqueda exhaustiva vectorizada de los mejores parámetros
+
+    Evalúa de una vez todas las combinaciones de módulo estándar, ángulo de
+    presión, material y número par de dientes cercano a 2 * reduction_ratio.
+    Los candidatos deben pasar la validación básica, el strain del material
+    y la relación de contacto mínima, y caber en max_diameter (diámetro
+    primitivo, como suggest_parameters); el objetivo 'diameter' puntúa ese
+    mismo diámetro.
+
+    Args:
+        reduction_ratio: Relación de reducción deseada
+        max_diameter: Diámetro primitivo máximo en mm
+        materials: Materiales a considerar
+        pressure_angles: Ángulos de presión a considerar
+        modules: Módulos a considerar
+        teeth_window: Desviación máxima de dientes respecto al ideal
+        objective: Nombre de RANKING_OBJECTIVES o pesos {métrica: peso} sobre
+            'diameter', 'strain_margin' y 'contact_ratio'
+        ratio_weight: Penalización por error relativo de la reducción
+        top_k: Número de candidatos a devolver
+
+    Returns:
+        Lista ordenada (mejor primero) de diccionarios con 'params',
+        'score' y 'metrics'
+    """
+
+    if isinstance(objective, str):
+        if objective not in RANKING_OBJECTIVES:
+            raise ValueError(f"Objetivo desconocido: {objective}")
+        weights = RANKING_OBJECTIVES[objective]
+    else:
+        weights = dict(objective)
+
+    codes = material_codes(list(materials))
+    if (codes < 0).any():
+        raise ValueError(f"Material desconocido en {list(materials)}")
+
+    # Número de dientes ideal, forzado a par, y sus vecinos pares
+    target_teeth = int(2 * reduction_ratio)
+    target_teeth += target_teeth % 2
+    teeth = np.arange(target_teeth - teeth_window, target_teeth + teeth_window + 1, 2)
+
+    grid = np.meshgrid(
+        teeth,
+        np.asarray(modules, dtype=np.float64),
+        np.asarray(pressure_angles, dtype=np.float64),
+        codes,
+        indexing='ij'
+    )
+    teeth_cs, module, pressure_angle, material = (axis.ravel() for axis in grid)
+
+    batch = evaluate_batch(teeth_cs, module, pressure_angle, material)
+    # Mismos criterios que quick_validation (incluida la relación de contacto)
+    feasible = batch['is_valid'] & (batch['cs_pitch_diameter'] <= max_diameter)
+
+    metrics = _ranking_metrics(batch, reduction_ratio, max_diameter)
+    score = -ratio_weight * metrics['ratio_error']
+    for name, weight in weights.items():
+        score = score + weight * metrics[name]
+
+    candidates = np.flatnonzero(feasible)
+    best = candidates[np.argsort(-score[candidates], kind='stable')[:top_k]]
+
+    return [
+        {
+            'params': HarmonicDriveParams(
+                teeth_cs=int(teeth_cs[i]),
+                module=float(module[i]),
+                pressure_angle=float(pressure_angle[i]),
+                material=MATERIALS[material[i]]
+            ),
+            'score': float(score[i]),
+            'metrics': {name: float(values[i]) for name, values in metrics.items()}
+        }
+        for i in best
+    ]
@@ -5,21 +5,86 @@ NO depende de Fusion 360 - puede ser testeado independientemente
 """
 
 import math
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Dict, List, Tuple, Optional, Iterable
+from dataclasses import dataclass, field
 
-@dataclass
+import numpy as np
+
+
+def involute_curve(base_radius: float, t_start: float, t_end: float,
+                   num_points: int) -> np.ndarray:
+    """
+    Evalúa la involuta de un círculo base en todo el rango de t de una vez
+    
+    Args:
+        base_radius: Radio del círculo base
+        t_start: Parámetro inicial (radianes)
+        t_end: Parámetro final (radianes)
+        num_points: Número de puntos equiespaciados en t
+    
+    Returns:
+        Array float64 de forma (num_points, 2) con las columnas x, y
+    """
+    t = np.linspace(t_start, t_end, num_points)
+    cos_t = np.cos(t)
+    sin_t = np.sin(t)
+    
+    points = np.empty((num_points, 2), dtype=np.float64)
+    points[:, 0] = base_radius * (cos_t + t * sin_t)
+    points[:, 1] = base_radius * (sin_t - t * cos_t)
+    return points
+
+
+# Máximo de tablas de involuta unitaria retenidas por el proceso
+UNIT_INVOLUTE_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=UNIT_INVOLUTE_CACHE_SIZE)
+def unit_involute(t_start: float, t_end: float, num_points: int) -> np.ndarray:
+    """
+    Tabla compartida de la involuta de radio base 1
+    
+    La involuta de radio base r es r veces la involuta unitaria, así que
+    todos los engranajes con el mismo rango de t reutilizan la misma tabla
+    y sólo pagan una multiplicación. La caché es LRU y de tamaño acotado.
+    
+    Returns:
+        Array (num_points, 2) de sólo lectura
+    """
+    table = involute_curve(1.0, t_start, t_end, num_points)
+    table.setflags(write=False)
+    return table
+
+
+def scaled_involute(base_radius: float, t_start: float, t_end: float,
+                    num_points: int) -> np.ndarray:
+    """Involuta de radio base dado, escalando la tabla unitaria en caché"""
+    return base_radius * unit_involute(float(t_start), float(t_end), int(num_points))
+
+
+def points_to_tuples(points: np.ndarray) -> List[Tuple[float, float]]:
+    """Convierte un array (n, 2) a la lista de tuplas (x, y) de la API clásica"""
+    return [(x, y) for x, y in points.tolist()]
+
+@dataclass(frozen=True, slots=True)
 class HarmonicDriveParams:
-    """Parámetros completos del Harmonic Drive"""
+    """
+    Parámetros completos del Harmonic Drive
+    
+    Inmutables y hashables: dos juegos de parámetros iguales comparten hash y
+    sirven como clave de caché. Para variar un diseño use dataclasses.replace;
+    los campos calculados no son argumentos y siempre se recalculan.
+    """
     # Entrada básica
     teeth_cs: int           # Dientes del Circular Spline
     module: float          # Módulo en mm
     pressure_angle: float  # Ángulo de presión en grados
     
     # Calculados automáticamente
-    teeth_fs: int = None   # Dientes del Flex Spline
-    ratio: float = None    # Relación de reducción
-    eccentricity: float = None  # Excentricidad del WG
+    teeth_fs: int = field(init=False)   # Dientes del Flex Spline
+    ratio: float = field(init=False)    # Relación de reducción
+    eccentricity: float = field(init=False)  # Excentricidad del WG
     
     # Geometría del diente
     addendum_factor: float = 0.8   # Factor de addendum (reducido para HD)
@@ -32,12 +97,92 @@ class HarmonicDriveParams:
     
     def __post_init__(self):
         """Calcula parámetros derivados"""
-        if self.teeth_fs is None:
-            self.teeth_fs = self.teeth_cs - 2
-        if self.ratio is None:
-            self.ratio = self.teeth_cs / 2
-        if self.eccentricity is None:
-            self.eccentricity = (2 * self.module) / math.pi
+        object.__setattr__(self, 'teeth_fs', self.teeth_cs - 2)
+        object.__setattr__(self, 'ratio', self.teeth_cs / 2)
+        object.__setattr__(self, 'eccentricity', (2 * self.module) / math.pi)
+
+
+# Límites de strain según material (el orden define el código de material)
+STRAIN_LIMITS = {
+    'steel': 0.003,      # 0.3%
+    'aluminum': 0.004,   # 0.4%
+    'plastic': 0.02,     # 2%
+    'tpu': 0.05         # 5%
+}
+MATERIALS = tuple(STRAIN_LIMITS)
+DEFAULT_STRAIN_LIMIT = STRAIN_LIMITS['steel']
+
+# Reglas de validación básica: (código, mensaje, comprobación de error).
+# Las comprobaciones usan sólo operadores aritméticos, así que funcionan
+# igual con escalares que con arrays de NumPy.
+BASIC_PARAM_RULES = (
+    # Validar número de dientes
+    ('teeth_odd', "teeth_cs debe ser par",
+     lambda teeth_cs, module, pressure_angle: teeth_cs % 2 != 0),
+    ('teeth_min', "teeth_cs mínimo es 60",
+     lambda teeth_cs, module, pressure_angle: teeth_cs < 60),
+    ('teeth_max', "teeth_cs máximo es 320",
+     lambda teeth_cs, module, pressure_angle: teeth_cs > 320),
+    # Validar módulo (con tolerancia de 0.001 para errores de redondeo)
+    ('module_min', "Módulo mínimo es 0.3mm",
+     lambda teeth_cs, module, pressure_angle: module < 0.299),
+    ('module_max', "Módulo máximo es 5.0mm",
+     lambda teeth_cs, module, pressure_angle: module > 5.001),
+    # Validar ángulo de presión
+    ('pressure_angle_min', "Ángulo de presión mínimo es 20°",
+     lambda teeth_cs, module, pressure_angle: pressure_angle < 20),
+    ('pressure_angle_max', "Ángulo de presión máximo es 30°",
+     lambda teeth_cs, module, pressure_angle: pressure_angle > 30),
+)
+
+
+# Módulos estándar considerados por suggest_parameters (mm)
+STANDARD_MODULES = (0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0)
+
+# Umbral de la relación de contacto en quick_validation
+MIN_CONTACT_RATIO = 1.2
+
+# Advertencias de quick_validation: (código, mensaje, comprobación)
+QUICK_WARNING_RULES = (
+    ('few_teeth', "Pocos dientes, considere aumentar para mejor suavidad",
+     lambda teeth_cs, module: teeth_cs < 100),
+    ('small_module', "Módulo muy pequeño, difícil de fabricar",
+     lambda teeth_cs, module: module < 0.5),
+)
+
+
+def _memoized(method):
+    """
+    Calcula una magnitud derivada una sola vez por juego de parámetros
+    
+    Los diccionarios se devuelven como copia para que el llamador no pueda
+    alterar el valor guardado. Si dos hilos calculan a la vez la misma
+    magnitud, ambos obtienen el mismo valor y se conserva el primero.
+    """
+    name = method.__name__
+    
+    @wraps(method)
+    def wrapper(self):
+        cache = self._derived_cache()
+        if name not in cache:
+            cache.setdefault(name, method(self))
+        value = cache[name]
+        return dict(value) if isinstance(value, dict) else value
+    
+    return wrapper
+
+
+# Secciones que puede devolver get_full_summary
+SUMMARY_SECTIONS = (
+    'parameters',
+    'circular_spline',
+    'flex_spline',
+    'wave_generator',
+    'analysis'
+)
+
+# Partes del análisis que se pueden pedir por separado
+ANALYSIS_SECTIONS = ('strain', 'contact_ratio', 'backlash')
 
 
 class HarmonicDriveCalculator:
@@ -46,38 +191,33 @@ class HarmonicDriveCalculator:
     def __init__(self, params: HarmonicDriveParams):
         self.params = params
         self._validate_basic_params()
+        self._cache = {}
+        self._cache_key = self._params_key()
+    
+    def _params_key(self) -> HarmonicDriveParams:
+        """Clave que define la validez de la caché (los parámetros son inmutables)"""
+        return self.params
+    
+    def _derived_cache(self) -> Dict:
+        """Caché de magnitudes derivadas, vaciada si se reemplazan los parámetros"""
+        key = self._params_key()
+        if key != self._cache_key:
+            self._validate_basic_params()
+            self._cache = {}
+            self._cache_key = key
+        return self._cache
         
     def _validate_basic_params(self):
         """Valida parámetros básicos"""
-        errors = []
-        
-        # Validar número de dientes
-        if self.params.teeth_cs % 2 != 0:
-            errors.append("teeth_cs debe ser par")
-        
-        if self.params.teeth_cs < 60:
-            errors.append("teeth_cs mínimo es 60")
-            
-        if self.params.teeth_cs > 320:
-            errors.append("teeth_cs máximo es 320")
-        
-        # Validar módulo (con tolerancia para errores de redondeo)
-        if self.params.module < 0.299:  # Tolerancia de 0.001
-            errors.append("Módulo mínimo es 0.3mm")
-            
-        if self.params.module > 5.001:  # Tolerancia de 0.001
-            errors.append("Módulo máximo es 5.0mm")
-        
-        # Validar ángulo de presión
-        if self.params.pressure_angle < 20:
-            errors.append("Ángulo de presión mínimo es 20°")
-            
-        if self.params.pressure_angle > 30:
-            errors.append("Ángulo de presión máximo es 30°")
+        errors = [
+            message for _, message, check in BASIC_PARAM_RULES
+            if check(self.params.teeth_cs, self.params.module, self.params.pressure_angle)
+        ]
         
         if errors:
             raise ValueError(f"Errores de validación: {', '.join(errors)}")
     
+    @_memoized
     def get_circular_spline_geometry(self) -> Dict:
         """Calcula geometría del Circular Spline (engranaje interno)"""
         
@@ -116,6 +256,7 @@ class HarmonicDriveCalculator:
             'pressure_angle': self.params.pressure_angle
         }
     
+    @_memoized
     def get_flex_spline_geometry(self) -> Dict:
         """Calcula geometría del Flex Spline (engranaje externo flexible)"""
         
@@ -162,6 +303,7 @@ class HarmonicDriveCalculator:
             'pressure_angle': self.params.pressure_angle
         }
     
+    @_memoized
     def get_wave_generator_geometry(self) -> Dict:
         """Calcula geometría del Wave Generator (leva elíptica)"""
         
@@ -196,6 +338,7 @@ class HarmonicDriveCalculator:
             'clearance': clearance
         }
     
+    @_memoized
     def calculate_strain(self) -> Dict:
         """Calcula la deformación del Flex Spline"""
         
@@ -210,15 +353,8 @@ class HarmonicDriveCalculator:
         # Strain (deformación relativa)
         strain = max_deformation / mean_radius
         
-        # Límites de strain según material
-        strain_limits = {
-            'steel': 0.003,      # 0.3%
-            'aluminum': 0.004,   # 0.4%
-            'plastic': 0.02,     # 2%
-            'tpu': 0.05         # 5%
-        }
-        
-        max_strain = strain_limits.get(self.params.material, 0.003)
+        # Límite de strain según material
+        max_strain = STRAIN_LIMITS.get(self.params.material, DEFAULT_STRAIN_LIMIT)
         is_safe = strain <= max_strain
         
         return {
@@ -230,8 +366,9 @@ class HarmonicDriveCalculator:
             'safety_factor': max_strain / strain if strain > 0 else float('inf')
         }
     
+    @_memoized
     def calculate_contact_ratio(self) -> float:
-        """Calcula la relación de contacto (debe ser > 1.2)"""
+        """Calcula la relación de contacto (debe ser >= MIN_CONTACT_RATIO)"""
         
         cs_geo = self.get_circular_spline_geometry()
         
@@ -251,6 +388,7 @@ class HarmonicDriveCalculator:
         
         return contact_ratio
     
+    @_memoized
     def calculate_backlash(self) -> Dict:
         """Calcula el juego (backlash) recomendado"""
         
@@ -282,6 +420,18 @@ class HarmonicDriveCalculator:
         Returns:
             Lista de tuplas (x, y) con los puntos del perfil
         """
+        return points_to_tuples(
+            self.get_involute_profile_array(num_points, is_internal)
+        )
+    
+    def get_involute_profile_array(self, num_points: int = 50,
+                                   is_internal: bool = False) -> np.ndarray:
+        """
+        Versión vectorizada de get_involute_profile_points
+        
+        Returns:
+            Array (num_points, 2) con los puntos del perfil
+        """
         
         if is_internal:
             geometry = self.get_circular_spline_geometry()
@@ -289,7 +439,6 @@ class HarmonicDriveCalculator:
             geometry = self.get_flex_spline_geometry()
         
         base_radius = geometry['base_diameter'] / 2
-        pitch_radius = geometry['pitch_radius']
         
         # Calcular rango del parámetro t
         # t_min es donde empieza la involuta (en el círculo base)
@@ -312,18 +461,7 @@ class HarmonicDriveCalculator:
             else:
                 t_max = 0
         
-        points = []
-        
-        for i in range(num_points):
-            t = t_min + (t_max - t_min) * i / (num_points - 1)
-            
-            # Ecuaciones paramétricas de la involuta
-            x = base_radius * (math.cos(t) + t * math.sin(t))
-            y = base_radius * (math.sin(t) - t * math.cos(t))
-            
-            points.append((x, y))
-        
-        return points
+        return scaled_involute(base_radius, t_min, t_max, num_points)
     
     def get_tooth_profile(self, is_internal: bool = False) -> Dict:
         """
@@ -368,35 +506,88 @@ class HarmonicDriveCalculator:
             'module': self.params.module
         }
     
-    def get_full_summary(self) -> Dict:
-        """Obtiene un resumen completo de todos los cálculos"""
+    def get_full_summary(self, sections: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Obtiene un resumen completo de todos los cálculos
         
-        cs_geo = self.get_circular_spline_geometry()
-        fs_geo = self.get_flex_spline_geometry()
-        wg_geo = self.get_wave_generator_geometry()
-        strain = self.calculate_strain()
-        contact_ratio = self.calculate_contact_ratio()
-        backlash = self.calculate_backlash()
+        Args:
+            sections: Secciones a incluir (None = todas). Acepta los nombres de
+                SUMMARY_SECTIONS y, para pedir sólo parte del análisis, los de
+                ANALYSIS_SECTIONS
         
-        return {
-            'parameters': {
+        Returns:
+            Diccionario con las secciones pedidas
+        """
+        
+        if sections is None:
+            sections = SUMMARY_SECTIONS
+        sections = set(sections)
+        
+        unknown = sections - set(SUMMARY_SECTIONS) - set(ANALYSIS_SECTIONS)
+        if unknown:
+            raise ValueError(f"Secciones desconocidas: {', '.join(sorted(unknown))}")
+        
+        summary = {}
+        
+        if 'parameters' in sections:
+            summary['parameters'] = {
                 'teeth_cs': self.params.teeth_cs,
                 'teeth_fs': self.params.teeth_fs,
                 'module': self.params.module,
                 'reduction_ratio': self.params.ratio,
                 'eccentricity': self.params.eccentricity,
                 'pressure_angle': self.params.pressure_angle
-            },
-            'circular_spline': cs_geo,
-            'flex_spline': fs_geo,
-            'wave_generator': wg_geo,
-            'analysis': {
-                'strain': strain,
-                'contact_ratio': contact_ratio,
-                'backlash': backlash,
-                'is_valid': strain['is_safe'] and contact_ratio > 1.2
             }
-        }
+        
+        if 'circular_spline' in sections:
+            summary['circular_spline'] = self.get_circular_spline_geometry()
+        
+        if 'flex_spline' in sections:
+            summary['flex_spline'] = self.get_flex_spline_geometry()
+        
+        if 'wave_generator' in sections:
+            summary['wave_generator'] = self.get_wave_generator_geometry()
+        
+        if 'analysis' in sections:
+            sections.update(ANALYSIS_SECTIONS)
+        
+        analysis = {}
+        
+        if 'strain' in sections:
+            analysis['strain'] = self.calculate_strain()
+        
+        if 'contact_ratio' in sections:
+            analysis['contact_ratio'] = self.calculate_contact_ratio()
+        
+        if 'backlash' in sections:
+            analysis['backlash'] = self.calculate_backlash()
+        
+        if 'strain' in analysis and 'contact_ratio' in analysis:
+            analysis['is_valid'] = (
+                analysis['strain']['is_safe'] and
+                analysis['contact_ratio'] >= MIN_CONTACT_RATIO
+            )
+        
+        if analysis:
+            summary['analysis'] = analysis
+        
+        return summary
+
+
+# Máximo de calculadoras compartidas retenidas por el proceso
+CALCULATOR_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=CALCULATOR_CACHE_SIZE)
+def get_calculator(params: HarmonicDriveParams) -> HarmonicDriveCalculator:
+    """
+    Devuelve una calculadora compartida para parámetros iguales
+    
+    Eventos de UI o peticiones repetidas con el mismo diseño reutilizan
+    todo lo ya calculado. Los parámetros inválidos no se guardan y lanzan
+    ValueError en cada llamada.
+    """
+    return HarmonicDriveCalculator(params)
 
 
 def quick_validation(teeth_cs: int, module: float, material: str = 'steel') -> Tuple[bool, List[str]]:
@@ -433,15 +624,14 @@ def quick_validation(teeth_cs: int, module: float, material: str = 'steel') -> T
         
         # Verificar relación de contacto
         contact_ratio = calc.calculate_contact_ratio()
-        if contact_ratio < 1.2:
-            errors.append(f"Relación de contacto baja: {contact_ratio:.2f} < 1.2")
+        if contact_ratio < MIN_CONTACT_RATIO:
+            errors.append(f"Relación de contacto baja: {contact_ratio:.2f} < {MIN_CONTACT_RATIO}")
         
         # Advertencias
-        if teeth_cs < 100:
-            warnings.append("Pocos dientes, considere aumentar para mejor suavidad")
-        
-        if module < 0.5:
-            warnings.append("Módulo muy pequeño, difícil de fabricar")
+        warnings.extend(
+            message for _, message, check in QUICK_WARNING_RULES
+            if check(teeth_cs, module)
+        )
         
     except ValueError as e:
         errors.append(str(e))
@@ -455,7 +645,9 @@ def quick_validation(teeth_cs: int, module: float, material: str = 'steel') -> T
 # Funciones de utilidad adicionales
 def suggest_parameters(reduction_ratio: float, 
                        max_diameter: float = 100,
-                       material: str = 'steel') -> Optional[HarmonicDriveParams]:
+                       material: str = 'steel',
+                       design_index=None,
+                       **search_options) -> Optional[HarmonicDriveParams]:
     """
     Sugiere parámetros óptimos dado una relación de reducción deseada
     
@@ -463,9 +655,21 @@ def suggest_parameters(reduction_ratio: float,
         reduction_ratio: Relación de reducción deseada (30:1 a 320:1)
         max_diameter: Diámetro máximo permitido en mm
         material: Material del Flex Spline
+        design_index: core.design_index.DesignIndex precalculado; si se
+            indica, la sugerencia simple se resuelve con una consulta al índice
+            (malla de módulos fina en vez de los módulos estándar) con los
+            mismos dientes que la búsqueda clásica: 2 * reduction_ratio, par.
+            El índice sólo guarda diseños válidos, así que el ángulo de
+            presión no queda fijo en 30° (ahí la relación de contacto no
+            alcanza MIN_CONTACT_RATIO)
+        **search_options: Con design_index, opciones adicionales de
+            DesignIndex.nearest (p. ej. max_ratio_error para aceptar otras
+            reducciones, pressure_angle)
     
     Returns:
         HarmonicDriveParams optimizados o None si no es posible
+    
+    Para varias alternativas ordenadas ver core.batch.rank_parameters.
     """
     
     # Calcular número de dientes necesario
@@ -475,6 +679,19 @@ def suggest_parameters(reduction_ratio: float,
     if teeth_cs % 2 != 0:
         teeth_cs += 1
     
+    if design_index is not None:
+        # Por defecto, exactamente los dientes de la búsqueda clásica; el
+        # ángulo de presión es libre porque con 30° la relación de contacto
+        # no llega al mínimo y el índice sólo guarda diseños válidos
+        options = {
+            'max_pitch_diameter': max_diameter,
+            'material': material,
+            'max_ratio_error': 0.0
+        }
+        options.update(search_options)
+        hits = design_index.nearest(teeth_cs / 2, **options)
+        return hits[0]['params'] if hits else None
+    
     # Validar rango
     if teeth_cs < 60 or teeth_cs > 320:
         return None
@@ -483,10 +700,9 @@ def suggest_parameters(reduction_ratio: float,
     module_max = max_diameter / teeth_cs
     
     # Seleccionar módulo estándar más cercano
-    standard_modules = [0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0]
     module = None
     
-    for m in reversed(standard_modules):
+    for m in reversed(STANDARD_MODULES):
         if m <= module_max:
             # Verificar que funcione con este módulo
             params = HarmonicDriveParams(
@@ -503,7 +719,7 @@ def suggest_parameters(reduction_ratio: float,
                 if strain_data['is_safe']:
                     module = m
                     break
-            except:
+            except ValueError:
                 continue
     
     if module is None:
@@ -514,4 +730,4 @@ def suggest_parameters(reduction_ratio: float,
         module=module,
         pressure_angle=30,
         material=material
-    )
\ No newline at end of file
+    )
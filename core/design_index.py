@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+design_index.py - Índice precalculado del espacio de diseños válidos
+Convierte "el diseño válido más cercano a la reducción R bajo el diámetro D"
+en una búsqueda dentro de una tabla ordenada en lugar de una exploración
+NO depende de Fusion 360 - puede ser testeado independientemente
+"""
+
+import sys
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.calculations import MATERIALS, HarmonicDriveParams
+from core.batch import evaluate_batch, material_codes
+
+# Columnas guardadas por diseño y su tipo (compacto para cargar rápido)
+INDEX_COLUMNS = {
+    'teeth_cs': np.int16,
+    'module': np.float64,
+    'pressure_angle': np.float32,
+    'material': np.int8,
+    'reduction_ratio': np.float64,
+    'cs_pitch_diameter': np.float64,
+    'cs_outer_diameter': np.float64,
+    'strain_margin': np.float32,
+    'contact_ratio': np.float32
+}
+
+
+class DesignIndex:
+    """
+    Índice de todos los diseños válidos de una malla de parámetros
+
+    Las filas se agrupan por número de dientes (es decir, por reducción) y
+    dentro de cada grupo se ordenan por diámetro exterior. Con dientes y
+    factores fijos el diámetro primitivo crece con el módulo igual que el
+    exterior, así que ambos límites se resuelven con una búsqueda binaria.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Arrays por columna de INDEX_COLUMNS (cualquier orden de filas)
+        """
+        order = np.lexsort((columns['cs_outer_diameter'], columns['teeth_cs']))
+        self.columns = {
+            name: np.ascontiguousarray(columns[name][order], dtype=dtype)
+            for name, dtype in INDEX_COLUMNS.items()
+        }
+
+        # Inicio de cada grupo de dientes
+        self.teeth_values, self._offsets = np.unique(
+            self.columns['teeth_cs'], return_index=True
+        )
+        self._offsets = np.append(self._offsets, len(order))
+
+    def __len__(self) -> int:
+        return len(self.columns['teeth_cs'])
+
+    @classmethod
+    def build(cls, module_step: float = 0.01, pressure_angle_step: float = 1.0,
+              materials=MATERIALS) -> 'DesignIndex':
+        """
+        Construye el índice evaluando toda la malla permitida
+
+        La malla cubre lo que acepta _validate_basic_params: dientes pares de
+        60 a 320, módulo de 0.3 a 5.0 mm y ángulo de presión de 20 a 30°.
+        Sólo se guardan los diseños válidos (is_valid de evaluate_batch):
+        strain seguro para su material y relación de contacto mínima.
+        """
+        teeth = np.arange(60, 321, 2)
+        modules = np.round(np.arange(0.3, 5.0 + module_step / 2, module_step), 6)
+        pressure_angles = np.arange(20.0, 30.0 + pressure_angle_step / 2, pressure_angle_step)
+        codes = material_codes(list(materials))
+
+        columns = {name: [] for name in INDEX_COLUMNS}
+
+        # Un material a la vez para acotar la memoria temporal
+        for code in codes:
+            grid = np.meshgrid(teeth, modules, pressure_angles, indexing='ij')
+            teeth_cs, module, pressure_angle = (axis.ravel() for axis in grid)
+            batch = evaluate_batch(teeth_cs, module, pressure_angle, code)
+
+            keep = batch['is_valid']
+            batch['strain_margin'] = 1 - batch['strain'] / batch['max_strain']
+            for name in INDEX_COLUMNS:
+                columns[name].append(np.broadcast_to(batch[name], keep.shape)[keep])
+
+        return cls({name: np.concatenate(parts) for name, parts in columns.items()})
+
+    def save(self, path: str):
+        """Guarda el índice en un archivo .npz"""
+        np.savez(path, **self.columns)
+
+    @classmethod
+    def load(cls, path: str) -> 'DesignIndex':
+        """Carga un índice guardado con save()"""
+        with np.load(path) as data:
+            columns = {name: data[name] for name in INDEX_COLUMNS}
+
+        # Las columnas ya están ordenadas: evitar el lexsort de __init__
+        index = cls.__new__(cls)
+        index.columns = columns
+        index.teeth_values, index._offsets = np.unique(
+            columns['teeth_cs'], return_index=True
+        )
+        index._offsets = np.append(index._offsets, len(columns['teeth_cs']))
+        return index
+
+    def row(self, i: int) -> Dict:
+        """Diccionario con los valores de una fila y sus HarmonicDriveParams"""
+        values = {name: column[i].item() for name, column in self.columns.items()}
+        values['material'] = MATERIALS[values['material']]
+        values['params'] = HarmonicDriveParams(
+            teeth_cs=values['teeth_cs'],
+            module=values['module'],
+            pressure_angle=values['pressure_angle'],
+            material=values['material']
+        )
+        return values
+
+    def nearest(self, reduction_ratio: float,
+                max_outer_diameter: Optional[float] = None,
+                max_pitch_diameter: Optional[float] = None,
+                material: Optional[str] = None,
+                pressure_angle: Optional[float] = None,
+                min_strain_margin: float = 0.0,
+                max_ratio_error: Optional[float] = None,
+                k: int = 1) -> List[Dict]:
+        """
+        Diseños válidos más cercanos a una reducción dada
+
+        Se recorren los grupos de dientes del más cercano al más lejano en
+        reducción. Dentro de un grupo se prefieren los diseños más grandes que
+        aún respetan los límites de diámetro (los más pequeños si no hay
+        límite), igual que suggest_parameters prefiere el mayor módulo.
+
+        Args:
+            reduction_ratio: Reducción deseada
+            max_outer_diameter: Diámetro exterior máximo del CS en mm
+            max_pitch_diameter: Diámetro primitivo máximo del CS en mm
+            material: Material exigido (None = cualquiera)
+            pressure_angle: Ángulo de presión exigido (None = cualquiera)
+            min_strain_margin: Margen mínimo 1 - strain / strain_máx
+            max_ratio_error: Diferencia máxima de reducción (None = sin límite)
+            k: Número de diseños a devolver
+
+        Returns:
+            Lista de filas (ver row) ordenadas de mejor a peor
+        """
+        columns = self.columns
+        material_code = None
+        if material is not None:
+            material_code = material_codes(material).item()
+            if material_code < 0:
+                raise ValueError(f"Material desconocido: {material}")
+
+        ratio_error = np.abs(self.teeth_values / 2 - reduction_ratio)
+        results = []
+
+        for group in np.argsort(ratio_error, kind='stable'):
+            if max_ratio_error is not None and ratio_error[group] > max_ratio_error:
+                break
+
+            start = self._offsets[group]
+            end = self._offsets[group + 1]
+
+            # Recortar el grupo por los límites de diámetro
+            if max_outer_diameter is not None:
+                end = start + np.searchsorted(
+                    columns['cs_outer_diameter'][start:end], max_outer_diameter, side='right'
+                )
+            if max_pitch_diameter is not None:
+                end = start + np.searchsorted(
+                    columns['cs_pitch_diameter'][start:end], max_pitch_diameter, side='right'
+                )
+            if end <= start:
+                continue
+
+            rows = np.arange(start, end)
+            keep = columns['strain_margin'][rows] >= min_strain_margin
+            if material_code is not None:
+                keep &= columns['material'][rows] == material_code
+            if pressure_angle is not None:
+                keep &= np.isclose(columns['pressure_angle'][rows], pressure_angle)
+            rows = rows[keep]
+
+            if max_outer_diameter is not None or max_pitch_diameter is not None:
+                rows = rows[::-1]
+
+            results.extend(self.row(i) for i in rows[:k - len(results)])
+            if len(results) >= k:
+                break
+
+        return results
+
+
+if __name__ == "__main__":
+    # Construir el índice offline: python core/design_index.py indice.npz
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'design_index.npz'
+    start_time = time.perf_counter()
+    index = DesignIndex.build()
+    index.save(path)
+    print(f"Índice con {len(index)} diseños guardado en {path} "
+          f"({time.perf_counter() - start_time:.1f} s)")
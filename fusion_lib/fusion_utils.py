@@ -6,6 +6,87 @@ Hace que trabajar con Fusion sea más fácil y directo
 import adsk.core
 import adsk.fusion
 import math
+from contextlib import contextmanager
+
+# Biblioteca de apariencias de Fusion y apariencia que se copia para crear
+# las que faltan (luego se cambia su color)
+APPEARANCE_LIBRARY_ID = 'BA5EE55E-9982-449B-9D66-9F036540E140'
+APPEARANCE_LIBRARY_NAME = 'Fusion 360 Appearance Library'
+APPEARANCE_BASE_NAME = 'Paint - Enamel Glossy (White)'
+
+
+class AppearanceCache:
+    """
+    Índice nombre -> apariencia del diseño activo
+    
+    Evita recorrer design.appearances por cada cuerpo: cada nombre se busca
+    una vez y las apariencias que faltan se crean al pedirlas. El índice se
+    descarta al cambiar de diseño o si una apariencia guardada deja de ser
+    válida (p. ej. se borró). Hay una instancia compartida, appearance_cache.
+    
+    La API no crea apariencias vacías: las que faltan se copian de
+    APPEARANCE_BASE_NAME de la biblioteca de apariencias.
+    """
+    
+    def __init__(self):
+        self._design = None
+        self._by_name = {}
+    
+    def invalidate(self):
+        """Descarta el índice; la próxima consulta vuelve a buscar en el diseño"""
+        self._design = None
+        self._by_name = {}
+    
+    def get(self, design, name, r=128, g=128, b=128):
+        """
+        Devuelve la apariencia con ese nombre, creándola si no existe
+        
+        Args:
+            design: Diseño donde buscar/crear la apariencia
+            name: Nombre de la apariencia
+            r, g, b: Color (0-255) si hay que crearla
+        
+        Raises:
+            RuntimeError: Si falta la apariencia base de la biblioteca
+        """
+        if self._design is None or not self._design.isValid or self._design != design:
+            self.invalidate()
+            self._design = design
+        
+        appearance = self._by_name.get(name)
+        if appearance is not None and appearance.isValid:
+            return appearance
+        
+        appearances = design.appearances
+        appearance = appearances.itemByName(name)
+        
+        # Crear si no existe
+        if not appearance:
+            appearance = appearances.addByCopy(self._base_appearance(), name)
+            
+            color_prop = appearance.appearanceProperties.itemByName("Color")
+            if color_prop:
+                color_prop.value = adsk.core.Color.create(r, g, b, 255)
+        
+        self._by_name[name] = appearance
+        return appearance
+    
+    def _base_appearance(self):
+        """Apariencia de la biblioteca que se copia para crear las nuevas"""
+        libraries = adsk.core.Application.get().materialLibraries
+        library = (libraries.itemById(APPEARANCE_LIBRARY_ID)
+                   or libraries.itemByName(APPEARANCE_LIBRARY_NAME))
+        base = library.appearances.itemByName(APPEARANCE_BASE_NAME) if library else None
+        if base is None:
+            raise RuntimeError(
+                f"No se encontró '{APPEARANCE_BASE_NAME}' en {APPEARANCE_LIBRARY_NAME}"
+            )
+        return base
+
+
+# Índice compartido por FusionWrapper y todos los generadores
+appearance_cache = AppearanceCache()
+
 
 class FusionWrapper:
     """
@@ -145,20 +226,218 @@ class FusionWrapper:
         extrude = extrudes.add(extrude_input)
         return extrude
     
-    def patron_circular(self, objeto, eje, cantidad):
+    def parametro_usuario(self, nombre, expresion, unidades="mm", comentario=""):
+        """
+        Crea un parámetro de usuario o actualiza su expresión
+        
+        La expresión sólo se asigna si cambió, así Fusion no recalcula las
+        features que dependen de un parámetro que sigue igual.
+        
+        Args:
+            nombre: Nombre del parámetro
+            expresion: Expresión (p. ej. "20 mm" o "HD_a * HD_b")
+            unidades: Unidades del parámetro ("" = sin unidades)
+            comentario: Descripción visible en la tabla de parámetros
+            
+        Returns:
+            La expresión anterior (None si el parámetro se creó)
+        """
+        params = self.design.userParameters
+        param = params.itemByName(nombre)
+        if param is None:
+            params.add(nombre, adsk.core.ValueInput.createByString(expresion),
+                       unidades, comentario)
+            return None
+        
+        anterior = param.expression
+        if anterior != expresion:
+            param.expression = expresion
+        return anterior
+    
+    def patron_circular(self, objeto, eje, cantidad, componente=None):
         """
         Crea un patrón circular de un objeto
         
         Args:
-            objeto: El objeto a repetir
+            objeto: El objeto a repetir (feature o cuerpo)
             eje: El eje de rotación
             cantidad: Número de copias (incluyendo el original)
+            componente: Componente donde crear el patrón (None = root)
             
         Returns:
             El patrón creado
         """
-        # Esta función es más compleja, la simplificaremos más adelante
-        pass
+        if componente is None:
+            componente = self.root
+        
+        entidades = adsk.core.ObjectCollection.create()
+        entidades.add(objeto)
+        
+        patterns = componente.features.circularPatternFeatures
+        pattern_input = patterns.createInput(entidades, eje)
+        pattern_input.quantity = adsk.core.ValueInput.createByReal(cantidad)
+        pattern_input.totalAngle = adsk.core.ValueInput.createByString('360 deg')
+        pattern_input.isSymmetric = False
+        
+        # Todas las copias son idénticas: evita recalcular cada instancia
+        pattern_input.patternComputeOption = (
+            adsk.fusion.PatternComputeOptions.IdenticalPatternCompute
+        )
+        
+        return patterns.add(pattern_input)
+    
+    def crear_prisma_brep(self, bordes, altura):
+        """
+        Crea un prisma temporal (sin sketch ni historial) a partir de un contorno
+        
+        El contorno es un solo lazo cerrado recorrido en sentido antihorario.
+        Cada borde es una tupla:
+            ('line', inicio, fin)
+            ('arc', inicio, medio, fin)   - arco centrado en el origen
+            ('nurbs', curva)              - curva como en dibujar_nurbs
+        con puntos (x, y) en cm; el fin de cada borde es el inicio del siguiente.
+        
+        Args:
+            bordes: Lista de bordes del contorno
+            altura: Altura del prisma en Z (cm)
+            
+        Returns:
+            BRepBody temporal
+        """
+        P = adsk.core.Point3D.create
+        V = adsk.core.Vector3D.create
+        
+        body_def = adsk.fusion.BRepBodyDefinition.create()
+        shell = body_def.lumpDefinitions.add().shellDefinitions.add()
+        
+        # Vértices inferiores/superiores y aristas verticales en cada inicio de borde
+        inicios = [self._inicio_borde(borde) for borde in bordes]
+        abajo = [body_def.createVertexDefinition(P(x, y, 0)) for x, y in inicios]
+        arriba = [body_def.createVertexDefinition(P(x, y, altura)) for x, y in inicios]
+        verticales = [
+            body_def.createEdgeDefinitionByCurve(
+                abajo[i], arriba[i], adsk.core.Line3D.create(P(x, y, 0), P(x, y, altura))
+            )
+            for i, (x, y) in enumerate(inicios)
+        ]
+        
+        aristas_abajo = []
+        aristas_arriba = []
+        for i, borde in enumerate(bordes):
+            j = (i + 1) % len(bordes)
+            curva_abajo, curva_arriba, superficie = self._geometria_borde(borde, altura)
+            aristas_abajo.append(
+                body_def.createEdgeDefinitionByCurve(abajo[i], abajo[j], curva_abajo)
+            )
+            aristas_arriba.append(
+                body_def.createEdgeDefinitionByCurve(arriba[i], arriba[j], curva_arriba)
+            )
+            
+            # Cara lateral: abajo -> vertical -> arriba (invertida) -> vertical
+            coedges = shell.faceDefinitions.add(superficie, False).loopDefinitions.add()
+            coedges = coedges.bRepCoEdgeDefinitions
+            coedges.add(aristas_abajo[i], False)
+            coedges.add(verticales[j], False)
+            coedges.add(aristas_arriba[i], True)
+            coedges.add(verticales[i], True)
+        
+        # Tapas: la inferior mira hacia -Z, así que su lazo va en sentido contrario
+        tapa = shell.faceDefinitions.add(adsk.core.Plane.create(P(0, 0, 0), V(0, 0, -1)), False)
+        coedges = tapa.loopDefinitions.add().bRepCoEdgeDefinitions
+        for arista in reversed(aristas_abajo):
+            coedges.add(arista, True)
+        
+        tapa = shell.faceDefinitions.add(adsk.core.Plane.create(P(0, 0, altura), V(0, 0, 1)), False)
+        coedges = tapa.loopDefinitions.add().bRepCoEdgeDefinitions
+        for arista in aristas_arriba:
+            coedges.add(arista, False)
+        
+        body_def.doFullHealing = True
+        return body_def.createBody()
+    
+    def _inicio_borde(self, borde):
+        """Punto (x, y) inicial de un borde de crear_prisma_brep"""
+        if borde[0] == 'nurbs':
+            x, y = borde[1].control_points[0]
+            return float(x), float(y)
+        x, y = borde[1]
+        return float(x), float(y)
+    
+    def _geometria_borde(self, borde, altura):
+        """Curva inferior, curva superior y superficie lateral de un borde"""
+        P = adsk.core.Point3D.create
+        V = adsk.core.Vector3D.create
+        tipo = borde[0]
+        
+        if tipo == 'line':
+            (x1, y1), (x2, y2) = borde[1], borde[2]
+            # Normal exterior = dirección x Z (contorno antihorario)
+            normal = V(y2 - y1, x1 - x2, 0)
+            normal.normalize()
+            return (
+                adsk.core.Line3D.create(P(x1, y1, 0), P(x2, y2, 0)),
+                adsk.core.Line3D.create(P(x1, y1, altura), P(x2, y2, altura)),
+                adsk.core.Plane.create(P(x1, y1, 0), normal)
+            )
+        
+        if tipo == 'arc':
+            puntos = borde[1:]
+            radio = math.hypot(*puntos[1])
+            return (
+                adsk.core.Arc3D.createByThreePoints(*(P(x, y, 0) for x, y in puntos)),
+                adsk.core.Arc3D.createByThreePoints(*(P(x, y, altura) for x, y in puntos)),
+                adsk.core.Cylinder.create(P(0, 0, 0), V(0, 0, 1), radio)
+            )
+        
+        if tipo == 'nurbs':
+            curva = borde[1]
+            # Superficie reglada: dirección U = la curva, V = lineal en Z
+            puntos = []
+            for x, y in curva.control_points:
+                puntos.append(P(float(x), float(y), 0))
+                puntos.append(P(float(x), float(y), altura))
+            pesos = []
+            if curva.weights is not None:
+                pesos = [float(w) for w in curva.weights for _ in range(2)]
+            abierta = adsk.core.NurbsSurfaceProperties.OpenNurbsSurface
+            superficie = adsk.core.NurbsSurface.create(
+                curva.degree, 1,
+                len(curva.control_points), 2,
+                puntos,
+                [float(k) for k in curva.knots], [0.0, 0.0, 1.0, 1.0],
+                pesos, abierta, abierta
+            )
+            return self._nurbs_3d(curva), self._nurbs_3d(curva, altura), superficie
+        
+        raise ValueError(f"Tipo de borde desconocido: {tipo}")
+    
+    def insertar_cuerpos(self, componente, cuerpos):
+        """
+        Inserta cuerpos temporales en un componente
+        
+        En diseños paramétricos se agrupan en una sola Base Feature, que el
+        timeline no recalcula; en diseños directos se agregan tal cual.
+        
+        Args:
+            componente: Componente destino
+            cuerpos: Lista de BRepBody temporales
+            
+        Returns:
+            Lista de los BRepBody insertados
+        """
+        insertados = []
+        if self.design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+            base = componente.features.baseFeatures.add()
+            base.startEdit()
+            try:
+                for cuerpo in cuerpos:
+                    insertados.append(componente.bRepBodies.add(cuerpo, base))
+            finally:
+                base.finishEdit()
+        else:
+            for cuerpo in cuerpos:
+                insertados.append(componente.bRepBodies.add(cuerpo))
+        return insertados
     
     def mm_a_cm(self, mm):
         """Convierte milímetros a centímetros (unidad interna de Fusion)"""
@@ -198,6 +477,96 @@ class FusionWrapper:
         line = lines.addByTwoPoints(p1, p2)
         return line
     
+    @contextmanager
+    def calculo_diferido(self, sketch):
+        """
+        Difiere el cálculo del sketch (perfiles, restricciones) mientras dura el bloque
+        
+        Fusion recalcula el sketch una sola vez al salir. Se puede anidar:
+        sólo el bloque más externo reactiva el cálculo.
+        """
+        anterior = sketch.isComputeDeferred
+        sketch.isComputeDeferred = True
+        try:
+            yield sketch
+        finally:
+            sketch.isComputeDeferred = anterior
+    
+    def dibujar_polilinea(self, sketch, puntos, cerrada=True, punto_inicial=None):
+        """
+        Dibuja una polilínea conectada a partir de una lista de vértices
+        
+        Cada segmento arranca en el SketchPoint final del anterior, así los
+        segmentos comparten puntos y Fusion no tiene que unirlos al detectar
+        perfiles. Todo el dibujo ocurre con el cálculo del sketch diferido.
+        
+        Args:
+            sketch: El sketch donde dibujar
+            puntos: Vértices (x, y) en cm - lista de tuplas o array (n, 2)
+            cerrada: Si unir el último vértice con el primero
+            punto_inicial: SketchPoint donde continuar una polilínea anterior;
+                           el primer segmento va de él al primer vértice
+            
+        Returns:
+            Lista de las líneas creadas
+        """
+        # Referencias locales: evita resolverlas en cada segmento
+        lines = sketch.sketchCurves.sketchLines
+        add_line = lines.addByTwoPoints
+        create_point = adsk.core.Point3D.create
+        
+        vertices = [(float(x), float(y)) for x, y in puntos]
+        if len(vertices) < (1 if punto_inicial is not None else 2):
+            return []
+        
+        creadas = []
+        with self.calculo_diferido(sketch):
+            if punto_inicial is not None:
+                anterior = punto_inicial
+            else:
+                x, y = vertices.pop(0)
+                anterior = create_point(x, y, 0)
+            for x, y in vertices:
+                line = add_line(anterior, create_point(x, y, 0))
+                creadas.append(line)
+                anterior = line.endSketchPoint
+            
+            if cerrada and len(creadas) > 1:
+                creadas.append(add_line(anterior, creadas[0].startSketchPoint))
+        
+        return creadas
+    
+    def dibujar_nurbs(self, sketch, curva):
+        """
+        Dibuja una curva NURBS como spline fija
+        
+        Args:
+            sketch: El sketch donde dibujar
+            curva: Curva con control_points (n, 2) en cm, knots, degree y
+                   weights (None = no racional), p. ej. una NurbsCurve de
+                   geometry.spline_fit
+            
+        Returns:
+            La SketchFixedSpline creada
+        """
+        nurbs = self._nurbs_3d(curva)
+        return sketch.sketchCurves.sketchFixedSplines.addByNurbsCurve(nurbs)
+    
+    def _nurbs_3d(self, curva, z=0.0):
+        """Convierte una curva NURBS plana en un NurbsCurve3D a la altura z"""
+        puntos = [adsk.core.Point3D.create(float(x), float(y), z)
+                  for x, y in curva.control_points]
+        nodos = [float(k) for k in curva.knots]
+        
+        if curva.weights is None:
+            return adsk.core.NurbsCurve3D.createNonRational(
+                puntos, curva.degree, nodos, False
+            )
+        pesos = [float(w) for w in curva.weights]
+        return adsk.core.NurbsCurve3D.createRational(
+            puntos, curva.degree, nodos, pesos, False
+        )
+    
     def dibujar_arco(self, sketch, centro_x, centro_y, radio, angulo_inicio, angulo_fin):
         """
         Dibuja un arco en el sketch
@@ -239,26 +608,7 @@ class FusionWrapper:
             nombre_color: Nombre del color/material
             r, g, b: Valores RGB (0-255)
         """
-        appearances = self.design.appearances
-        
-        # Buscar si ya existe
-        appearance = None
-        for i in range(appearances.count):
-            if appearances.item(i).name == nombre_color:
-                appearance = appearances.item(i)
-                break
-        
-        # Crear si no existe
-        if not appearance:
-            appearance = appearances.add()
-            appearance.name = nombre_color
-            
-            color_prop = appearance.appearanceProperties.itemByName("Color")
-            if color_prop:
-                color_value = adsk.core.Color.create(r, g, b, 255)
-                color_prop.value = color_value
-        
-        body.appearance = appearance
+        body.appearance = appearance_cache.get(self.design, nombre_color, r, g, b)
     
     def mensaje(self, texto):
         """Muestra un mensaje al usuario"""
@@ -106,36 +106,22 @@ class SimpleGear:
         angulo_por_diente = 360.0 / num_dientes
         ancho_diente = angulo_por_diente * 0.4  # El diente ocupa 40% del paso
         
-        # Dibujar líneas radiales para formar los dientes
-        for i in range(num_dientes):
-            angulo_base = i * angulo_por_diente
-            
-            # Ángulos para el diente
-            ang1 = angulo_base - ancho_diente/2
-            ang2 = angulo_base + ancho_diente/2
-            
-            # Convertir a radianes
-            rad1 = math.radians(ang1)
-            rad2 = math.radians(ang2)
-            
-            # Puntos en el radio primitivo
-            x1_prim = radio_primitivo * math.cos(rad1)
-            y1_prim = radio_primitivo * math.sin(rad1)
-            x2_prim = radio_primitivo * math.cos(rad2)
-            y2_prim = radio_primitivo * math.sin(rad2)
-            
-            # Puntos en el radio exterior (punta del diente)
-            x1_ext = radio_exterior * math.cos(rad1)
-            y1_ext = radio_exterior * math.sin(rad1)
-            x2_ext = radio_exterior * math.cos(rad2)
-            y2_ext = radio_exterior * math.sin(rad2)
-            
-            # Dibujar el diente (dos líneas radiales)
-            self.fusion.dibujar_linea(sketch, x1_prim, y1_prim, x1_ext, y1_ext)
-            self.fusion.dibujar_linea(sketch, x2_prim, y2_prim, x2_ext, y2_ext)
-            
-            # Conectar las puntas
-            self.fusion.dibujar_linea(sketch, x1_ext, y1_ext, x2_ext, y2_ext)
+        # Cada diente es una polilínea abierta: primitivo -> punta -> punta -> primitivo
+        with self.fusion.calculo_diferido(sketch):
+            for i in range(num_dientes):
+                angulo_base = i * angulo_por_diente
+                
+                # Ángulos para el diente, en radianes
+                rad1 = math.radians(angulo_base - ancho_diente/2)
+                rad2 = math.radians(angulo_base + ancho_diente/2)
+                
+                puntos = [
+                    (radio_primitivo * math.cos(rad1), radio_primitivo * math.sin(rad1)),
+                    (radio_exterior * math.cos(rad1), radio_exterior * math.sin(rad1)),
+                    (radio_exterior * math.cos(rad2), radio_exterior * math.sin(rad2)),
+                    (radio_primitivo * math.cos(rad2), radio_primitivo * math.sin(rad2)),
+                ]
+                self.fusion.dibujar_polilinea(sketch, puntos, cerrada=False)
     
     def crear_engranaje_interno(self,
                               num_dientes=40,
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+dxf_export.py - Escritura de contornos 2D como DXF
+Permite llevar el contorno completo de los dientes a Fusion con una sola
+importación en lugar de una llamada a la API por entidad
+NO depende de Fusion 360 - puede ser testeado independientemente
+"""
+
+import os
+import tempfile
+from typing import Iterable, Tuple
+
+import numpy as np
+
+# Código $INSUNITS de cada unidad de longitud
+DXF_UNITS = {'in': 1, 'ft': 2, 'mm': 4, 'cm': 5, 'm': 6}
+
+# Factor de escala desde cm (unidad interna de Fusion) a cada unidad
+CM_TO_UNITS = {'in': 1 / 2.54, 'ft': 1 / 30.48, 'mm': 10.0, 'cm': 1.0, 'm': 0.01}
+
+# Decimales de las coordenadas escritas
+DXF_PRECISION = 6
+
+
+def _pairs(*items) -> str:
+    """Pares (código de grupo, valor) en el formato de texto del DXF"""
+    return ''.join(f'{code}\n{value}\n' for code, value in items)
+
+
+def _polyline(vertices: np.ndarray, closed: bool, precision: int) -> str:
+    """Entidad POLYLINE de R12 con sus VERTEX y SEQEND"""
+    header = _pairs((0, 'POLYLINE'), (8, 0), (66, 1), (70, 1 if closed else 0))
+    xs = np.char.mod(f'%.{precision}f', vertices[:, 0])
+    ys = np.char.mod(f'%.{precision}f', vertices[:, 1])
+    body = ''.join(f'0\nVERTEX\n8\n0\n10\n{x}\n20\n{y}\n' for x, y in zip(xs, ys))
+    return header + body + _pairs((0, 'SEQEND'), (8, 0))
+
+
+def dxf_document(polylines: Iterable[np.ndarray],
+                 circles: Iterable[Tuple[float, float, float]] = (),
+                 units: str = 'mm', precision: int = DXF_PRECISION) -> str:
+    """
+    Documento DXF R12 con polilíneas y círculos
+
+    R12 no tiene splines: las curvas llegan como polilíneas de sus puntos.
+
+    Args:
+        polylines: Vértices (n, 2) de cada polilínea cerrada, ya en `units`
+        circles: (x, y, radio) de cada círculo, ya en `units`
+        units: Unidad de longitud del documento (ver DXF_UNITS)
+        precision: Decimales de las coordenadas
+
+    Returns:
+        Texto del documento
+    """
+    if units not in DXF_UNITS:
+        raise ValueError(f"Unidad desconocida: {units}")
+
+    parts = [
+        _pairs((0, 'SECTION'), (2, 'HEADER'),
+               (9, '$ACADVER'), (1, 'AC1009'),
+               (9, '$INSUNITS'), (70, DXF_UNITS[units]),
+               (0, 'ENDSEC'),
+               (0, 'SECTION'), (2, 'ENTITIES'))
+    ]
+    for x, y, radius in circles:
+        parts.append(_pairs(
+            (0, 'CIRCLE'), (8, 0),
+            (10, f'{x:.{precision}f}'), (20, f'{y:.{precision}f}'),
+            (40, f'{radius:.{precision}f}')
+        ))
+    for vertices in polylines:
+        parts.append(_polyline(np.asarray(vertices, dtype=float), True, precision))
+    parts.append(_pairs((0, 'ENDSEC'), (0, 'EOF')))
+    return ''.join(parts)
+
+
+def write_dxf(polylines_cm: Iterable[np.ndarray],
+              circles_cm: Iterable[Tuple[float, float, float]] = (),
+              units: str = 'mm', directory: str = None) -> str:
+    """
+    Escribe un DXF temporal a partir de geometría en cm
+
+    Args:
+        polylines_cm: Vértices (n, 2) de cada polilínea cerrada en cm
+        circles_cm: (x, y, radio) de cada círculo en cm
+        units: Unidad del documento (la de longitud por defecto del diseño)
+        directory: Carpeta del archivo (None = la temporal del sistema)
+
+    Returns:
+        Ruta del archivo; quien lo pide debe borrarlo
+    """
+    if units not in CM_TO_UNITS:
+        raise ValueError(f"Unidad desconocida: {units}")
+    scale = CM_TO_UNITS[units]
+
+    text = dxf_document(
+        (np.asarray(vertices, dtype=float) * scale for vertices in polylines_cm),
+        ((x * scale, y * scale, radius * scale) for x, y, radius in circles_cm),
+        units
+    )
+    handle, path = tempfile.mkstemp(suffix='.dxf', prefix='hdrive_', dir=directory)
+    with os.fdopen(handle, 'w', encoding='ascii') as stream:
+        stream.write(text)
+    return path
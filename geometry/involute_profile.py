@@ -5,13 +5,122 @@ Basado en las ecuaciones matemáticas correctas
 """
 
 import math
-from typing import List, Tuple, Dict
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import List, Tuple, Dict, Iterator
 import sys
 import os
 
+import numpy as np
+
 # Importar los cálculos base
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from core.calculations import HarmonicDriveParams, HarmonicDriveCalculator
+from core.calculations import (
+    HarmonicDriveParams,
+    HarmonicDriveCalculator,
+    get_calculator,
+    scaled_involute,
+    points_to_tuples
+)
+from geometry.spline_fit import FLANK_FIT_TOLERANCE, fit_bspline
+
+
+def _rotate(points: np.ndarray, angle: float) -> np.ndarray:
+    """Puntos (n, 2) girados angle radianes alrededor del origen"""
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+class VirtualGearProfile(Sequence):
+    """
+    Engranaje "virtual": guarda un solo diente y genera los demás al pedirlos
+    
+    Todos los dientes son el mismo perfil rotado, así que sólo se almacena el
+    diente base en coordenadas polares. Indexar o iterar construye únicamente
+    los dientes solicitados; un diente que nadie consulta no cuesta nada.
+    """
+    
+    def __init__(self, tooth: np.ndarray, teeth: int, pitch_radius: float,
+                 is_internal: bool = False):
+        """
+        Args:
+            tooth: Array (n, 2) con el diente base (externo)
+            teeth: Número de dientes
+            pitch_radius: Radio primitivo (eje de la inversión interna)
+            is_internal: True para engranaje interno
+        """
+        self.teeth = teeth
+        self.is_internal = is_internal
+        self.tooth_pitch = 2 * math.pi / teeth
+        
+        # Diente base en polares
+        self._radius = np.hypot(tooth[:, 0], tooth[:, 1])
+        self._theta = np.arctan2(tooth[:, 1], tooth[:, 0])
+        
+        # Para engranaje interno, voltear el diente hacia adentro
+        if is_internal:
+            self._radius = 2 * pitch_radius - self._radius
+    
+    @property
+    def points_per_tooth(self) -> int:
+        return len(self._radius)
+    
+    def __len__(self) -> int:
+        return self.teeth
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [points_to_tuples(tooth) for tooth in self.teeth_array(index)]
+        return points_to_tuples(self.tooth_array(index))
+    
+    def __iter__(self) -> Iterator[List[Tuple[float, float]]]:
+        for tooth in self.iter_arrays():
+            yield points_to_tuples(tooth)
+    
+    def _build(self, indices: np.ndarray) -> np.ndarray:
+        """Construye los dientes indicados con una rotación vectorizada"""
+        angles = self._theta[np.newaxis, :] + (indices * self.tooth_pitch)[:, np.newaxis]
+        
+        teeth = np.empty((len(indices), len(self._radius), 2), dtype=np.float64)
+        teeth[:, :, 0] = self._radius * np.cos(angles)
+        teeth[:, :, 1] = self._radius * np.sin(angles)
+        return teeth
+    
+    def tooth_array(self, index: int) -> np.ndarray:
+        """Genera un solo diente como array (puntos, 2)"""
+        if index < 0:
+            index += self.teeth
+        if not 0 <= index < self.teeth:
+            raise IndexError(f"Diente {index} fuera de rango (0-{self.teeth - 1})")
+        return self._build(np.array([index]))[0]
+    
+    def teeth_array(self, selection: slice = None) -> np.ndarray:
+        """
+        Genera un grupo de dientes como array (dientes, puntos, 2)
+        
+        Args:
+            selection: Slice de dientes (None = todos)
+        """
+        if selection is None:
+            selection = slice(None)
+        return self._build(np.arange(self.teeth)[selection])
+    
+    def iter_arrays(self, batch_size: int = 1) -> Iterator[np.ndarray]:
+        """
+        Entrega los dientes uno a uno (o por lotes) sin materializar el engranaje
+        
+        Args:
+            batch_size: Dientes por lote; con 1 se entrega un array (puntos, 2)
+        """
+        for start in range(0, self.teeth, batch_size):
+            if batch_size == 1:
+                yield self.tooth_array(start)
+            else:
+                yield self.teeth_array(slice(start, start + batch_size))
+    
+    def to_array(self) -> np.ndarray:
+        """Materializa todo el engranaje como array contiguo (dientes, puntos, 2)"""
+        return self.teeth_array()
 
 
 class InvoluteGearProfile:
@@ -50,6 +159,9 @@ class InvoluteGearProfile:
         # Espesor del diente en el círculo primitivo
         self.tooth_thickness = (math.pi * module) / 2
         
+        # Flancos ya calculados (ver get_tooth_splines y get_tooth_polyline)
+        self._flank_cache = {}
+        
     def involute_function(self, angle: float) -> float:
         """
         Función involuta: inv(α) = tan(α) - α
@@ -84,6 +196,20 @@ class InvoluteGearProfile:
         Returns:
             Lista de puntos (x, y)
         """
+        return points_to_tuples(
+            self.get_involute_array(start_radius, end_radius, num_points)
+        )
+    
+    def get_involute_array(self, start_radius: float = None,
+                           end_radius: float = None,
+                           num_points: int = 30) -> np.ndarray:
+        """
+        Versión vectorizada de get_involute_points
+        
+        Returns:
+            Array (num_points, 2) con los puntos (x, y); vacío si end_radius
+            queda bajo el círculo base
+        """
         
         if start_radius is None:
             start_radius = self.base_radius
@@ -96,7 +222,7 @@ class InvoluteGearProfile:
             start_radius = self.base_radius
         
         if end_radius < self.base_radius:
-            return []  # No hay involuta bajo el círculo base
+            return np.empty((0, 2))  # No hay involuta bajo el círculo base
         
         # Calcular parámetros t para los radios
         if start_radius <= self.base_radius:
@@ -106,14 +232,7 @@ class InvoluteGearProfile:
         
         t_end = math.sqrt((end_radius / self.base_radius) ** 2 - 1)
         
-        # Generar puntos
-        points = []
-        for i in range(num_points):
-            t = t_start + (t_end - t_start) * i / (num_points - 1)
-            point = self.involute_point(t)
-            points.append(point)
-        
-        return points
+        return scaled_involute(self.base_radius, t_start, t_end, num_points)
     
     def get_single_tooth_profile(self, num_points: int = 30) -> List[Tuple[float, float]]:
         """
@@ -122,9 +241,18 @@ class InvoluteGearProfile:
         Returns:
             Lista de puntos que forman el contorno del diente
         """
+        return points_to_tuples(self.get_single_tooth_array(num_points))
+    
+    def get_single_tooth_array(self, num_points: int = 30) -> np.ndarray:
+        """
+        Versión vectorizada de get_single_tooth_profile
+        
+        Returns:
+            Array (n, 2) con el contorno del diente
+        """
         
         # Obtener puntos de la involuta (lado derecho del diente)
-        involute_right = self.get_involute_points(
+        involute_right = self.get_involute_array(
             start_radius=self.root_radius,
             end_radius=self.outside_radius,
             num_points=num_points // 2
@@ -132,59 +260,51 @@ class InvoluteGearProfile:
         
         # Calcular el ángulo del espesor del diente en el pitch circle
         tooth_angle = self.tooth_thickness / self.pitch_radius
-        
-        # Crear el lado izquierdo del diente (espejo y rotación)
-        involute_left = []
-        for x, y in reversed(involute_right):
-            # Espejo respecto al eje X
-            x_mirror = x
-            y_mirror = -y
-            
-            # Rotar por el ángulo del diente
-            x_rot = x_mirror * math.cos(tooth_angle) - y_mirror * math.sin(tooth_angle)
-            y_rot = x_mirror * math.sin(tooth_angle) + y_mirror * math.cos(tooth_angle)
-            
-            involute_left.append((x_rot, y_rot))
+        cos_a = math.cos(tooth_angle)
+        sin_a = math.sin(tooth_angle)
+        
+        # Crear el lado izquierdo del diente (espejo respecto al eje X y
+        # rotación por el ángulo del diente)
+        mirrored = involute_right[::-1]
+        x_mirror = mirrored[:, 0]
+        y_mirror = -mirrored[:, 1]
+        involute_left = np.column_stack((
+            x_mirror * cos_a - y_mirror * sin_a,
+            x_mirror * sin_a + y_mirror * cos_a
+        ))
         
         # Agregar arco en la punta del diente
-        tip_points = self._get_tip_arc(involute_right[-1], involute_left[0], 5)
+        tip_points = self._arc_array(involute_right[-1], involute_left[0], 5)
         
         # Agregar arco en la raíz del diente
-        root_points = self._get_root_fillet(involute_left[-1], involute_right[0], 5)
+        root_points = self._arc_array(involute_left[-1], involute_right[0], 5)
         
         # Combinar todos los puntos
-        profile = involute_right + tip_points + involute_left + root_points
-        
-        return profile
+        return np.concatenate((involute_right, tip_points, involute_left, root_points))
     
-    def _get_tip_arc(self, point1: Tuple[float, float], 
-                     point2: Tuple[float, float],
-                     num_points: int = 5) -> List[Tuple[float, float]]:
+    def _arc_array(self, point1, point2, num_points: int = 5) -> np.ndarray:
         """
-        Genera un arco circular en la punta del diente
+        Arco circular entre dos puntos (sin incluirlos) como array (n-1, 2)
         """
         x1, y1 = point1
         x2, y2 = point2
         
-        # Calcular el centro del arco (en el círculo exterior)
-        r1 = math.sqrt(x1**2 + y1**2)
-        r2 = math.sqrt(x2**2 + y2**2)
-        r_avg = (r1 + r2) / 2
-        
-        # Ángulos de los puntos
+        # Radio medio y ángulos de los extremos
+        r_avg = (math.hypot(x1, y1) + math.hypot(x2, y2)) / 2
         angle1 = math.atan2(y1, x1)
         angle2 = math.atan2(y2, x2)
         
-        # Generar puntos del arco
-        points = []
-        for i in range(1, num_points):
-            t = i / num_points
-            angle = angle1 + (angle2 - angle1) * t
-            x = r_avg * math.cos(angle)
-            y = r_avg * math.sin(angle)
-            points.append((x, y))
-        
-        return points
+        t = np.arange(1, num_points) / num_points
+        angles = angle1 + (angle2 - angle1) * t
+        return np.column_stack((r_avg * np.cos(angles), r_avg * np.sin(angles)))
+    
+    def _get_tip_arc(self, point1: Tuple[float, float], 
+                     point2: Tuple[float, float],
+                     num_points: int = 5) -> List[Tuple[float, float]]:
+        """
+        Genera un arco circular en la punta del diente
+        """
+        return points_to_tuples(self._arc_array(point1, point2, num_points))
     
     def _get_root_fillet(self, point1: Tuple[float, float],
                         point2: Tuple[float, float],
@@ -198,50 +318,132 @@ class InvoluteGearProfile:
         # Por simplicidad, usar un arco directo entre los puntos
         return self._get_tip_arc(point1, point2, num_points)
     
-    def get_gear_profile(self, is_internal: bool = False) -> List[List[Tuple[float, float]]]:
+    def get_gear_profile(self, is_internal: bool = False,
+                         num_points: int = 30) -> VirtualGearProfile:
         """
         Genera el perfil completo del engranaje (todos los dientes)
         
+        Los dientes se construyen bajo demanda al indexar o iterar el
+        resultado, que se comporta como una lista de perfiles de dientes.
+        
         Args:
             is_internal: True para engranaje interno
+            num_points: Puntos por diente
         
         Returns:
-            Lista de perfiles de dientes
+            Secuencia de perfiles de dientes
         """
+        return VirtualGearProfile(
+            self.get_single_tooth_array(num_points),
+            self.teeth,
+            self.pitch_radius,
+            is_internal
+        )
+    
+    def get_tooth_splines(self, is_internal: bool = False, num_points: int = 30,
+                          tolerance: float = FLANK_FIT_TOLERANCE) -> Dict:
+        """
+        Flancos del diente base ajustados como B-splines
         
-        # Obtener perfil de un diente
-        single_tooth = self.get_single_tooth_profile()
+        El flanco derecho se muestrea con num_points // 2 puntos (igual que
+        get_single_tooth_array) y se ajusta una sola vez; el izquierdo es su
+        reflejo respecto al eje del diente. Los demás dientes se obtienen
+        girando los puntos de control.
         
-        # Ángulo entre dientes
-        tooth_pitch = 2 * math.pi / self.teeth
+        Args:
+            is_internal: True para engranaje interno (inversión r' = 2R - r)
+            num_points: Puntos por diente del perfil muestreado
+            tolerance: Desviación máxima del ajuste (mm)
         
-        # Generar todos los dientes
-        all_teeth = []
+        Returns:
+            Diccionario con 'right' (raíz -> punta), 'left' (punta -> raíz),
+            'tip_radius', 'root_radius' y 'tooth_pitch' (rad)
+        """
+        key = ('spline', is_internal, num_points, tolerance)
+        if key not in self._flank_cache:
+            flank = self._base_flank(is_internal, max(num_points // 2, 4))
+            
+            # Girar el flanco para que corte el círculo primitivo en el ángulo 0;
+            # así el diente ocupa [0, tooth_angle] en el primitivo y los flancos
+            # no se cruzan en la punta
+            right = fit_bspline(flank, tolerance).rotated(
+                -self.involute_function(self.pressure_angle_rad)
+            )
+            tooth_angle = self.tooth_thickness / self.pitch_radius
+            
+            self._flank_cache[key] = {
+                'right': right,
+                'left': right.mirrored(tooth_angle / 2).reversed(),
+                'tip_radius': float(np.hypot(*flank[-1])),
+                'root_radius': float(np.hypot(*flank[0])),
+                'tooth_pitch': 2 * math.pi / self.teeth
+            }
+        return dict(self._flank_cache[key])
+    
+    def get_tooth_polyline(self, is_internal: bool = False,
+                           num_points: int = 30) -> Dict:
+        """
+        Flancos del diente base como polilíneas (mismo diente que get_tooth_splines)
+        
+        Cada flanco tiene num_points // 2 puntos (al menos 2: con 2 el diente
+        es un trapecio con los vértices sobre la involuta).
         
-        for i in range(self.teeth):
-            angle = i * tooth_pitch
+        Returns:
+            Diccionario con 'right' y 'left' como arrays (n, 2) de sólo
+            lectura, 'tip_radius', 'root_radius' y 'tooth_pitch' (rad)
+        """
+        key = ('polyline', is_internal, num_points)
+        if key not in self._flank_cache:
+            flank = self._base_flank(is_internal, max(num_points // 2, 2))
+            
+            angle = -self.involute_function(self.pressure_angle_rad)
+            right = _rotate(flank, angle)
             
-            # Rotar el diente a su posición
-            tooth_points = []
-            for x, y in single_tooth:
-                # Para engranaje interno, invertir el diente
-                if is_internal:
-                    # Voltear el diente hacia adentro
-                    r = math.sqrt(x**2 + y**2)
-                    r_inverted = 2 * self.pitch_radius - r
-                    angle_point = math.atan2(y, x)
-                    x = r_inverted * math.cos(angle_point)
-                    y = r_inverted * math.sin(angle_point)
-                
-                # Rotar a la posición correcta
-                x_rot = x * math.cos(angle) - y * math.sin(angle)
-                y_rot = x * math.sin(angle) + y * math.cos(angle)
-                
-                tooth_points.append((x_rot, y_rot))
+            # Reflejo respecto al eje del diente, de la punta a la raíz
+            axis = self.tooth_thickness / self.pitch_radius
+            left = np.ascontiguousarray(_rotate(right * [1.0, -1.0], axis)[::-1])
             
-            all_teeth.append(tooth_points)
+            right.setflags(write=False)
+            left.setflags(write=False)
+            self._flank_cache[key] = {
+                'right': right,
+                'left': left,
+                'tip_radius': float(np.hypot(*flank[-1])),
+                'root_radius': float(np.hypot(*flank[0])),
+                'tooth_pitch': 2 * math.pi / self.teeth
+            }
+        return dict(self._flank_cache[key])
+    
+    def _base_flank(self, is_internal: bool, num_points: int) -> np.ndarray:
+        """Flanco derecho sin girar (raíz -> punta), invertido si es interno"""
+        flank = self.get_involute_array(
+            start_radius=self.root_radius,
+            end_radius=self.outside_radius,
+            num_points=num_points
+        )
+        
+        if is_internal:
+            radius = np.hypot(flank[:, 0], flank[:, 1])
+            flank = flank * ((2 * self.pitch_radius - radius) / radius)[:, np.newaxis]
+        return flank
+    
+    def get_gear_array(self, is_internal: bool = False,
+                       num_points: int = 30) -> np.ndarray:
+        """
+        Genera todos los dientes con una sola rotación vectorizada
+        
+        El diente se pasa a coordenadas polares una única vez; la inversión
+        del engranaje interno es r' = 2R - r y la rotación de cada diente es
+        un desplazamiento del ángulo polar.
+        
+        Args:
+            is_internal: True para engranaje interno
+            num_points: Puntos por diente
         
-        return all_teeth
+        Returns:
+            Array contiguo (dientes, puntos, 2)
+        """
+        return self.get_gear_profile(is_internal, num_points).to_array()
     
     def validate_profile(self) -> Dict:
         """
@@ -308,32 +510,50 @@ class HarmonicDriveInvoluteProfile:
         Inicializa con parámetros de Harmonic Drive
         """
         self.params = params
-        self.calc = HarmonicDriveCalculator(params)
+        self.calc = get_calculator(params)
         
-        # Crear generadores para CS y FS
-        self.cs_profile = InvoluteGearProfile(
-            module=params.module,
-            teeth=params.teeth_cs,
-            pressure_angle=params.pressure_angle
+        # Generadores de CS y FS compartidos, con addendum ajustado para HD
+        addendum = params.addendum_factor * params.module
+        self.cs_profile = get_involute_profile(
+            params.module, params.teeth_cs, params.pressure_angle, addendum
         )
-        
-        self.fs_profile = InvoluteGearProfile(
-            module=params.module,
-            teeth=params.teeth_fs,
-            pressure_angle=params.pressure_angle
+        self.fs_profile = get_involute_profile(
+            params.module, params.teeth_fs, params.pressure_angle, addendum
         )
-        
-        # Ajustar addendum para HD
-        self.cs_profile.addendum = params.addendum_factor * params.module
-        self.fs_profile.addendum = params.addendum_factor * params.module
     
-    def get_cs_profile(self) -> List[List[Tuple[float, float]]]:
+    def get_cs_profile(self, num_points: int = 30) -> VirtualGearProfile:
         """Obtiene el perfil del Circular Spline (interno)"""
-        return self.cs_profile.get_gear_profile(is_internal=True)
+        return self.cs_profile.get_gear_profile(is_internal=True, num_points=num_points)
     
-    def get_fs_profile(self) -> List[List[Tuple[float, float]]]:
+    def get_fs_profile(self, num_points: int = 30) -> VirtualGearProfile:
         """Obtiene el perfil del Flex Spline (externo)"""
-        return self.fs_profile.get_gear_profile(is_internal=False)
+        return self.fs_profile.get_gear_profile(is_internal=False, num_points=num_points)
+    
+    def get_cs_profile_array(self, num_points: int = 30) -> np.ndarray:
+        """Perfil del Circular Spline como array (dientes, puntos, 2)"""
+        return self.cs_profile.get_gear_array(is_internal=True, num_points=num_points)
+    
+    def get_fs_profile_array(self, num_points: int = 30) -> np.ndarray:
+        """Perfil del Flex Spline como array (dientes, puntos, 2)"""
+        return self.fs_profile.get_gear_array(is_internal=False, num_points=num_points)
+    
+    def get_cs_tooth_splines(self, num_points: int = 30,
+                             tolerance: float = FLANK_FIT_TOLERANCE) -> Dict:
+        """Flancos ajustados del Circular Spline (ver get_tooth_splines)"""
+        return self.cs_profile.get_tooth_splines(True, num_points, tolerance)
+    
+    def get_fs_tooth_splines(self, num_points: int = 30,
+                             tolerance: float = FLANK_FIT_TOLERANCE) -> Dict:
+        """Flancos ajustados del Flex Spline (ver get_tooth_splines)"""
+        return self.fs_profile.get_tooth_splines(False, num_points, tolerance)
+    
+    def get_cs_tooth_polyline(self, num_points: int = 30) -> Dict:
+        """Flancos en polilínea del Circular Spline (ver get_tooth_polyline)"""
+        return self.cs_profile.get_tooth_polyline(True, num_points)
+    
+    def get_fs_tooth_polyline(self, num_points: int = 30) -> Dict:
+        """Flancos en polilínea del Flex Spline (ver get_tooth_polyline)"""
+        return self.fs_profile.get_tooth_polyline(False, num_points)
     
     def validate_meshing(self) -> Dict:
         """
@@ -381,6 +601,35 @@ class HarmonicDriveInvoluteProfile:
         return results
 
 
+# Máximo de generadores de perfil compartidos retenidos por el proceso
+PROFILE_CACHE_SIZE = 32
+
+# Máximo de perfiles de engranaje (con sus flancos en caché) compartidos
+GEAR_PROFILE_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=GEAR_PROFILE_CACHE_SIZE)
+def get_involute_profile(module: float, teeth: int, pressure_angle: float,
+                         addendum: float) -> InvoluteGearProfile:
+    """
+    Devuelve un perfil involuta compartido para la misma geometría de diente
+
+    Los diseños que sólo difieren en material o tolerancia, y el FS de una
+    relación con el CS de la relación anterior, reutilizan los flancos,
+    splines y polilíneas ya calculados.
+    """
+    profile = InvoluteGearProfile(module=module, teeth=teeth, pressure_angle=pressure_angle)
+    profile.addendum = addendum
+    return profile
+
+
+
+@lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def get_profile_generator(params: HarmonicDriveParams) -> HarmonicDriveInvoluteProfile:
+    """Devuelve un generador de perfiles compartido para parámetros iguales"""
+    return HarmonicDriveInvoluteProfile(params)
+
+
 # Funciones de utilidad para testing
 def test_involute_profile():
     """Test rápido del generador de perfil involuta"""
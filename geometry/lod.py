@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+lod.py - Nivel de detalle automático de los dientes
+Elige la representación más barata de los dientes (círculo, trapecio,
+polilínea o spline de involuta) cuya desviación respecto a la involuta real
+queda dentro de un presupuesto de tolerancia de cuerda
+NO depende de Fusion 360 - puede ser testeado independientemente
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.calculations import HarmonicDriveParams
+from geometry.involute_profile import InvoluteGearProfile, get_profile_generator
+from geometry.spline_fit import FLANK_FIT_TOLERANCE
+
+# Objetivos de detalle
+LOD_TARGETS = ('preview', 'visual', 'manufacturing')
+
+# Presupuesto de cuerda por objetivo: (absoluto en mm, relativo al diámetro
+# primitivo); se usa el mayor de los dos
+LOD_TOLERANCES = {
+    'preview': (0.05, 0.01),
+    'visual': (0.01, 0.0005),
+    'manufacturing': (FLANK_FIT_TOLERANCE, 0.0)
+}
+
+# Representaciones de menor a mayor fidelidad
+REPRESENTATIONS = ('circle', 'trapezoid', 'polyline', 'spline')
+
+# Costo de una spline frente a una línea o arco en el sketch
+SPLINE_ENTITY_COST = 3
+
+# Puntos por flanco de la polilínea más fina que se considera
+MAX_POLYLINE_POINTS = 25
+
+# Puntos por diente con que se muestrea el flanco a ajustar como spline
+LOD_SPLINE_POINTS = 30
+
+# Puntos por flanco de la involuta de referencia
+REFERENCE_POINTS = 200
+
+# Máximo de selecciones retenidas por el proceso
+LOD_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class ToothLOD:
+    """Representación elegida para los dientes de un engranaje"""
+    representation: str      # Una de REPRESENTATIONS
+    points_per_tooth: int    # Puntos por diente (polilínea o muestreo del ajuste)
+    tolerance: float         # Presupuesto de cuerda (mm)
+    error: float             # Desviación estimada respecto a la involuta (mm)
+    entities_per_tooth: int  # Entidades de sketch ponderadas por diente
+
+
+def chord_tolerance(target: str, pitch_diameter: float) -> float:
+    """Presupuesto de cuerda (mm) de un objetivo para un diámetro primitivo dado"""
+    if target not in LOD_TOLERANCES:
+        raise ValueError(f"Objetivo de detalle desconocido: {target}")
+    absolute, relative = LOD_TOLERANCES[target]
+    return max(absolute, relative * pitch_diameter)
+
+
+def _distance_to_polyline(points: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """Distancia de cada punto (m, 2) a la polilínea abierta de vértices (n, 2)"""
+    start = vertices[:-1]
+    segment = vertices[1:] - start
+    offset = points[:, np.newaxis, :] - start[np.newaxis]
+    length2 = np.maximum(np.sum(segment * segment, axis=1), 1e-30)
+    t = np.clip(np.sum(offset * segment, axis=2) / length2, 0.0, 1.0)
+    nearest = offset - t[..., np.newaxis] * segment
+    return np.hypot(nearest[..., 0], nearest[..., 1]).min(axis=1)
+
+
+def _arc(start: np.ndarray, end: np.ndarray, num_points: int) -> np.ndarray:
+    """Arco centrado en el origen de start a end (radio medio, arco corto)"""
+    angle1 = math.atan2(start[1], start[0])
+    sweep = math.remainder(math.atan2(end[1], end[0]) - angle1, 2 * math.pi)
+    radius = (math.hypot(*start) + math.hypot(*end)) / 2
+    angles = angle1 + sweep * np.linspace(0.0, 1.0, num_points)
+    return radius * np.column_stack((np.cos(angles), np.sin(angles)))
+
+
+def _rotated(points: np.ndarray, angle: float) -> np.ndarray:
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+class _ToothErrors:
+    """Desviación de cada representación respecto a un diente de referencia"""
+
+    def __init__(self, profile: InvoluteGearProfile, is_internal: bool):
+        self.profile = profile
+        self.is_internal = is_internal
+
+        reference = profile.get_tooth_polyline(is_internal, 2 * REFERENCE_POINTS)
+        self.pitch = reference['tooth_pitch']
+        self.depth = abs(reference['tip_radius'] - reference['root_radius'])
+        right, left = reference['right'], reference['left']
+        next_start = _rotated(right[:1], self.pitch)[0]
+
+        # Flancos, arco de punta y arco de raíz hasta el diente siguiente
+        self.flank = right
+        self.tooth = np.vstack((
+            right,
+            _arc(right[-1], left[0], REFERENCE_POINTS // 4),
+            left,
+            _arc(left[-1], next_start, REFERENCE_POINTS // 4)
+        ))
+
+    def polyline(self, points_per_flank: int) -> float:
+        tooth = self.profile.get_tooth_polyline(self.is_internal, 2 * points_per_flank)
+        right = tooth['right']
+        vertices = np.vstack((right, tooth['left'], _rotated(right[:1], self.pitch)))
+        return float(_distance_to_polyline(self.tooth, vertices).max())
+
+    def spline(self, tolerance: float) -> float:
+        # Puntas y raíces son arcos exactos; sólo se mide el flanco
+        right = self.profile.get_tooth_splines(
+            self.is_internal, LOD_SPLINE_POINTS, tolerance
+        )['right']
+        u = np.linspace(right.knots[0], right.knots[-1], REFERENCE_POINTS)
+        return float(_distance_to_polyline(self.flank, right.evaluate(u)).max())
+
+
+def select_tooth_lod(profile: InvoluteGearProfile, is_internal: bool,
+                     target: str) -> ToothLOD:
+    """
+    Elige la representación más barata que cumple el presupuesto de cuerda
+
+    Los candidatos se prueban en orden de costo por diente (círculo, trapecio
+    con vértices sobre la involuta, polilíneas cada vez más finas y spline
+    ajustada); la desviación sólo se calcula hasta encontrar uno que cumpla.
+    Si ninguno cumple se devuelve el de menor desviación.
+
+    Args:
+        profile: Perfil involuta del engranaje
+        is_internal: True para engranaje interno
+        target: Objetivo de detalle (ver LOD_TARGETS)
+
+    Returns:
+        ToothLOD elegido
+    """
+    tolerance = chord_tolerance(target, profile.pitch_diameter)
+    errors = _ToothErrors(profile, is_internal)
+
+    # (costo por diente, orden, representación, puntos por diente, error)
+    candidates = [(0, 0, 'circle', 0, lambda: errors.depth),
+                  (4, 1, 'trapezoid', 4, lambda: errors.polyline(2))]
+    for points in range(3, MAX_POLYLINE_POINTS + 1):
+        candidates.append((2 * points, 2, 'polyline', 2 * points,
+                           lambda points=points: errors.polyline(points)))
+    candidates.append((2 * SPLINE_ENTITY_COST + 2, 3, 'spline', LOD_SPLINE_POINTS,
+                       lambda: errors.spline(tolerance)))
+    candidates.sort(key=lambda candidate: candidate[:2])
+
+    best = None
+    for cost, _, representation, points, error in candidates:
+        lod = ToothLOD(representation, points, tolerance, error(), cost)
+        if lod.error <= tolerance:
+            return lod
+        if best is None or lod.error < best.error:
+            best = lod
+    return best
+
+
+@lru_cache(maxsize=LOD_CACHE_SIZE)
+def get_tooth_lod(params: HarmonicDriveParams, part: str, target: str) -> ToothLOD:
+    """
+    Nivel de detalle de los dientes del CS ('cs') o del FS ('fs'), en caché
+
+    Se calcula una sola vez por parámetros, parte y objetivo.
+    """
+    generator = get_profile_generator(params)
+    if part == 'cs':
+        return select_tooth_lod(generator.cs_profile, True, target)
+    if part == 'fs':
+        return select_tooth_lod(generator.fs_profile, False, target)
+    raise ValueError(f"Parte sin dientes: {part}")
+
+
+def lod_summary(params: HarmonicDriveParams) -> Dict[str, Dict[str, ToothLOD]]:
+    """Niveles de detalle de CS y FS para todos los objetivos"""
+    return {
+        target: {part: get_tooth_lod(params, part, target) for part in ('cs', 'fs')}
+        for target in LOD_TARGETS
+    }
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+spline_fit.py - Ajuste de curvas B-spline/NURBS con pocos puntos de control
+Permite emitir cada flanco de involuta como una sola spline en lugar de una
+polilínea densa
+NO depende de Fusion 360 - puede ser testeado independientemente
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Tolerancia por defecto del ajuste de flancos (mm)
+FLANK_FIT_TOLERANCE = 0.002
+
+# Grado de las B-splines de flanco
+FLANK_FIT_DEGREE = 3
+
+
+def bspline_basis(u: np.ndarray, knots: np.ndarray, degree: int) -> np.ndarray:
+    """
+    Funciones base B-spline evaluadas en todos los parámetros (Cox-de Boor)
+
+    Args:
+        u: Parámetros donde evaluar (m,)
+        knots: Vector de nodos (n + degree + 1,)
+        degree: Grado de la curva
+
+    Returns:
+        Matriz (m, n) con N_i,p(u)
+    """
+    u = np.asarray(u, dtype=np.float64)[:, np.newaxis]
+    knots = np.asarray(knots, dtype=np.float64)
+    n = len(knots) - degree - 1
+
+    # Grado 0: indicadora de cada intervalo de nodos
+    basis = ((knots[:-1] <= u) & (u < knots[1:])).astype(np.float64)
+
+    # El último parámetro pertenece al último intervalo no vacío
+    at_end = u[:, 0] >= knots[-1]
+    if at_end.any():
+        last_span = np.nonzero(knots[:-1] < knots[1:])[0][-1]
+        basis[at_end] = 0.0
+        basis[at_end, last_span] = 1.0
+
+    for p in range(1, degree + 1):
+        left_den = knots[p:-1] - knots[:-p - 1]
+        right_den = knots[p + 1:] - knots[1:-p]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            left = np.where(left_den > 0, (u - knots[:-p - 1]) / left_den, 0.0)
+            right = np.where(right_den > 0, (knots[p + 1:] - u) / right_den, 0.0)
+        basis = left * basis[:, :-1] + right * basis[:, 1:]
+
+    return basis[:, :n]
+
+
+@dataclass(frozen=True, eq=False)
+class NurbsCurve:
+    """
+    Curva NURBS plana (weights=None para una B-spline no racional)
+
+    Las transformaciones rígidas se aplican a los puntos de control, así que
+    un flanco ajustado una vez sirve para todos los dientes del engranaje.
+    """
+    control_points: np.ndarray
+    knots: np.ndarray
+    degree: int
+    weights: Optional[np.ndarray] = None
+    max_error: float = 0.0
+
+    @property
+    def is_rational(self) -> bool:
+        return self.weights is not None
+
+    def evaluate(self, u) -> np.ndarray:
+        """Puntos de la curva para los parámetros u (en [knots[0], knots[-1]])"""
+        basis = bspline_basis(np.atleast_1d(u), self.knots, self.degree)
+        if self.weights is None:
+            return basis @ self.control_points
+        weighted = basis * self.weights
+        return (weighted @ self.control_points) / weighted.sum(axis=1)[:, np.newaxis]
+
+    @property
+    def start_point(self) -> np.ndarray:
+        return self.control_points[0]
+
+    @property
+    def end_point(self) -> np.ndarray:
+        return self.control_points[-1]
+
+    def _with_points(self, points: np.ndarray) -> 'NurbsCurve':
+        return NurbsCurve(points, self.knots, self.degree, self.weights, self.max_error)
+
+    def rotated(self, angle: float) -> 'NurbsCurve':
+        """Curva girada angle radianes alrededor del origen"""
+        c, s = math.cos(angle), math.sin(angle)
+        return self._with_points(self.control_points @ np.array([[c, s], [-s, c]]))
+
+    def mirrored(self, angle: float) -> 'NurbsCurve':
+        """Curva reflejada respecto a la recta por el origen con ese ángulo"""
+        c, s = math.cos(2 * angle), math.sin(2 * angle)
+        return self._with_points(self.control_points @ np.array([[c, s], [s, -c]]))
+
+    def scaled(self, factor: float) -> 'NurbsCurve':
+        """Curva escalada desde el origen (p. ej. 0.1 para pasar de mm a cm)"""
+        return NurbsCurve(
+            self.control_points * factor, self.knots, self.degree,
+            self.weights, self.max_error * factor
+        )
+
+    def reversed(self) -> 'NurbsCurve':
+        """La misma curva recorrida en sentido contrario"""
+        knots = self.knots[0] + self.knots[-1] - self.knots[::-1]
+        weights = None if self.weights is None else self.weights[::-1].copy()
+        return NurbsCurve(
+            self.control_points[::-1].copy(), knots, self.degree, weights, self.max_error
+        )
+
+
+def clamped_knots(num_control_points: int, degree: int) -> np.ndarray:
+    """Vector de nodos sujeto en los extremos con nodos interiores uniformes"""
+    interior = np.linspace(0.0, 1.0, num_control_points - degree + 1)[1:-1]
+    return np.concatenate((np.zeros(degree + 1), interior, np.ones(degree + 1)))
+
+
+def fit_bspline(points: np.ndarray, tolerance: float = FLANK_FIT_TOLERANCE,
+                degree: int = FLANK_FIT_DEGREE,
+                max_control_points: Optional[int] = None) -> NurbsCurve:
+    """
+    Ajusta una B-spline con el menor número de puntos de control posible
+
+    Se parametriza por longitud de cuerda y se resuelve por mínimos cuadrados
+    con los extremos fijos (la curva pasa exactamente por el primer y último
+    punto). Se añaden puntos de control hasta que la desviación en los puntos
+    de entrada queda bajo la tolerancia; con tantos puntos de control como
+    puntos de entrada la curva interpola y el error es cero.
+
+    Args:
+        points: Array (m, 2) con los puntos a ajustar, en orden
+        tolerance: Desviación máxima admitida (mismas unidades que points)
+        degree: Grado de la curva
+        max_control_points: Límite de puntos de control (None = m)
+
+    Returns:
+        NurbsCurve no racional con max_error = desviación alcanzada
+    """
+    points = np.asarray(points, dtype=np.float64)
+    m = len(points)
+    if m < 2:
+        raise ValueError("Se necesitan al menos 2 puntos para ajustar una curva")
+
+    degree = min(degree, m - 1)
+    if max_control_points is None:
+        max_control_points = m
+    max_control_points = max(degree + 1, min(max_control_points, m))
+
+    # Parámetros por longitud de cuerda
+    chords = np.hypot(*np.diff(points, axis=0).T)
+    u = np.concatenate(([0.0], np.cumsum(chords)))
+    u /= u[-1]
+
+    start, end = points[0], points[-1]
+    for n in range(degree + 1, max_control_points + 1):
+        knots = clamped_knots(n, degree)
+        basis = bspline_basis(u, knots, degree)
+
+        # Extremos fijos: sólo se resuelven los puntos de control interiores
+        control = np.empty((n, 2))
+        control[0], control[-1] = start, end
+        if n > 2:
+            rhs = points - np.outer(basis[:, 0], start) - np.outer(basis[:, -1], end)
+            control[1:-1] = np.linalg.lstsq(basis[:, 1:-1], rhs, rcond=None)[0]
+
+        error = float(np.max(np.hypot(*(basis @ control - points).T)))
+        if error <= tolerance:
+            break
+
+    return NurbsCurve(control, knots, degree, max_error=error)
+
+
+def ellipse_nurbs(major_radius: float, minor_radius: float) -> NurbsCurve:
+    """
+    Elipse exacta centrada en el origen como NURBS racional cuadrática
+
+    Son 9 puntos de control (el primero y el último coinciden) con el eje
+    mayor sobre X; no hay error de aproximación.
+    """
+    w = math.sqrt(2) / 2
+    unit = np.array([
+        (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0)
+    ], dtype=np.float64)
+    knots = np.array([0, 0, 0, 0.25, 0.25, 0.5, 0.5, 0.75, 0.75, 1, 1, 1], dtype=np.float64)
+    weights = np.array([1, w, 1, w, 1, w, 1, w, 1], dtype=np.float64)
+    return NurbsCurve(unit * (major_radius, minor_radius), knots, 2, weights)
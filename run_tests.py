@@ -32,7 +32,13 @@ print("\n[2/4] Ejecutando tests de cálculos matemáticos...")
 print("-"*50)
 try:
     from tests.test_calculations import run_all_tests
+    from tests.test_batch import run_all_tests as run_batch_tests
+    from tests.test_design_index import run_all_tests as run_index_tests
+    from tests.test_fake_adsk import run_all_tests as run_fake_adsk_tests
     success = run_all_tests()
+    success = run_batch_tests() and success
+    success = run_index_tests() and success
+    success = run_fake_adsk_tests() and success
     if not success:
         print("⚠️ Algunos tests de cálculos fallaron")
 except Exception as e:
@@ -43,7 +49,12 @@ print("\n[3/4] Probando generador de perfil involuta...")
 print("-"*50)
 try:
     from geometry.involute_profile import test_involute_profile
-    result = test_involute_profile()
+    from tests.test_involute import run_all_tests as run_involute_tests
+    from tests.test_spline_fit import run_all_tests as run_spline_tests
+    from tests.test_lod import run_all_tests as run_lod_tests
+    from tests.test_dxf_export import run_all_tests as run_dxf_tests
+    result = (test_involute_profile() and run_involute_tests() and run_spline_tests()
+              and run_lod_tests() and run_dxf_tests())
     if result:
         print("✅ Perfil involuta funciona correctamente")
     else:
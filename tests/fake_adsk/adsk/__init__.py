@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+adsk - Sustituto en Python puro de la API de Fusion 360 para benchmarks
+
+Implementa sólo el subconjunto que usan HDriveGenerator.py y fusion_lib.
+Cada llamada se registra en adsk.recorder (conteo por método, registro
+serializable y costo según un CostModel). Para usarlo hay que poner el
+directorio tests/fake_adsk delante en sys.path antes de importar el código
+de Fusion.
+"""
+
+from . import core, fusion, cam
+from ._recorder import CostModel, Recorder, recorder, replay
+
+
+def reset(cost_model=None):
+    """Empieza una sesión nueva: aplicación y diseño vacíos, registro vacío"""
+    core.Application._instance = None
+    fusion.TemporaryBRepManager._instance = None
+    recorder.cost_model = cost_model
+    recorder.reset()
+
+
+def doEvents():
+    """Entrega los eventos personalizados pendientes, como adsk.doEvents()"""
+    if core.Application._instance is not None:
+        core.Application._instance._process_events()
+    return True
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+_recorder.py - Registro, conteo y costo de las llamadas a la API falsa de Fusion
+
+Cada llamada de método, lectura o escritura de propiedad hecha desde fuera
+del paquete falso queda en el registro. Las llamadas internas del propio
+paquete (una llamada registrada que llama a otra) no se cuentan.
+"""
+
+import json
+import time
+from collections import Counter
+from functools import wraps
+from itertools import count
+
+
+class CostModel:
+    """
+    Costo estimado (segundos) de cada llamada a la API
+
+    Args:
+        default: Costo de cualquier llamada sin entrada en costs
+        costs: Costo fijo por nombre de llamada ('Clase.método')
+        per_item: Costo adicional por elemento (p. ej. por curva en
+                  'Sketch.compute', que es el recálculo de perfiles)
+        exponents: Exponente del número de elementos por nombre de llamada
+                   (1 = lineal; el cálculo de perfiles crece más rápido)
+    """
+
+    def __init__(self, default=0.0, costs=None, per_item=None, exponents=None):
+        self.default = default
+        self.costs = dict(costs or {})
+        self.per_item = dict(per_item or {})
+        self.exponents = dict(exponents or {})
+
+    def __call__(self, call, items=0):
+        scaled = items ** self.exponents.get(call, 1.0) if items else 0.0
+        return self.costs.get(call, self.default) + self.per_item.get(call, 0.0) * scaled
+
+
+class Recorder:
+    """
+    Registro de llamadas a la API falsa
+
+    Attributes:
+        log: Lista de entradas {'seq', 'call', 'target', 'args', 'result',
+             'items', 'elapsed', 'cost'} serializables como JSON; los objetos
+             de la API se guardan como su identificador 'Clase#n'
+        counts: Llamadas por nombre
+        cost_model: CostModel aplicado a cada llamada (None = costo cero)
+    """
+
+    def __init__(self, cost_model=None, keep_log=True):
+        self.cost_model = cost_model
+        self.keep_log = keep_log
+        self.reset()
+
+    def reset(self):
+        """Vacía el registro y los contadores"""
+        self.log = []
+        self.counts = Counter()
+        self.total_cost = 0.0
+        self.total_elapsed = 0.0
+        self._seq = count()
+        self._ids = count(1)
+        self._depth = 0
+
+    @property
+    def total_calls(self):
+        return sum(self.counts.values())
+
+    def new_id(self, obj):
+        """Identificador estable de un objeto de la API dentro del registro"""
+        return f"{type(obj).__name__}#{next(self._ids)}"
+
+    def _encode(self, value):
+        """Convierte un valor en algo serializable para el registro"""
+        if hasattr(value, '_api_id'):
+            return value._api_id
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, (int, float, str, bool)) or value is None:
+            return value
+        return repr(value)
+
+    def _add(self, call, target, args, result, items, elapsed):
+        cost = self.cost_model(call, items) if self.cost_model else 0.0
+        self.counts[call] += 1
+        self.total_cost += cost
+        self.total_elapsed += elapsed
+        if self.keep_log:
+            self.log.append({
+                'seq': next(self._seq),
+                'call': call,
+                'target': self._encode(target),
+                'args': self._encode(args),
+                'result': self._encode(result),
+                'items': items,
+                'elapsed': elapsed,
+                'cost': cost
+            })
+
+    def call(self, call, target, args, function):
+        """Ejecuta una llamada y la registra si viene de fuera del paquete"""
+        if self._depth:
+            return function(*args)
+
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+        finally:
+            self._depth -= 1
+        self._add(call, target, args, result, 0, time.perf_counter() - start)
+        return result
+
+    def event(self, call, target, items=0):
+        """Registra un trabajo interno de Fusion (p. ej. recalcular un sketch)"""
+        self._add(call, target, (), None, items, 0.0)
+
+    def summary(self, top=None):
+        """Llamadas por nombre ordenadas de más a menos frecuentes"""
+        return self.counts.most_common(top)
+
+    def save(self, path):
+        """Guarda el registro como JSON lines"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for entry in self.log:
+                f.write(json.dumps(entry) + '\n')
+
+    @staticmethod
+    def load(path):
+        """Carga un registro guardado con save()"""
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(log, cost_model):
+    """
+    Vuelve a costear un registro con otro modelo de costo sin re-ejecutar
+
+    Returns:
+        Diccionario con 'calls', 'counts' y 'cost'
+    """
+    counts = Counter(entry['call'] for entry in log)
+    cost = sum(cost_model(entry['call'], entry['items']) for entry in log)
+    return {'calls': len(log), 'counts': counts, 'cost': cost}
+
+
+# Registro global usado por todos los objetos del paquete falso
+recorder = Recorder()
+
+
+def api(function):
+    """Decorador de métodos de instancia registrados como 'Clase.método'"""
+    name = function.__name__
+
+    @wraps(function)
+    def wrapper(self, *args):
+        return recorder.call(
+            f"{type(self).__name__}.{name}", self, args, lambda *a: function(self, *a)
+        )
+    return wrapper
+
+
+def api_static(function):
+    """Decorador de métodos estáticos registrados (p. ej. Point3D.create)"""
+    name = function.__qualname__
+
+    @wraps(function)
+    def wrapper(*args):
+        return recorder.call(name, None, args, function)
+    return staticmethod(wrapper)
+
+
+class api_property:
+    """Propiedad registrada: lectura 'Clase.nombre', escritura 'Clase.nombre='"""
+
+    def __init__(self, fget, fset=None):
+        self.fget = fget
+        self.fset = fset
+        self.name = fget.__name__
+
+    def setter(self, fset):
+        return api_property(self.fget, fset)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        call = f"{type(obj).__name__}.{self.name}"
+        return recorder.call(call, obj, (), lambda: self.fget(obj))
+
+    def __set__(self, obj, value):
+        call = f"{type(obj).__name__}.{self.name}"
+        if self.fset is None:
+            raise AttributeError(f"{call} es de solo lectura")
+        recorder.call(call + '=', obj, (value,), lambda v: self.fset(obj, v))
+
+
+class api_attr:
+    """Atributo simple de lectura/escritura registrado como api_property"""
+
+    def __init__(self, default=None):
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = '_' + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return recorder.call(
+            f"{type(obj).__name__}.{self.name}", obj, (),
+            lambda: obj.__dict__.get(self.slot, self.default)
+        )
+
+    def __set__(self, obj, value):
+        recorder.call(
+            f"{type(obj).__name__}.{self.name}=", obj, (value,),
+            lambda v: obj.__dict__.__setitem__(self.slot, v)
+        )
+
+
+class ApiObject:
+    """Base de todos los objetos de la API falsa"""
+
+    def __init__(self):
+        self._api_id = recorder.new_id(self)
+        self._valid = True
+
+    @api_property
+    def isValid(self):
+        return self._valid
+
+    @api_property
+    def objectType(self):
+        return f"adsk::{type(self).__name__}"
+
+    def __repr__(self):
+        return f"<{self._api_id}>"
+
+
+class ApiCollection(ApiObject):
+    """Colección con count/item como las de Fusion"""
+
+    def __init__(self, items=None):
+        super().__init__()
+        self._items = list(items or [])
+
+    @api_property
+    def count(self):
+        return len(self._items)
+
+    @api
+    def item(self, index):
+        return self._items[index]
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+cam.py - adsk.cam falso (el generador sólo lo importa)
+"""
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+core.py - Subconjunto falso de adsk.core (geometría, valores y aplicación)
+"""
+
+import math
+
+from ._recorder import ApiCollection, ApiObject, api, api_attr, api_property, api_static
+
+
+class Point3D(ApiObject):
+    x = api_attr(0.0)
+    y = api_attr(0.0)
+    z = api_attr(0.0)
+
+    def __init__(self, x, y, z):
+        super().__init__()
+        self._x, self._y, self._z = float(x), float(y), float(z)
+
+    @api_static
+    def create(x=0.0, y=0.0, z=0.0):
+        return Point3D(x, y, z)
+
+    @api
+    def distanceTo(self, other):
+        return math.dist((self._x, self._y, self._z), (other._x, other._y, other._z))
+
+
+class Vector3D(ApiObject):
+    x = api_attr(0.0)
+    y = api_attr(0.0)
+    z = api_attr(0.0)
+
+    def __init__(self, x, y, z):
+        super().__init__()
+        self._x, self._y, self._z = float(x), float(y), float(z)
+
+    @api_static
+    def create(x=0.0, y=0.0, z=0.0):
+        return Vector3D(x, y, z)
+
+    @api
+    def normalize(self):
+        length = math.sqrt(self._x ** 2 + self._y ** 2 + self._z ** 2)
+        if length == 0:
+            return False
+        self._x, self._y, self._z = self._x / length, self._y / length, self._z / length
+        return True
+
+
+class Matrix3D(ApiObject):
+    translation = api_attr()
+
+    @api_static
+    def create():
+        return Matrix3D()
+
+    @api
+    def isEqualTo(self, matrix):
+        return self._offset() == matrix._offset()
+
+    def _offset(self):
+        vector = self.__dict__.get('_translation')
+        return (vector._x, vector._y, vector._z) if vector is not None else (0.0, 0.0, 0.0)
+
+
+class ObjectCollection(ApiCollection):
+    @api_static
+    def create():
+        return ObjectCollection()
+
+    @api
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+
+class ValueInput(ApiObject):
+    def __init__(self, value):
+        super().__init__()
+        self._value = value
+
+    @api_property
+    def realValue(self):
+        return self._value if isinstance(self._value, float) else 0.0
+
+    @api_property
+    def stringValue(self):
+        return self._value if isinstance(self._value, str) else ''
+
+    @api_static
+    def createByReal(value):
+        return ValueInput(float(value))
+
+    @api_static
+    def createByString(value):
+        return ValueInput(str(value))
+
+
+class Color(ApiObject):
+    def __init__(self, red, green, blue, opacity):
+        super().__init__()
+        self._rgba = (red, green, blue, opacity)
+
+    @api_static
+    def create(red, green, blue, opacity):
+        return Color(red, green, blue, opacity)
+
+
+class Curve3D(ApiObject):
+    """Curva 3D transitoria; guarda sus extremos para los sketches falsos"""
+
+    def __init__(self, start, end, points=()):
+        super().__init__()
+        self._start = start
+        self._end = end
+        self._points = tuple(points) or (start, end)
+
+
+def _xyz(point):
+    return (point._x, point._y, point._z)
+
+
+class Line3D(Curve3D):
+    @api_static
+    def create(startPoint, endPoint):
+        return Line3D(_xyz(startPoint), _xyz(endPoint))
+
+
+class Arc3D(Curve3D):
+    @api_static
+    def createByThreePoints(startPoint, point, endPoint):
+        points = (_xyz(startPoint), _xyz(point), _xyz(endPoint))
+        return Arc3D(points[0], points[2], points)
+
+
+class NurbsCurve3D(Curve3D):
+    def __init__(self, control_points, degree, knots, weights, is_periodic):
+        points = [_xyz(p) for p in control_points]
+        super().__init__(points[0], points[-1], points)
+        self._degree = degree
+        self._knots = list(knots)
+        self._weights = list(weights)
+        self._is_periodic = is_periodic
+
+    @api_static
+    def createNonRational(controlPoints, degree, knots, isPeriodic):
+        return NurbsCurve3D(controlPoints, degree, knots, [], isPeriodic)
+
+    @api_static
+    def createRational(controlPoints, degree, knots, weights, isPeriodic):
+        return NurbsCurve3D(controlPoints, degree, knots, weights, isPeriodic)
+
+
+class Surface(ApiObject):
+    pass
+
+
+class Plane(Surface):
+    @api_static
+    def create(origin, normal):
+        return Plane()
+
+
+class Cylinder(Surface):
+    @api_static
+    def create(origin, axis, radius):
+        return Cylinder()
+
+
+class NurbsSurfaceProperties:
+    OpenNurbsSurface = 1
+    ClosedNurbsSurface = 2
+    PeriodicNurbsSurface = 4
+    RationalNurbsSurface = 8
+
+
+class NurbsSurface(Surface):
+    @api_static
+    def create(degreeU, degreeV, controlPointCountU, controlPointCountV, controlPoints,
+               knotsU, knotsV, weights, propertiesU, propertiesV):
+        if len(controlPoints) != controlPointCountU * controlPointCountV:
+            raise ValueError("Número de puntos de control incorrecto")
+        return NurbsSurface()
+
+
+class DocumentTypes:
+    FusionDesignDocumentType = 0
+
+
+class DropDownStyles:
+    LabeledIconDropDownStyle = 0
+    CheckBoxDropDownStyle = 1
+    TextListDropDownStyle = 2
+
+
+class CommandCreatedEventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandEventHandler:
+    def __init__(self):
+        pass
+
+
+class InputChangedEventHandler:
+    def __init__(self):
+        pass
+
+
+class ValidateInputsEventHandler:
+    def __init__(self):
+        pass
+
+
+class CustomEventHandler:
+    def __init__(self):
+        pass
+
+
+class CustomEventArgs(ApiObject):
+    additionalInfo = api_attr('')
+
+
+class CustomEvent(ApiObject):
+    def __init__(self, event_id):
+        super().__init__()
+        self._event_id = event_id
+        self._handlers = []
+
+    @api
+    def add(self, handler):
+        self._handlers.append(handler)
+        return True
+
+    @api
+    def remove(self, handler):
+        self._handlers.remove(handler)
+        return True
+
+    def _fire(self, info):
+        args = CustomEventArgs()
+        args._additionalInfo = info
+        for handler in list(self._handlers):
+            handler.notify(args)
+
+
+class ProgressDialog(ApiObject):
+    """Diálogo de progreso; cancel_after simula pulsar Cancelar tras n avances"""
+
+    isCancelButtonShown = api_attr(False)
+    message = api_attr('')
+    maximumValue = api_attr(100)
+    minimumValue = api_attr(0)
+
+    def __init__(self):
+        super().__init__()
+        self.cancel_after = None
+        self.updates = 0
+        self._isShowing = False
+        self._wasCancelled = False
+        self._progressValue = 0
+
+    @api
+    def show(self, title, message, minimumValue, maximumValue, delay=0):
+        self._isShowing = True
+        self._message = message
+        self._minimumValue = minimumValue
+        self._maximumValue = maximumValue
+        return True
+
+    @api
+    def hide(self):
+        self._isShowing = False
+        return True
+
+    @api_property
+    def isShowing(self):
+        return self._isShowing
+
+    @api_property
+    def wasCancelled(self):
+        return self._wasCancelled
+
+    @api_property
+    def progressValue(self):
+        return self._progressValue
+
+    @progressValue.setter
+    def progressValue(self, value):
+        self._progressValue = value
+        self.updates += 1
+        if self.cancel_after is not None and self.updates >= self.cancel_after:
+            self._wasCancelled = True
+
+
+class UserInterface(ApiObject):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.progress_dialogs = []
+
+    @api
+    def messageBox(self, text, *args):
+        self.messages.append(text)
+        return 0
+
+    @api
+    def createProgressDialog(self):
+        dialog = ProgressDialog()
+        self.progress_dialogs.append(dialog)
+        return dialog
+
+
+class DataFile(ApiObject):
+    def __init__(self, document):
+        super().__init__()
+        self._document = document
+
+    @api_property
+    def name(self):
+        return self._document._name
+
+
+class Products(ApiCollection):
+    @api
+    def itemByProductType(self, productType):
+        return self._items[0] if productType == 'DesignProductType' and self._items else None
+
+
+class Document(ApiObject):
+    """Documento con un diseño; saved=False simula uno sin guardar"""
+
+    def __init__(self, name, design, saved=True, app=None):
+        super().__init__()
+        self._app = app
+        self._name = name
+        self._design = design
+        self._products = Products([design])
+        self._data_file = DataFile(self) if saved else None
+
+    @api_property
+    def name(self):
+        return self._name
+
+    @api_property
+    def products(self):
+        return self._products
+
+    @api_property
+    def dataFile(self):
+        return self._data_file
+
+    @api
+    def close(self, saveChanges):
+        documents = self._app._documents._items
+        documents.remove(self)
+        self._valid = False
+        # Como en Fusion, se activa otro documento abierto
+        if self._app._design is self._design and documents:
+            self._app._design = documents[-1]._design
+        return True
+
+
+class Documents(ApiCollection):
+    def __init__(self, app):
+        super().__init__()
+        self._app = app
+
+    @api
+    def add(self, documentType):
+        from .fusion import Design
+        design = Design()
+        document = Document(f'Sin título {len(self._items) + 1}', design, False, self._app)
+        self._items.append(document)
+        self._app._design = design
+        return document
+
+
+class DXF2DImportOptions(ApiObject):
+    isSingleSketchResult = api_attr(False)
+
+    def __init__(self, filename, planarEntity):
+        super().__init__()
+        self._filename = filename
+        self._results = ObjectCollection()
+
+    @api_property
+    def filename(self):
+        return self._filename
+
+    @api_property
+    def results(self):
+        return self._results
+
+
+class ImportManager(ApiObject):
+    @api
+    def createDXF2DImportOptions(self, filename, planarEntity):
+        return DXF2DImportOptions(filename, planarEntity)
+
+    @api
+    def importToTarget(self, importOptions, target):
+        from .fusion import _import_dxf
+        importOptions._results._items.append(_import_dxf(importOptions._filename, target))
+        return True
+
+
+# Identificador de la biblioteca de apariencias de Fusion
+APPEARANCE_LIBRARY_ID = 'BA5EE55E-9982-449B-9D66-9F036540E140'
+
+
+class MaterialLibrary(ApiObject):
+    def __init__(self, library_id, name, appearance_names):
+        super().__init__()
+        from .fusion import Appearance, Appearances
+        self._id = library_id
+        self._name = name
+        self._appearances = Appearances([Appearance(n) for n in appearance_names])
+
+    @api_property
+    def id(self):
+        return self._id
+
+    @api_property
+    def name(self):
+        return self._name
+
+    @api_property
+    def appearances(self):
+        return self._appearances
+
+
+class MaterialLibraries(ApiCollection):
+    @api
+    def itemById(self, id):
+        return next((library for library in self._items if library._id == id), None)
+
+    @api
+    def itemByName(self, name):
+        return next((library for library in self._items if library._name == name), None)
+
+
+class Application(ApiObject):
+    _instance = None
+
+    def __init__(self):
+        super().__init__()
+        from .fusion import Design
+        self._ui = UserInterface()
+        self._design = Design()
+        self._documents = Documents(self)
+        self._documents._items.append(Document('Sin título', self._design, False, self))
+        self._import_manager = ImportManager()
+        self._libraries = MaterialLibraries([MaterialLibrary(
+            APPEARANCE_LIBRARY_ID, 'Fusion 360 Appearance Library',
+            ('Paint - Enamel Glossy (White)', 'Plastic - Glossy (White)', 'Steel - Satin')
+        )])
+        self._log = []
+        self._custom_events = {}
+        self._pending_events = []
+
+    @api_static
+    def get():
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    @api_property
+    def userInterface(self):
+        return self._ui
+
+    @api_property
+    def activeProduct(self):
+        return self._design
+
+    @api_property
+    def documents(self):
+        return self._documents
+
+    @api_property
+    def importManager(self):
+        return self._import_manager
+
+    @api_property
+    def materialLibraries(self):
+        return self._libraries
+
+    @api
+    def log(self, message, *args):
+        self._log.append(message)
+
+    def _open_document(self, name, design):
+        """Abre otro documento (guardado) con el diseño dado"""
+        document = Document(name, design, app=self)
+        self._documents._items.append(document)
+        return document
+
+    @api
+    def registerCustomEvent(self, eventId):
+        event = CustomEvent(eventId)
+        self._custom_events[eventId] = event
+        return event
+
+    @api
+    def unregisterCustomEvent(self, eventId):
+        return self._custom_events.pop(eventId, None) is not None
+
+    @api
+    def fireCustomEvent(self, eventId, additionalInfo=''):
+        # Como en Fusion, el evento se entrega después, desde el bucle de eventos
+        if eventId not in self._custom_events:
+            return False
+        self._pending_events.append((eventId, additionalInfo))
+        return True
+
+    def _process_events(self):
+        """Entrega los eventos pendientes (incluidos los que disparen)"""
+        delivered = 0
+        while self._pending_events:
+            event_id, info = self._pending_events.pop(0)
+            event = self._custom_events.get(event_id)
+            if event is not None:
+                event._fire(info)
+                delivered += 1
+        return delivered
@@ -0,0 +1,982 @@
+# -*- coding: utf-8 -*-
+"""
+fusion.py - Subconjunto falso de adsk.fusion (diseño, sketches, features, B-Rep)
+
+Los sketches calculan sus perfiles de forma simplificada: cada círculo y
+cada cadena cerrada de curvas es un lazo, y se asume que los lazos son
+concéntricos (como en los engranajes). Con k lazos hay k perfiles: el disco
+interior (1 lazo) y los anillos entre lazos consecutivos (2 lazos).
+"""
+
+import math
+
+from . import core
+from ._recorder import ApiCollection, ApiObject, api, api_attr, api_property, api_static, recorder
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+class PatternComputeOptions:
+    OptimizedPatternCompute = 0
+    IdenticalPatternCompute = 1
+    AdjustPatternCompute = 2
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+# --- Apariencias -----------------------------------------------------------
+
+class Property(ApiObject):
+    value = api_attr()
+
+
+class Properties(ApiCollection):
+    @api
+    def itemByName(self, name):
+        for prop in self._items:
+            if prop._name == name:
+                return prop
+        return None
+
+
+class Appearance(ApiObject):
+    name = api_attr('')
+
+    def __init__(self, name=''):
+        super().__init__()
+        self._name = name
+        color = Property()
+        color._name = 'Color'
+        self._properties = Properties([color])
+
+    @api_property
+    def appearanceProperties(self):
+        return self._properties
+
+
+class Appearances(ApiCollection):
+    @api
+    def itemByName(self, name):
+        for appearance in self._items:
+            if appearance.__dict__.get('_name') == name:
+                return appearance
+        return None
+
+    @api
+    def addByCopy(self, appearanceToCopy, name):
+        # Como en Fusion: sólo se copian apariencias existentes
+        if not isinstance(appearanceToCopy, Appearance):
+            raise TypeError('addByCopy necesita una apariencia')
+        appearance = Appearance(name)
+        appearance._properties._items[0].__dict__.update(
+            appearanceToCopy._properties._items[0].__dict__
+        )
+        self._items.append(appearance)
+        return appearance
+
+
+# --- Parámetros y atributos -----------------------------------------------
+
+class UserParameter(ApiObject):
+    comment = api_attr('')
+
+    def __init__(self, parent, name, expression, unit):
+        super().__init__()
+        self._parent = parent
+        self._name = name
+        self._expression = expression
+        self._unit = unit
+
+    @api_property
+    def name(self):
+        return self._name
+
+    @api_property
+    def unit(self):
+        return self._unit
+
+    @api_property
+    def expression(self):
+        return self._expression
+
+    @expression.setter
+    def expression(self, value):
+        self._expression = value
+
+    @api
+    def deleteMe(self):
+        self._parent._items.remove(self)
+        self._valid = False
+        return True
+
+
+class UserParameters(ApiCollection):
+    @api
+    def add(self, name, value, units, comment):
+        if self.itemByName(name) is not None:
+            raise ValueError(f"El parámetro {name} ya existe")
+        expression = value._value if isinstance(value._value, str) else repr(value._value)
+        parameter = UserParameter(self, name, expression, units)
+        parameter._comment = comment
+        self._items.append(parameter)
+        return parameter
+
+    @api
+    def itemByName(self, name):
+        for parameter in self._items:
+            if parameter._name == name:
+                return parameter
+        return None
+
+
+class Attribute(ApiObject):
+    value = api_attr('')
+
+    def __init__(self, group, name, value):
+        super().__init__()
+        self._groupName = group
+        self._name = name
+        self._value = value
+
+    @api_property
+    def groupName(self):
+        return self._groupName
+
+    @api_property
+    def name(self):
+        return self._name
+
+
+class Attributes(ApiCollection):
+    @api
+    def add(self, groupName, name, value):
+        attribute = self.itemByName(groupName, name)
+        if attribute is None:
+            attribute = Attribute(groupName, name, value)
+            self._items.append(attribute)
+        attribute._value = value
+        return attribute
+
+    @api
+    def itemByName(self, groupName, name):
+        for attribute in self._items:
+            if (attribute._groupName, attribute._name) == (groupName, name):
+                return attribute
+        return None
+
+
+# --- Diseño y componentes --------------------------------------------------
+
+class FusionUnitsManager(ApiObject):
+    defaultLengthUnits = api_attr('mm')
+
+
+class Design(ApiObject):
+    designType = api_attr(DesignTypes.ParametricDesignType)
+
+    def __init__(self):
+        super().__init__()
+        self._root = Component()
+        self._appearances = Appearances()
+        self._parameters = UserParameters()
+        self._attributes = Attributes()
+        self._units = FusionUnitsManager()
+
+    @api_property
+    def attributes(self):
+        return self._attributes
+
+    @api_property
+    def userParameters(self):
+        return self._parameters
+
+    @api_property
+    def rootComponent(self):
+        return self._root
+
+    @api_property
+    def appearances(self):
+        return self._appearances
+
+    @api_property
+    def unitsManager(self):
+        return self._units
+
+
+class ConstructionPlane(ApiObject):
+    pass
+
+
+class ConstructionAxis(ApiObject):
+    pass
+
+
+class Component(ApiObject):
+    name = api_attr('')
+
+    def __init__(self):
+        super().__init__()
+        self._occurrences = Occurrences()
+        self._sketches = Sketches()
+        self._bodies = BRepBodies()
+        self._features = Features(self)
+        self._planes = {key: ConstructionPlane() for key in ('xy', 'xz', 'yz')}
+        self._z_axis = ConstructionAxis()
+        self._graphics = CustomGraphicsGroups()
+        self._attributes = Attributes()
+
+    @api_property
+    def attributes(self):
+        return self._attributes
+
+    @api_property
+    def occurrences(self):
+        return self._occurrences
+
+    @api_property
+    def customGraphicsGroups(self):
+        return self._graphics
+
+    @api_property
+    def sketches(self):
+        return self._sketches
+
+    @api_property
+    def features(self):
+        return self._features
+
+    @api_property
+    def bRepBodies(self):
+        return self._bodies
+
+    @api_property
+    def xYConstructionPlane(self):
+        return self._planes['xy']
+
+    @api_property
+    def xZConstructionPlane(self):
+        return self._planes['xz']
+
+    @api_property
+    def yZConstructionPlane(self):
+        return self._planes['yz']
+
+    @api_property
+    def zConstructionAxis(self):
+        return self._z_axis
+
+
+class Occurrence(ApiObject):
+    transform = api_attr()
+
+    def __init__(self, transform, parent, component=None, is_referenced=False):
+        super().__init__()
+        self._component = component or Component()
+        self._transform = transform
+        self._parent = parent
+        self._is_referenced = is_referenced
+        self._attributes = Attributes()
+
+    @api_property
+    def attributes(self):
+        return self._attributes
+
+    @api_property
+    def isReferencedComponent(self):
+        return self._is_referenced
+
+    @api_property
+    def component(self):
+        return self._component
+
+    @api
+    def deleteMe(self):
+        self._parent._items.remove(self)
+        self._valid = False
+        # El componente sigue vivo mientras tenga otras ocurrencias
+        if not any(other._component is self._component for other in self._parent._items):
+            self._component._valid = False
+        return True
+
+
+class Occurrences(ApiCollection):
+    @api
+    def addNewComponent(self, transform):
+        occurrence = Occurrence(transform, self)
+        self._items.append(occurrence)
+        return occurrence
+
+    @api
+    def addExistingComponent(self, component, transform):
+        occurrence = Occurrence(transform, self, component)
+        self._items.append(occurrence)
+        return occurrence
+
+    @api
+    def addByInsert(self, dataFile, transform, isReferencedComponent):
+        # El documento insertado entra como una ocurrencia de su raíz
+        component = dataFile._document._design._root
+        occurrence = Occurrence(transform, self, component, isReferencedComponent)
+        self._items.append(occurrence)
+        return occurrence
+
+
+# --- Sketches --------------------------------------------------------------
+
+class SketchPoint(ApiObject):
+    def __init__(self, xyz):
+        super().__init__()
+        self._xyz = xyz
+
+    @api_property
+    def geometry(self):
+        return core.Point3D(*self._xyz)
+
+
+def _sketch_point(point):
+    """Reutiliza un SketchPoint o crea uno nuevo desde un Point3D"""
+    if isinstance(point, SketchPoint):
+        return point
+    return SketchPoint((point._x, point._y, point._z))
+
+
+class SketchCurve(ApiObject):
+    """Curva de sketch; los círculos no tienen extremos (lazo por sí solos)"""
+
+    def __init__(self, sketch, start, end, points=(), radius=None):
+        super().__init__()
+        self._sketch = sketch
+        self._start = start
+        self._end = end
+        self._points = points
+        self._radius = radius
+        sketch._add_curve(self)
+
+    @api_property
+    def startSketchPoint(self):
+        return self._start
+
+    @api_property
+    def endSketchPoint(self):
+        return self._end
+
+
+class SketchLine(SketchCurve):
+    pass
+
+
+class SketchCircle(SketchCurve):
+    pass
+
+
+class SketchArc(SketchCurve):
+    pass
+
+
+class SketchFittedSpline(SketchCurve):
+    pass
+
+
+class SketchFixedSpline(SketchCurve):
+    pass
+
+
+class SketchLines(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    @api
+    def addByTwoPoints(self, startPoint, endPoint):
+        line = SketchLine(self._sketch, _sketch_point(startPoint), _sketch_point(endPoint))
+        self._items.append(line)
+        return line
+
+
+class SketchCircles(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    @api
+    def addByCenterRadius(self, centerPoint, radius):
+        circle = SketchCircle(self._sketch, None, None, radius=float(radius))
+        self._items.append(circle)
+        return circle
+
+
+class SketchArcs(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    @api
+    def addByThreePoints(self, startPoint, point, endPoint):
+        arc = SketchArc(self._sketch, _sketch_point(startPoint), _sketch_point(endPoint),
+                        points=((point._x, point._y, point._z),))
+        self._items.append(arc)
+        return arc
+
+    @api
+    def addByCenterStartEnd(self, centerPoint, startPoint, endPoint):
+        arc = SketchArc(self._sketch, _sketch_point(startPoint), _sketch_point(endPoint))
+        self._items.append(arc)
+        return arc
+
+
+class SketchFittedSplines(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    @api
+    def add(self, fitPoints):
+        points = fitPoints._items
+        spline = SketchFittedSpline(
+            self._sketch, _sketch_point(points[0]), _sketch_point(points[-1]),
+            points=tuple((p._x, p._y, p._z) for p in points)
+        )
+        self._items.append(spline)
+        return spline
+
+
+class SketchFixedSplines(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    @api
+    def addByNurbsCurve(self, nurbsCurve):
+        spline = SketchFixedSpline(
+            self._sketch, SketchPoint(nurbsCurve._start), SketchPoint(nurbsCurve._end),
+            points=nurbsCurve._points
+        )
+        self._items.append(spline)
+        return spline
+
+
+class SketchCurves(ApiObject):
+    def __init__(self, sketch):
+        super().__init__()
+        self._lines = SketchLines(sketch)
+        self._circles = SketchCircles(sketch)
+        self._arcs = SketchArcs(sketch)
+        self._fitted = SketchFittedSplines(sketch)
+        self._fixed = SketchFixedSplines(sketch)
+
+    @api_property
+    def sketchLines(self):
+        return self._lines
+
+    @api_property
+    def sketchCircles(self):
+        return self._circles
+
+    @api_property
+    def sketchArcs(self):
+        return self._arcs
+
+    @api_property
+    def sketchFittedSplines(self):
+        return self._fitted
+
+    @api_property
+    def sketchFixedSplines(self):
+        return self._fixed
+
+
+class ProfileLoops(ApiCollection):
+    pass
+
+
+class Profile(ApiObject):
+    def __init__(self, loops):
+        super().__init__()
+        self._loops = ProfileLoops(loops)
+
+    @api_property
+    def profileLoops(self):
+        return self._loops
+
+
+class Profiles(ApiCollection):
+    pass
+
+
+def _point_key(xyz):
+    return (round(xyz[0], 7), round(xyz[1], 7))
+
+
+class Sketch(ApiObject):
+    name = api_attr('')
+
+    def __init__(self):
+        super().__init__()
+        self._curves = []
+        self._deferred = False
+        self._profiles = None
+        self._sketch_curves = SketchCurves(self)
+
+    def _add_curve(self, curve):
+        self._curves.append(curve)
+        self._profiles = None
+        if not self._deferred:
+            # Fusion recalcula el sketch tras cada curva nueva
+            recorder.event('Sketch.compute', self, len(self._curves))
+
+    @api_property
+    def sketchCurves(self):
+        return self._sketch_curves
+
+    @api_property
+    def isComputeDeferred(self):
+        return self._deferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value):
+        was_deferred = self._deferred
+        self._deferred = bool(value)
+        if was_deferred and not self._deferred:
+            recorder.event('Sketch.compute', self, len(self._curves))
+
+    def _loops(self):
+        """Tamaño (radio máximo) de cada lazo cerrado del sketch"""
+        sizes = []
+        parent = {}
+
+        def find(key):
+            while parent.setdefault(key, key) != key:
+                # Compresión a medias: los contornos largos son cadenas
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        degree = {}
+        chains = []
+        for curve in self._curves:
+            if curve._radius is not None:
+                sizes.append(curve._radius)
+                continue
+            a, b = _point_key(curve._start._xyz), _point_key(curve._end._xyz)
+            parent[find(a)] = find(b)
+            degree[a] = degree.get(a, 0) + 1
+            degree[b] = degree.get(b, 0) + 1
+            chains.append((a, b, curve))
+
+        groups = {}
+        for a, b, curve in chains:
+            groups.setdefault(find(a), []).append((a, b, curve))
+
+        for members in groups.values():
+            keys = {key for a, b, _ in members for key in (a, b)}
+            if all(degree[key] % 2 == 0 for key in keys):
+                size = max(
+                    math.hypot(x, y)
+                    for _, _, curve in members
+                    for x, y, _ in (curve._start._xyz, curve._end._xyz) + tuple(curve._points)
+                )
+                sizes.append(size)
+
+        return sorted(sizes)
+
+    @api_property
+    def profiles(self):
+        if self._profiles is None:
+            loops = self._loops()
+            profiles = [Profile([object()])] if loops else []
+            profiles += [Profile([object(), object()]) for _ in loops[1:]]
+            self._profiles = Profiles(profiles)
+        return self._profiles
+
+
+class Sketches(ApiCollection):
+    @api
+    def add(self, planarEntity):
+        sketch = Sketch()
+        self._items.append(sketch)
+        return sketch
+
+
+# Escala a cm de cada código $INSUNITS del DXF
+_DXF_UNITS_TO_CM = {1: 2.54, 2: 30.48, 4: 0.1, 5: 1.0, 6: 100.0}
+
+
+def _import_dxf(path, component):
+    """
+    Crea en el componente un sketch con las polilíneas y círculos de un DXF
+
+    Las entidades se crean dentro de Fusion (sin llamadas registradas) y el
+    sketch se recalcula una sola vez al final.
+    """
+    with open(path, encoding='ascii') as f:
+        lines = f.read().splitlines()
+    pairs = [(int(lines[i]), lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+    scale = 1.0
+    entities = []
+    for i, (code, value) in enumerate(pairs):
+        if (code, value) == (9, '$INSUNITS'):
+            scale = _DXF_UNITS_TO_CM[int(pairs[i + 1][1])]
+        elif code == 0:
+            entities.append((value, {}))
+        elif entities:
+            entities[-1][1].setdefault(code, []).append(value)
+
+    sketch = Sketch()
+    sketch._deferred = True
+    curves = sketch._sketch_curves
+    polyline = None
+    for kind, groups in entities:
+        if kind == 'CIRCLE':
+            radius = float(groups[40][0]) * scale
+            curves._circles._items.append(SketchCircle(sketch, None, None, radius=radius))
+        elif kind == 'POLYLINE':
+            polyline = []
+        elif kind == 'VERTEX':
+            xy = (float(groups[10][0]) * scale, float(groups[20][0]) * scale)
+            polyline.append(SketchPoint(xy + (0.0,)))
+        elif kind == 'SEQEND':
+            for start, end in zip(polyline, polyline[1:] + polyline[:1]):
+                curves._lines._items.append(SketchLine(sketch, start, end))
+            polyline = None
+    sketch._deferred = False
+    recorder.event('Sketch.compute', sketch, len(sketch._curves))
+
+    component._sketches._items.append(sketch)
+    return sketch
+
+
+# --- Features --------------------------------------------------------------
+
+class BRepBody(ApiObject):
+    name = api_attr('')
+    appearance = api_attr()
+
+
+class BRepBodies(ApiCollection):
+    @api
+    def add(self, body, targetBaseFeature=None):
+        inserted = BRepBody()
+        self._items.append(inserted)
+        return inserted
+
+
+class ExtrudeFeatureInput(ApiObject):
+    def __init__(self, profile, operation):
+        super().__init__()
+        self._profile = profile
+        self._operation = operation
+        self._distance = None
+
+    @api
+    def setDistanceExtent(self, isSymmetric, distance):
+        self._distance = distance
+        return True
+
+
+class ExtrudeFeature(ApiObject):
+    def __init__(self, bodies, distance=None):
+        super().__init__()
+        self._bodies = BRepBodies(bodies)
+        self._distance = distance
+
+    @api_property
+    def bodies(self):
+        return self._bodies
+
+
+class ExtrudeFeatures(ApiCollection):
+    def __init__(self, component):
+        super().__init__()
+        self._component = component
+
+    @api
+    def createInput(self, profile, operation):
+        return ExtrudeFeatureInput(profile, operation)
+
+    @api
+    def add(self, input):
+        bodies = self._component._bodies._items
+        if input._operation == FeatureOperations.NewBodyFeatureOperation or not bodies:
+            bodies.append(BRepBody())
+        feature = ExtrudeFeature([bodies[-1]], input._distance)
+        self._items.append(feature)
+        return feature
+
+
+class CircularPatternFeatureInput(ApiObject):
+    quantity = api_attr()
+    totalAngle = api_attr()
+    isSymmetric = api_attr(True)
+    patternComputeOption = api_attr(PatternComputeOptions.OptimizedPatternCompute)
+
+    def __init__(self, entities, axis):
+        super().__init__()
+        self._entities = entities
+        self._axis = axis
+
+
+class CircularPatternFeature(ApiObject):
+    pass
+
+
+class CircularPatternFeatures(ApiCollection):
+    @api
+    def createInput(self, inputEntities, axis):
+        return CircularPatternFeatureInput(inputEntities, axis)
+
+    @api
+    def add(self, input):
+        feature = CircularPatternFeature()
+        self._items.append(feature)
+        return feature
+
+
+class BaseFeature(ApiObject):
+    @api
+    def startEdit(self):
+        return True
+
+    @api
+    def finishEdit(self):
+        return True
+
+
+class BaseFeatures(ApiCollection):
+    @api
+    def add(self):
+        feature = BaseFeature()
+        self._items.append(feature)
+        return feature
+
+
+class Features(ApiObject):
+    def __init__(self, component):
+        super().__init__()
+        self._extrudes = ExtrudeFeatures(component)
+        self._patterns = CircularPatternFeatures()
+        self._base = BaseFeatures()
+
+    @api_property
+    def extrudeFeatures(self):
+        return self._extrudes
+
+    @api_property
+    def circularPatternFeatures(self):
+        return self._patterns
+
+    @api_property
+    def baseFeatures(self):
+        return self._base
+
+
+# --- Gráficos personalizados ----------------------------------------------
+
+class CustomGraphicsCoordinates(ApiObject):
+    def __init__(self, coordinates):
+        super().__init__()
+        if len(coordinates) % 3:
+            raise ValueError("Las coordenadas deben ser tripletas x, y, z")
+        self._coordinates = list(coordinates)
+
+    @api_static
+    def create(coordinates):
+        return CustomGraphicsCoordinates(coordinates)
+
+    @api_property
+    def coordinateCount(self):
+        return len(self._coordinates) // 3
+
+
+class CustomGraphicsSolidColorEffect(ApiObject):
+    @api_static
+    def create(color):
+        return CustomGraphicsSolidColorEffect()
+
+
+class CustomGraphicsLines(ApiObject):
+    color = api_attr()
+    weight = api_attr(1.0)
+
+    def __init__(self, coordinates, strip_lengths):
+        super().__init__()
+        self._coordinates = coordinates
+        self._strip_lengths = list(strip_lengths)
+
+
+class CustomGraphicsGroup(ApiObject):
+    transform = api_attr()
+
+    def __init__(self, parent):
+        super().__init__()
+        self._parent = parent
+        self._entities = []
+
+    @api
+    def addLines(self, coordinates, indexList, isLineStrip, lineStripLengths=()):
+        if isLineStrip and sum(lineStripLengths) != len(coordinates._coordinates) // 3:
+            raise ValueError("Las tiras no cubren todas las coordenadas")
+        lines = CustomGraphicsLines(coordinates, lineStripLengths)
+        self._entities.append(lines)
+        return lines
+
+    @api
+    def deleteMe(self):
+        self._parent._items.remove(self)
+        self._valid = False
+        return True
+
+
+class CustomGraphicsGroups(ApiCollection):
+    @api
+    def add(self):
+        group = CustomGraphicsGroup(self)
+        self._items.append(group)
+        return group
+
+
+# --- B-Rep temporal --------------------------------------------------------
+
+class TemporaryBRepManager(ApiObject):
+    _instance = None
+
+    @api_static
+    def get():
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    @api
+    def createCylinderOrCone(self, pointOne, pointOneRadius, pointTwo, pointTwoRadius):
+        return BRepBody()
+
+    @api
+    def createEllipticalCylinderOrCone(self, pointOne, pointOneMajorRadius, pointOneMinorRadius,
+                                       pointTwo, pointTwoMajorRadius, majorAxisDirection):
+        return BRepBody()
+
+    @api
+    def booleanOperation(self, targetBody, toolBody, booleanType):
+        return True
+
+
+class BRepCoEdgeDefinitions(ApiCollection):
+    @api
+    def add(self, edgeDefinition, isOpposedToEdge):
+        self._items.append((edgeDefinition, isOpposedToEdge))
+        return ApiObject()
+
+
+class BRepLoopDefinition(ApiObject):
+    def __init__(self):
+        super().__init__()
+        self._coedges = BRepCoEdgeDefinitions()
+
+    @api_property
+    def bRepCoEdgeDefinitions(self):
+        return self._coedges
+
+
+class BRepLoopDefinitions(ApiCollection):
+    @api
+    def add(self):
+        loop = BRepLoopDefinition()
+        self._items.append(loop)
+        return loop
+
+
+class BRepFaceDefinition(ApiObject):
+    def __init__(self):
+        super().__init__()
+        self._loops = BRepLoopDefinitions()
+
+    @api_property
+    def loopDefinitions(self):
+        return self._loops
+
+
+class BRepFaceDefinitions(ApiCollection):
+    @api
+    def add(self, surfaceGeometry, isParamReversed):
+        face = BRepFaceDefinition()
+        self._items.append(face)
+        return face
+
+
+class BRepShellDefinition(ApiObject):
+    def __init__(self):
+        super().__init__()
+        self._faces = BRepFaceDefinitions()
+
+    @api_property
+    def faceDefinitions(self):
+        return self._faces
+
+
+class BRepShellDefinitions(ApiCollection):
+    @api
+    def add(self):
+        shell = BRepShellDefinition()
+        self._items.append(shell)
+        return shell
+
+
+class BRepLumpDefinition(ApiObject):
+    def __init__(self):
+        super().__init__()
+        self._shells = BRepShellDefinitions()
+
+    @api_property
+    def shellDefinitions(self):
+        return self._shells
+
+
+class BRepLumpDefinitions(ApiCollection):
+    @api
+    def add(self):
+        lump = BRepLumpDefinition()
+        self._items.append(lump)
+        return lump
+
+
+class BRepBodyDefinition(ApiObject):
+    doFullHealing = api_attr(True)
+
+    def __init__(self):
+        super().__init__()
+        self._lumps = BRepLumpDefinitions()
+
+    @api_static
+    def create():
+        return BRepBodyDefinition()
+
+    @api_property
+    def lumpDefinitions(self):
+        return self._lumps
+
+    @api
+    def createVertexDefinition(self, position):
+        return ApiObject()
+
+    @api
+    def createEdgeDefinitionByCurve(self, startVertex, endVertex, modelSpaceCurve):
+        return ApiObject()
+
+    @api
+    def createBody(self):
+        return BRepBody()
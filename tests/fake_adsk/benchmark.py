@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark.py - Llamadas a la API de Fusion por generación, sin Fusion 360
+
+Ejecuta HarmonicDriveGenerator.generate y SimpleGear.crear_engranaje_spur
+sobre el adsk falso y muestra cuántas llamadas hace cada configuración y su
+costo estimado, y el tiempo de redibujar la vista previa (HDrivePreview). Los costos por defecto son supuestos; conviene ajustarlos
+con mediciones reales dentro de Fusion.
+
+Uso:
+    python tests/fake_adsk/benchmark.py [--call-cost S] [--compute-cost S]
+                                        [--compute-exponent E] [--log archivo.jsonl]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+FAKE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(FAKE_DIR))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, FAKE_DIR)
+
+import adsk
+from core.calculations import HarmonicDriveParams
+from HDriveGenerator import HDrivePreview, HarmonicDriveGenerator
+from fusion_lib.gears import SimpleGear
+
+# Costo supuesto de una llamada a la API y del recálculo de un sketch por curva (s)
+DEFAULT_CALL_COST = 1e-4
+DEFAULT_COMPUTE_COST = 2e-5
+
+
+def run_generator(params, cost_model, **options):
+    """Genera un Harmonic Drive sobre un diseño vacío y devuelve las métricas"""
+    adsk.reset(cost_model)
+    generator = HarmonicDriveGenerator(params)
+
+    start = time.perf_counter()
+    success = generator.generate(**options)
+    elapsed = time.perf_counter() - start
+
+    if not success:
+        raise RuntimeError(generator.ui.messages[-1])
+    return _metrics(elapsed)
+
+
+def run_simple_gear(num_dientes, cost_model):
+    """Genera un engranaje recto simple y devuelve las métricas"""
+    adsk.reset(cost_model)
+    start = time.perf_counter()
+    SimpleGear().crear_engranaje_spur(num_dientes=num_dientes)
+    return _metrics(time.perf_counter() - start)
+
+
+def run_preview(teeth_cs):
+    """
+    Tiempos (s) de la vista previa: primera, desde la caché y al cambiar
+    los dientes
+    """
+    adsk.reset()
+    params = HarmonicDriveParams(teeth_cs=teeth_cs, module=0.5, pressure_angle=30)
+    other = HarmonicDriveParams(teeth_cs=teeth_cs - 2, module=0.5, pressure_angle=30)
+    preview = HDrivePreview()
+
+    def timed(*args, **options):
+        start = time.perf_counter()
+        preview.update(*args, **options)
+        return time.perf_counter() - start
+
+    first = timed(params, points_per_tooth=50)
+    preview.update(params, tooth_profile='trapezoid')
+    cached = timed(params, points_per_tooth=50)
+    changed = timed(other, points_per_tooth=50)
+    preview.clear()
+    return first, cached, changed
+
+
+def _metrics(elapsed):
+    recorder = adsk.recorder
+    return {
+        'calls': recorder.total_calls,
+        'computes': recorder.counts['Sketch.compute'],
+        'cost': recorder.total_cost,
+        'wall': elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--call-cost', type=float, default=DEFAULT_CALL_COST)
+    parser.add_argument('--compute-cost', type=float, default=DEFAULT_COMPUTE_COST,
+                        help='Costo del recálculo de un sketch por curva')
+    parser.add_argument('--compute-exponent', type=float, default=1.0,
+                        help='Crecimiento del recálculo con las curvas (1 = lineal)')
+    parser.add_argument('--log', help='Guardar el registro de la última corrida')
+    args = parser.parse_args()
+
+    cost_model = adsk.CostModel(
+        default=args.call_cost,
+        per_item={'Sketch.compute': args.compute_cost},
+        exponents={'Sketch.compute': args.compute_exponent}
+    )
+
+    header = f"{'caso':<44}{'llamadas':>10}{'recálculos':>12}{'costo (s)':>11}{'python (s)':>12}"
+    print(header)
+    print('-' * len(header))
+
+    def show(name, metrics):
+        print(f"{name:<44}{metrics['calls']:>10}{metrics['computes']:>12}"
+              f"{metrics['cost']:>11.2f}{metrics['wall']:>12.3f}")
+
+    for teeth_cs in (60, 120, 200, 320):
+        params = HarmonicDriveParams(teeth_cs=teeth_cs, module=0.5, pressure_angle=30)
+        for profile in ('trapezoid', 'involute'):
+            for points_per_tooth in (10, 50):
+                if profile == 'trapezoid' and points_per_tooth != 10:
+                    continue
+                for build_mode in ('parametric', 'direct'):
+                    metrics = run_generator(
+                        params, cost_model,
+                        points_per_tooth=points_per_tooth,
+                        tooth_mode='sketch',
+                        tooth_profile=profile,
+                        build_mode=build_mode
+                    )
+                    show(f"HD {teeth_cs}T {profile} {points_per_tooth}pt {build_mode}", metrics)
+        metrics = run_generator(params, cost_model, tooth_mode='pattern')
+        show(f"HD {teeth_cs}T involute patrón", metrics)
+        for profile in ('trapezoid', 'involute'):
+            metrics = run_generator(params, cost_model, tooth_mode='sharded', tooth_profile=profile)
+            show(f"HD {teeth_cs}T {profile} sectores", metrics)
+        for profile in ('trapezoid', 'involute'):
+            metrics = run_generator(params, cost_model, tooth_mode='dxf', tooth_profile=profile)
+            show(f"HD {teeth_cs}T {profile} DXF", metrics)
+        for lod in ('preview', 'visual', 'manufacturing'):
+            show(f"HD {teeth_cs}T LOD {lod}", run_generator(params, cost_model, lod=lod))
+
+    for num_dientes in (20, 60, 120):
+        show(f"SimpleGear {num_dientes}T", run_simple_gear(num_dientes, cost_model))
+
+    if args.log:
+        adsk.recorder.save(args.log)
+        print(f"\nRegistro guardado en {args.log}")
+
+    print("\nLlamadas más frecuentes de la última corrida:")
+    for call, calls in adsk.recorder.summary(10):
+        print(f"  {call:<40}{calls:>8}")
+
+    print("\nVista previa (ms): primera, caché, cambio de dientes")
+    for teeth_cs in (120, 320):
+        times = run_preview(teeth_cs)
+        print(f"  {teeth_cs}T" + ''.join(f"{seconds * 1000:>10.1f}" for seconds in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+test_batch.py - Tests de la evaluación vectorizada de diseños
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import (
+    HarmonicDriveParams,
+    HarmonicDriveCalculator,
+    MATERIALS,
+    MIN_CONTACT_RATIO,
+    quick_validation
+)
+from core.batch import (
+    evaluate_batch,
+    material_codes,
+    validate_bulk,
+    rank_parameters,
+    ERROR_BITS
+)
+
+
+def test_evaluate_batch_matches_calculator():
+    """Test: el lote coincide con la calculadora diseño a diseño"""
+    print("\n" + "="*60)
+    print("TEST 1: Lote vs Calculadora")
+    print("="*60)
+    
+    rng = np.random.default_rng(7)
+    n = 200
+    teeth_cs = 2 * rng.integers(30, 161, n)
+    module = np.round(rng.uniform(0.3, 5.0, n), 2)
+    pressure_angle = rng.choice([20.0, 25.0, 30.0], n)
+    material = rng.integers(0, len(MATERIALS), n)
+    
+    batch = evaluate_batch(teeth_cs, module, pressure_angle, material)
+    
+    for i in range(n):
+        params = HarmonicDriveParams(
+            teeth_cs=int(teeth_cs[i]),
+            module=float(module[i]),
+            pressure_angle=float(pressure_angle[i]),
+            material=MATERIALS[material[i]]
+        )
+        summary = HarmonicDriveCalculator(params).get_full_summary()
+        cs = summary['circular_spline']
+        fs = summary['flex_spline']
+        wg = summary['wave_generator']
+        analysis = summary['analysis']
+        
+        expected = {
+            'teeth_fs': params.teeth_fs,
+            'eccentricity': params.eccentricity,
+            'cs_outer_diameter': cs['outer_diameter'],
+            'cs_base_diameter': cs['base_diameter'],
+            'fs_inner_diameter': fs['inner_diameter'],
+            'fs_cup_length': fs['cup_length'],
+            'wg_major_diameter': wg['major_diameter'],
+            'wg_minor_diameter': wg['minor_diameter'],
+            'wg_shaft_diameter': wg['shaft_diameter'],
+            'strain': analysis['strain']['strain'],
+            'safety_factor': analysis['strain']['safety_factor'],
+            'contact_ratio': analysis['contact_ratio'],
+            'backlash_radial_nominal': analysis['backlash']['radial_nominal'],
+        }
+        for key, value in expected.items():
+            assert np.isclose(batch[key][i], value), f"{key} no coincide en la fila {i}"
+        
+        assert batch['is_safe'][i] == analysis['strain']['is_safe']
+        assert batch['is_valid'][i] == analysis['is_valid']
+    
+    # Justo en el mínimo de relación de contacto el diseño es válido, igual
+    # que en el lote y en quick_validation
+    class AtLimit(HarmonicDriveCalculator):
+        def calculate_contact_ratio(self):
+            return MIN_CONTACT_RATIO
+    
+    params = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30, material='plastic')
+    assert AtLimit(params).get_full_summary()['analysis']['is_valid']
+    
+    print(f"Diseños comparados: {n}")
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_evaluate_batch_validation_mask():
+    """Test: los diseños inválidos se marcan en vez de lanzar error"""
+    print("\n" + "="*60)
+    print("TEST 2: Máscara de Validación")
+    print("="*60)
+    
+    batch = evaluate_batch(
+        teeth_cs=np.array([100, 101, 50, 400, 100]),
+        module=np.array([1.0, 1.0, 1.0, 1.0, 0.1]),
+        pressure_angle=30,
+        material=['plastic', 'plastic', 'plastic', 'plastic', 'unobtainium']
+    )
+    
+    print(f"params_valid: {batch['params_valid']}")
+    
+    assert batch['params_valid'].tolist() == [True, False, False, False, False]
+    assert not batch['is_valid'][1:].any()
+    assert batch['max_strain'][4] == 0.003, "Material desconocido usa el límite por defecto"
+    assert material_codes(['tpu', 'steel', 'x']).tolist() == [3, 0, -1]
+    
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def test_validate_bulk_matches_quick_validation():
+    """Test: la validación masiva coincide con quick_validation"""
+    print("\n" + "="*60)
+    print("TEST 3: Validación Masiva")
+    print("="*60)
+    
+    teeth_cs = np.array([100, 50, 100, 100, 200, 61, 400, 80, 320])
+    module = np.array([1.0, 1.0, 0.1, 0.5, 0.3, 0.2, 6.0, 0.4, 5.0])
+    material = np.array(['steel', 'steel', 'steel', 'plastic', 'steel',
+                         'tpu', 'aluminum', 'tpu', 'plastic'])
+    
+    # Bloques pequeños para ejercitar el recorrido por bloques
+    result = validate_bulk(teeth_cs, module, material, chunk_size=4)
+    
+    print(f"Errores: {result.errors}")
+    print(f"Advertencias: {result.warnings}")
+    
+    assert result.errors.dtype == np.uint16
+    assert result.warnings.dtype == np.uint8
+    
+    for i in range(len(teeth_cs)):
+        is_valid, messages = quick_validation(int(teeth_cs[i]), float(module[i]), material[i])
+        assert result.is_valid[i] == is_valid, f"Fila {i}: validez distinta"
+        assert result.messages(i) == messages, f"Fila {i}: mensajes distintos"
+    
+    assert result.has_error('teeth_odd').tolist() == [i == 5 for i in range(9)]
+    assert result.has_error('strain')[0], "Acero a 100 dientes excede el strain"
+    
+    # Ángulo de presión por fila
+    per_row = validate_bulk([100, 100], [1.0, 1.0], 'plastic', pressure_angle=[30, 35])
+    assert per_row.errors[1] & ERROR_BITS['pressure_angle_max']
+    assert not per_row.errors[0] & ERROR_BITS['pressure_angle_max']
+    
+    print("\n✅ Test 3 PASADO")
+    return True
+
+
+def test_rank_parameters():
+    """Test de la búsqueda exhaustiva con ranking top-k"""
+    print("\n" + "="*60)
+    print("TEST 4: Ranking de Parámetros")
+    print("="*60)
+    
+    ranked = rank_parameters(80, max_diameter=100, materials=('plastic',), top_k=5)
+    
+    for candidate in ranked:
+        params = candidate['params']
+        print(f"  {params.teeth_cs}T m={params.module} α={params.pressure_angle}° "
+              f"{params.material}: {candidate['score']:.3f}")
+    
+    assert len(ranked) == 5
+    scores = [c['score'] for c in ranked]
+    assert scores == sorted(scores, reverse=True), "Debe estar ordenado por puntuación"
+    
+    for candidate in ranked:
+        params = candidate['params']
+        strain = HarmonicDriveCalculator(params).calculate_strain()
+        assert strain['is_safe'], "Todos los candidatos deben ser seguros"
+        assert params.module * params.teeth_cs <= 100
+        # Mismo mínimo de relación de contacto que quick_validation
+        contact = HarmonicDriveCalculator(params).calculate_contact_ratio()
+        assert contact >= MIN_CONTACT_RATIO, "Relación de contacto bajo el mínimo"
+    
+    # El objetivo 'diameter' puntúa el mismo diámetro primitivo que el filtro
+    for candidate in ranked:
+        params = candidate['params']
+        assert np.isclose(candidate['metrics']['diameter'],
+                          -params.module * params.teeth_cs / 100)
+    
+    # El objetivo cambia el orden: con margen de strain gana el TPU
+    by_margin = rank_parameters(80, materials=('steel', 'plastic', 'tpu'),
+                                objective='strain_margin', top_k=1)
+    assert by_margin[0]['params'].material == 'tpu'
+    
+    # Pesos personalizados: relación de contacto máxima → menor ángulo de presión
+    by_contact = rank_parameters(80, materials=('plastic',),
+                                 objective={'contact_ratio': 1.0}, top_k=1)
+    assert by_contact[0]['params'].pressure_angle == 20.0
+    
+    # Sin candidatos factibles
+    assert rank_parameters(80, max_diameter=5) == []
+    
+    print("\n✅ Test 4 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DE EVALUACIÓN POR LOTES")
+    print("="*60)
+    
+    tests = [
+        ("Lote vs Calculadora", test_evaluate_batch_matches_calculator),
+        ("Máscara de Validación", test_evaluate_batch_validation_mask),
+        ("Validación Masiva", test_validate_bulk_matches_quick_validation),
+        ("Ranking de Parámetros", test_rank_parameters)
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+    
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -7,6 +7,7 @@ Se puede ejecutar independientemente sin Fusion 360
 import sys
 import os
 import math
+from dataclasses import replace
 
 # Agregar el directorio padre al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,7 +16,12 @@ from core.calculations import (
     HarmonicDriveParams, 
     HarmonicDriveCalculator,
     quick_validation,
-    suggest_parameters
+    suggest_parameters,
+    involute_curve,
+    unit_involute,
+    scaled_involute,
+    UNIT_INVOLUTE_CACHE_SIZE,
+    get_calculator
 )
 
 
@@ -351,6 +357,158 @@ def test_full_summary():
     return True
 
 
+def test_involute_kernel():
+    """Test del kernel vectorizado de involuta"""
+    print("\n" + "="*60)
+    print("TEST 12: Kernel Vectorizado de Involuta")
+    print("="*60)
+    
+    base_radius = 43.3
+    t_end = 0.6
+    num_points = 25
+    
+    points = involute_curve(base_radius, 0.0, t_end, num_points)
+    
+    print(f"Forma del array: {points.shape}")
+    print(f"Tipo: {points.dtype}")
+    
+    assert points.shape == (num_points, 2), "Debe devolver un array (n, 2)"
+    assert points.dtype.name == 'float64', "Debe ser float64"
+    
+    # Comparar contra la fórmula escalar punto a punto
+    for i in range(num_points):
+        t = t_end * i / (num_points - 1)
+        x = base_radius * (math.cos(t) + t * math.sin(t))
+        y = base_radius * (math.sin(t) - t * math.cos(t))
+        assert abs(points[i, 0] - x) < 1e-9, "x no coincide con la fórmula escalar"
+        assert abs(points[i, 1] - y) < 1e-9, "y no coincide con la fórmula escalar"
+    
+    # La API de tuplas debe ser un adaptador del array
+    params = HarmonicDriveParams(teeth_cs=100, module=1.0, pressure_angle=30)
+    calc = HarmonicDriveCalculator(params)
+    array = calc.get_involute_profile_array(num_points=10, is_internal=False)
+    tuples = calc.get_involute_profile_points(num_points=10, is_internal=False)
+    
+    assert array.shape == (10, 2)
+    assert tuples == [tuple(p) for p in array.tolist()], "El adaptador debe coincidir"
+    
+    print("\n✅ Test 12 PASADO")
+    return True
+
+
+def test_unit_involute_cache():
+    """Test de la caché de involuta unitaria"""
+    print("\n" + "="*60)
+    print("TEST 13: Caché de Involuta Unitaria")
+    print("="*60)
+    
+    unit_involute.cache_clear()
+    
+    # Dos engranajes con el mismo rango de t y distinto radio base
+    small = scaled_involute(10.0, 0.0, 0.5, 20)
+    large = scaled_involute(25.0, 0.0, 0.5, 20)
+    info = unit_involute.cache_info()
+    
+    print(f"Aciertos: {info.hits}, Fallos: {info.misses}")
+    
+    assert info.misses == 1 and info.hits == 1, "La segunda llamada debe reutilizar la tabla"
+    assert abs(large - involute_curve(25.0, 0.0, 0.5, 20)).max() < 1e-12
+    assert abs(small * 2.5 - large).max() < 1e-12, "La involuta escala con el radio base"
+    
+    # La tabla compartida no se puede modificar por accidente
+    assert not unit_involute(0.0, 0.5, 20).flags.writeable
+    
+    # Tamaño acotado con expulsión LRU
+    for n in range(UNIT_INVOLUTE_CACHE_SIZE + 10):
+        unit_involute(0.0, 1.0, n + 2)
+    assert unit_involute.cache_info().currsize == UNIT_INVOLUTE_CACHE_SIZE
+    
+    unit_involute.cache_clear()
+    
+    print("\n✅ Test 13 PASADO")
+    return True
+
+
+def test_memoized_geometry():
+    """Test de la memoización de geometría derivada"""
+    print("\n" + "="*60)
+    print("TEST 14: Memoización de Geometría")
+    print("="*60)
+    
+    params = HarmonicDriveParams(teeth_cs=100, module=1.0, pressure_angle=30)
+    calc = HarmonicDriveCalculator(params)
+    
+    # Tras el resumen, cada magnitud derivada queda calculada una vez
+    summary = calc.get_full_summary()
+    print(f"Magnitudes en caché: {sorted(calc._cache)}")
+    assert len(calc._cache) == 6
+    assert calc.get_full_summary() == summary
+    
+    # Una copia modificada no debe alterar el valor guardado
+    fs_geo = calc.get_flex_spline_geometry()
+    fs_geo['pitch_diameter'] = -1
+    assert calc.get_flex_spline_geometry()['pitch_diameter'] == 98
+    
+    # Reemplazar los parámetros invalida la caché
+    calc.params = HarmonicDriveParams(teeth_cs=100, module=0.5, pressure_angle=30)
+    assert calc.get_flex_spline_geometry()['pitch_diameter'] == 49
+    assert calc.get_wave_generator_geometry()['eccentricity'] == calc.params.eccentricity
+    
+    # Secciones selectivas
+    summary = calc.get_full_summary(sections=['strain'])
+    print(f"Secciones con ['strain']: {list(summary)} / {list(summary['analysis'])}")
+    assert list(summary) == ['analysis']
+    assert list(summary['analysis']) == ['strain']
+    
+    summary = calc.get_full_summary(sections=['wave_generator'])
+    assert list(summary) == ['wave_generator']
+    
+    try:
+        calc.get_full_summary(sections=['gears'])
+        assert False, "Debe rechazar secciones desconocidas"
+    except ValueError:
+        pass
+    
+    print("\n✅ Test 14 PASADO")
+    return True
+
+
+def test_immutable_params():
+    """Test de parámetros inmutables y calculadoras compartidas"""
+    print("\n" + "="*60)
+    print("TEST 15: Parámetros Inmutables")
+    print("="*60)
+    
+    a = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30, material='plastic')
+    b = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30, material='plastic')
+    
+    assert a == b and hash(a) == hash(b), "Parámetros iguales deben tener el mismo hash"
+    assert not hasattr(a, '__dict__'), "Debe usar __slots__"
+    
+    try:
+        a.module = 1.0
+        assert False, "Los parámetros deben ser inmutables"
+    except AttributeError:
+        pass
+    
+    # La fábrica comparte la calculadora entre parámetros iguales
+    assert get_calculator(a) is get_calculator(b)
+    other = replace(a, module=0.6)
+    assert get_calculator(other) is not get_calculator(a)
+    assert other.eccentricity == (2 * 0.6) / math.pi
+    
+    # replace recalcula los campos derivados
+    larger = replace(a, teeth_cs=200)
+    assert (larger.teeth_fs, larger.ratio) == (198, 100.0)
+    assert larger == HarmonicDriveParams(teeth_cs=200, module=0.5, pressure_angle=30,
+                                         material='plastic')
+    
+    print(f"Calculadoras en caché: {get_calculator.cache_info().currsize}")
+    
+    print("\n✅ Test 15 PASADO")
+    return True
+
+
 def run_all_tests():
     """Ejecuta todos los tests"""
     print("\n" + "="*60)
@@ -368,7 +526,11 @@ def run_all_tests():
         ("Perfil Involuta", test_involute_profile),
         ("Validación Rápida", test_quick_validation),
         ("Sugerencia Parámetros", test_parameter_suggestion),
-        ("Resumen Completo", test_full_summary)
+        ("Resumen Completo", test_full_summary),
+        ("Kernel Involuta", test_involute_kernel),
+        ("Caché Involuta Unitaria", test_unit_involute_cache),
+        ("Memoización Geometría", test_memoized_geometry),
+        ("Parámetros Inmutables", test_immutable_params)
     ]
     
     passed = 0
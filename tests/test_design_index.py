@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+test_design_index.py - Tests del índice precalculado de diseños
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import (
+    MIN_CONTACT_RATIO,
+    HarmonicDriveCalculator,
+    suggest_parameters
+)
+from core.design_index import DesignIndex
+
+
+def test_build_and_query():
+    """Test de construcción y consulta del índice"""
+    print("\n" + "="*60)
+    print("TEST 1: Construcción y Consulta")
+    print("="*60)
+    
+    # Malla gruesa para que el test sea rápido
+    index = DesignIndex.build(module_step=0.1, pressure_angle_step=5.0)
+    print(f"Diseños en el índice: {len(index)}")
+    
+    # Todos los diseños guardados son válidos: strain seguro y relación de
+    # contacto mínima
+    for i in np.linspace(0, len(index) - 1, 50).astype(int):
+        params = index.row(i)['params']
+        assert HarmonicDriveCalculator(params).get_full_summary()['analysis']['is_valid']
+    
+    hits = index.nearest(80, max_outer_diameter=60, material='plastic', k=2)
+    for hit in hits:
+        print(f"  {hit['teeth_cs']}T m={hit['module']} α={hit['pressure_angle']}° "
+              f"Ø{hit['cs_outer_diameter']:.1f}")
+    
+    assert len(hits) == 2
+    assert all(hit['teeth_cs'] == 160 for hit in hits)
+    assert all(hit['cs_outer_diameter'] <= 60 for hit in hits)
+    assert all(hit['material'] == 'plastic' for hit in hits)
+    
+    # Las reducciones imposibles devuelven el vecino más próximo
+    assert index.nearest(500)[0]['teeth_cs'] == 320
+    assert index.nearest(500, max_ratio_error=1.0) == []
+    
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_save_load_and_suggest_backend():
+    """Test de guardado/carga y uso como backend de suggest_parameters"""
+    print("\n" + "="*60)
+    print("TEST 2: Guardado, Carga y Backend")
+    print("="*60)
+    
+    index = DesignIndex.build(module_step=0.1, pressure_angle_step=5.0,
+                              materials=('plastic', 'tpu'))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.npz')
+        index.save(path)
+        loaded = DesignIndex.load(path)
+    
+    assert len(loaded) == len(index)
+    for name in index.columns:
+        assert np.array_equal(loaded.columns[name], index.columns[name])
+    
+    params = suggest_parameters(80, max_diameter=100, material='plastic',
+                                design_index=loaded)
+    print(f"Sugerencia: {params.teeth_cs}T m={params.module}")
+    
+    assert params.teeth_cs == 160
+    assert params.module * params.teeth_cs <= 100
+    # Con 30° la relación de contacto no llega al mínimo: ningún diseño válido
+    assert params.pressure_angle < 30
+    assert HarmonicDriveCalculator(params).get_full_summary()['analysis']['is_valid']
+    assert np.all(loaded.columns['contact_ratio'] >= np.float32(MIN_CONTACT_RATIO))
+    
+    # Mismos dientes que la búsqueda clásica, también con reducción no entera
+    for ratio in (80, 80.5, 97):
+        legacy = suggest_parameters(ratio, max_diameter=100, material='plastic')
+        indexed = suggest_parameters(ratio, max_diameter=100, material='plastic',
+                                     design_index=loaded)
+        assert indexed.teeth_cs == legacy.teeth_cs
+    
+    # Las opciones del llamador llegan al índice
+    assert suggest_parameters(80, max_diameter=100, material='plastic',
+                              design_index=loaded, pressure_angle=20).pressure_angle == 20
+    assert suggest_parameters(400, material='plastic', design_index=loaded) is None
+    relaxed = suggest_parameters(400, material='plastic', design_index=loaded,
+                                 max_ratio_error=None)
+    assert relaxed.teeth_cs == 320
+    
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DEL ÍNDICE DE DISEÑOS")
+    print("="*60)
+    
+    tests = [
+        ("Construcción y Consulta", test_build_and_query),
+        ("Guardado y Backend", test_save_load_and_suggest_backend)
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+    
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
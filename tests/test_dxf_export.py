@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+test_dxf_export.py - Tests de la escritura de contornos como DXF
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import HarmonicDriveParams
+from geometry.dxf_export import DXF_UNITS, dxf_document, write_dxf
+from geometry.involute_profile import get_profile_generator
+
+
+def _group_pairs(text):
+    """Pares (código, valor) de un DXF de texto"""
+    lines = text.splitlines()
+    return [(int(lines[i]), lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+
+def _entities(text):
+    """Unidades y entidades (tipo, {código: [valores]}) del DXF"""
+    pairs = _group_pairs(text)
+    units = next(int(pairs[i + 1][1]) for i, pair in enumerate(pairs) if pair == (9, '$INSUNITS'))
+    start = pairs.index((2, 'ENTITIES'))
+    entities = []
+    for code, value in pairs[start + 1:]:
+        if code == 0:
+            entities.append((value, {}))
+        else:
+            entities[-1][1].setdefault(code, []).append(value)
+    return units, entities
+
+
+def test_dxf_document():
+    """Test del documento DXF de polilíneas y círculos"""
+    print("\n" + "="*60)
+    print("TEST 1: Documento DXF")
+    print("="*60)
+
+    square = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    text = dxf_document([square, square + 2], circles=[(0.0, 0.0, 5.0)], units='mm')
+    units, entities = _entities(text)
+    kinds = [kind for kind, _ in entities]
+    print(f"\nEntidades: {kinds}")
+
+    assert units == DXF_UNITS['mm']
+    assert text.startswith('0\nSECTION\n2\nHEADER\n')
+    assert text.endswith('0\nEOF\n')
+    assert kinds.count('POLYLINE') == 2
+    assert kinds.count('VERTEX') == 8
+    assert kinds.count('SEQEND') == 2
+    assert kinds.count('CIRCLE') == 1
+    assert kinds[-2:] == ['ENDSEC', 'EOF']
+
+    # Polilíneas cerradas con sus vértices en orden
+    polyline = next(groups for kind, groups in entities if kind == 'POLYLINE')
+    assert polyline[70] == ['1']
+    vertices = [groups for kind, groups in entities if kind == 'VERTEX'][:4]
+    assert [(float(v[10][0]), float(v[20][0])) for v in vertices] == [tuple(p) for p in square]
+
+    circle = next(groups for kind, groups in entities if kind == 'CIRCLE')
+    assert float(circle[40][0]) == 5.0
+
+    try:
+        dxf_document([square], units='pulgadas')
+        assert False, "Unidad desconocida aceptada"
+    except ValueError:
+        pass
+
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_write_dxf():
+    """Test del archivo DXF de un anillo de dientes"""
+    print("\n" + "="*60)
+    print("TEST 2: Archivo DXF de Dientes")
+    print("="*60)
+
+    params = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30)
+    polyline = get_profile_generator(params).get_fs_tooth_polyline(20)
+    tooth = np.vstack((polyline['right'], polyline['left']))
+    # Contorno del anillo completo, en cm como lo pide Fusion
+    angles = polyline['tooth_pitch'] * np.arange(params.teeth_fs)
+    ring = np.vstack([
+        tooth @ np.array([[np.cos(a), np.sin(a)], [-np.sin(a), np.cos(a)]]) for a in angles
+    ]) / 10
+    outlines = [ring, ring[:20]]
+
+    for units, scale in (('mm', 10.0), ('cm', 1.0), ('in', 1 / 2.54)):
+        path = write_dxf(outlines, [(0.0, 0.0, 1.0)], units)
+        try:
+            with open(path, encoding='ascii') as stream:
+                code, entities = _entities(stream.read())
+        finally:
+            os.remove(path)
+
+        vertices = [groups for kind, groups in entities if kind == 'VERTEX']
+        first = (float(vertices[0][10][0]), float(vertices[0][20][0]))
+        circle = next(groups for kind, groups in entities if kind == 'CIRCLE')
+        print(f"\n{units}: {len(vertices)} vértices, primer vértice {first}")
+
+        assert code == DXF_UNITS[units]
+        assert sum(kind == 'POLYLINE' for kind, _ in entities) == len(outlines)
+        assert len(vertices) == sum(len(tooth) for tooth in outlines)
+        assert np.allclose(first, outlines[0][0] * scale, atol=1e-5)
+        assert np.isclose(float(circle[40][0]), scale, atol=1e-5)
+
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DE EXPORTACIÓN DXF")
+    print("="*60)
+
+    tests = [
+        ("Documento DXF", test_dxf_document),
+        ("Archivo DXF de Dientes", test_write_dxf)
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,826 @@
+# -*- coding: utf-8 -*-
+"""
+test_fake_adsk.py - Tests de la capa de Fusion sobre el adsk falso
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+
+# Agregar el directorio padre y el adsk falso al path
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(TESTS_DIR, 'fake_adsk'))
+
+from dataclasses import replace
+
+import adsk
+from core.calculations import HarmonicDriveParams, get_calculator
+import HDriveGenerator
+from HDriveGenerator import (
+    HDrivePreview,
+    HarmonicDriveBatch,
+    HarmonicDriveGenerator,
+    NeighbourPrecompute,
+    batch_variants,
+    neighbour_params
+)
+from fusion_lib.gears import SimpleGear
+from geometry.lod import get_tooth_lod
+
+
+def _generate(teeth_cs, **options):
+    """Genera un HD sobre un diseño vacío y devuelve el registro"""
+    adsk.reset(adsk.CostModel(default=1.0, per_item={'Sketch.compute': 0.1}))
+    params = HarmonicDriveParams(teeth_cs=teeth_cs, module=0.5, pressure_angle=30)
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(**options), generator.ui.messages
+    return adsk.recorder
+
+
+def test_generation_modes():
+    """Test de generación en todos los modos"""
+    print("\n" + "="*60)
+    print("TEST 1: Modos de Generación sobre adsk Falso")
+    print("="*60)
+
+    for tooth_mode in ('sketch', 'pattern', 'sharded', 'dxf'):
+        for tooth_profile in ('involute', 'trapezoid'):
+            for build_mode in ('parametric', 'direct'):
+                recorder = _generate(
+                    60, tooth_mode=tooth_mode, tooth_profile=tooth_profile,
+                    build_mode=build_mode
+                )
+                print(f"\n{tooth_mode}/{tooth_profile}/{build_mode}: "
+                      f"{recorder.total_calls} llamadas")
+
+                assert recorder.counts['Occurrences.addNewComponent'] == 3
+                assert recorder.total_calls > 0
+
+    # Con nivel de detalle cada componente elige su representación
+    for lod in ('preview', 'visual', 'manufacturing'):
+        for build_mode in ('parametric', 'direct'):
+            recorder = _generate(320, lod=lod, build_mode=build_mode)
+            print(f"\nLOD {lod}/{build_mode} 320T: {recorder.total_calls} llamadas")
+            assert recorder.counts['Occurrences.addNewComponent'] == 3
+
+    # Sin argumentos se dibujan trapecios; la involuta con splines es opcional
+    default_calls = dict(_generate(60).counts)
+    assert default_calls == dict(_generate(60, tooth_profile='trapezoid').counts)
+    assert default_calls != dict(_generate(60, tooth_profile='involute').counts)
+
+    # La polilínea también corre en todos los modos
+    for tooth_mode in ('sketch', 'pattern', 'sharded', 'dxf'):
+        recorder = _generate(60, tooth_mode=tooth_mode, tooth_profile='polyline')
+        assert recorder.counts['Occurrences.addNewComponent'] == 3
+
+    # El engranaje simple también corre sobre el adsk falso
+    adsk.reset()
+    SimpleGear().crear_engranaje_spur(num_dientes=20)
+    assert adsk.recorder.counts['ExtrudeFeatures.add'] == 1
+
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_call_scaling():
+    """Test de cómo escalan las llamadas con el número de dientes"""
+    print("\n" + "="*60)
+    print("TEST 2: Escalado de Llamadas")
+    print("="*60)
+
+    small = _generate(60, tooth_mode='sketch', tooth_profile='involute')
+    small_calls = small.total_calls
+    small_computes = small.counts['Sketch.compute']
+
+    large = _generate(120, tooth_mode='sketch', tooth_profile='involute')
+    print(f"\nSketch 60T: {small_calls} llamadas, 120T: {large.total_calls}")
+
+    # Con sketch las llamadas crecen con los dientes, pero cada sketch
+    # se recalcula una sola vez gracias al cálculo diferido
+    assert large.total_calls > 1.8 * small_calls
+    assert large.counts['Sketch.compute'] == small_computes
+
+    # Con patrón el costo no depende del número de dientes
+    pattern_small = _generate(60, tooth_mode='pattern').total_calls
+    pattern_large = _generate(320, tooth_mode='pattern').total_calls
+    print(f"Patrón 60T: {pattern_small} llamadas, 320T: {pattern_large}")
+    assert pattern_small == pattern_large
+
+    # Por sectores ningún sketch pasa del presupuesto de entidades, y con un
+    # recálculo de perfiles cuadrático el costo crece de forma lineal
+    quadratic = adsk.CostModel(per_item={'Sketch.compute': 1e-6},
+                               exponents={'Sketch.compute': 2})
+    costs = {}
+    for tooth_mode in ('sketch', 'sharded'):
+        for teeth_cs in (160, 320):
+            recorder = _generate(teeth_cs, tooth_mode=tooth_mode, tooth_profile='trapezoid')
+            costs[tooth_mode, teeth_cs] = adsk.replay(recorder.log, quadratic)['cost']
+            if tooth_mode == 'sharded':
+                largest = max(entry['items'] for entry in recorder.log
+                              if entry['call'] == 'Sketch.compute')
+                assert largest <= HDriveGenerator.SHARD_ENTITY_BUDGET
+    print(f"Recálculo cuadrático 160T/320T: sketch {costs['sketch', 160]:.3f}/"
+          f"{costs['sketch', 320]:.3f}, sectores {costs['sharded', 160]:.3f}/"
+          f"{costs['sharded', 320]:.3f}")
+    assert costs['sharded', 320] < 2.5 * costs['sharded', 160]
+    assert costs['sketch', 320] > 3.5 * costs['sketch', 160]
+
+    # El registro se puede volver a costear con otro modelo
+    recorder = _generate(60, tooth_mode='sketch')
+    same = adsk.replay(recorder.log, recorder.cost_model)
+    assert same['calls'] == recorder.total_calls
+    assert abs(same['cost'] - recorder.total_cost) < 1e-9
+    assert adsk.replay(recorder.log, adsk.CostModel())['cost'] == 0
+
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def _start_job(teeth_cs, cancel_after=None, **options):
+    """Lanza una generación por partes sobre el evento personalizado falso"""
+    adsk.reset()
+    app = adsk.core.Application.get()
+    HDriveGenerator._app = app
+    HDriveGenerator._ui = app.userInterface
+    HDriveGenerator._custom_event = None
+
+    params = HarmonicDriveParams(teeth_cs=teeth_cs, module=0.5, pressure_angle=30)
+    generator = HarmonicDriveGenerator(params)
+    steps = generator.generate_steps(**options)
+    job = HDriveGenerator.start_job(generator, steps, 'listo')
+    job.progress.cancel_after = cancel_after
+    return app, job
+
+
+def test_chunked_generation():
+    """Test de la generación por partes con progreso y cancelación"""
+    print("\n" + "="*60)
+    print("TEST 3: Generación por Partes")
+    print("="*60)
+
+    # Los pasos cubren cada lote de dientes y cada componente
+    adsk.reset()
+    params = HarmonicDriveParams(teeth_cs=120, module=0.5, pressure_angle=30)
+    steps = list(HarmonicDriveGenerator(params).generate_steps(
+        tooth_mode='sketch', tooth_profile='trapezoid', batch_size=25
+    ))
+    done = [step[1] for step in steps]
+    total = steps[-1][2]
+    print(f"\n{len(steps)} pasos, total {total}")
+    assert done == sorted(done) and done[-1] == total
+    assert len(steps) == 5 + 5 + 3
+
+    # Partir el dibujo en lotes no agrega recálculos de sketch
+    chunked_computes = adsk.recorder.counts['Sketch.compute']
+    _generate(120, tooth_mode='sketch', tooth_profile='trapezoid')
+    assert adsk.recorder.counts['Sketch.compute'] == chunked_computes
+
+    # El trabajo completo avanza en eventos personalizados
+    app, job = _start_job(120, tooth_mode='sketch')
+    assert job.running and not app.userInterface.messages
+    adsk.doEvents()
+    print(f"Trabajo: {job.result}, {job.progress.updates} actualizaciones")
+    assert job.result == 'ok' and not job.running
+    assert job.progress.updates > 3
+    assert app.userInterface.messages == ['listo']
+    assert app.activeProduct.rootComponent.occurrences.count == 3
+
+    # Cancelar a medias elimina lo creado
+    app, job = _start_job(120, cancel_after=4, tooth_mode='sketch')
+    adsk.doEvents()
+    print(f"Cancelado: {job.result}")
+    assert job.result == 'cancelled'
+    assert app.activeProduct.rootComponent.occurrences.count == 0
+
+    # Un error en un paso también deshace lo creado
+    app, job = _start_job(60, tooth_mode='sketch', build_mode='desconocido')
+    adsk.doEvents()
+    assert job.result == 'error'
+    assert app.activeProduct.rootComponent.occurrences.count == 0
+
+    # prefetch entrega en orden y relanza los errores del hilo
+    assert list(HDriveGenerator.prefetch(iter(range(50)), depth=3)) == list(range(50))
+
+    def failing():
+        yield 1
+        raise ValueError("lote roto")
+
+    try:
+        list(HDriveGenerator.prefetch(failing()))
+        assert False, "prefetch debía relanzar el error"
+    except ValueError:
+        pass
+
+    print("\n✅ Test 3 PASADO")
+    return True
+
+
+def test_preview():
+    """Test de la vista previa con gráficos personalizados"""
+    print("\n" + "="*60)
+    print("TEST 4: Vista Previa")
+    print("="*60)
+
+    adsk.reset()
+    root = adsk.core.Application.get().activeProduct.rootComponent
+    params = HarmonicDriveParams(teeth_cs=320, module=0.5, pressure_angle=30)
+    preview = HDrivePreview()
+
+    # Primera vista previa: tres grupos, sin componentes ni sketches
+    assert preview.update(params, points_per_tooth=50) == 3
+    assert root.customGraphicsGroups.count == 3
+    assert root.occurrences.count == 0
+    assert adsk.recorder.counts['Sketches.add'] == 0
+
+    # Cambiar el espesor sólo mueve los grupos
+    assert preview.update(params, thickness_mm=30, points_per_tooth=50) == 0
+
+    # Cambiar el perfil redibuja CS y FS; volver atrás sale de la caché
+    assert preview.update(params, thickness_mm=30, tooth_profile='involute') == 2
+    assert preview.update(params, thickness_mm=30, points_per_tooth=50) == 2
+
+    # Nuevos parámetros redibujan todo (los tiempos, en benchmark.py)
+    other = HarmonicDriveParams(teeth_cs=318, module=0.5, pressure_angle=30)
+    assert preview.update(other, points_per_tooth=50) == 3
+    assert root.customGraphicsGroups.count == 3
+    assert root.occurrences.count == 0
+    assert adsk.recorder.counts['Sketches.add'] == 0
+
+    # Si Fusion elimina los gráficos, se vuelven a crear
+    root.customGraphicsGroups.item(0).deleteMe()
+    assert preview.update(other, points_per_tooth=50) == 1
+
+    preview.clear()
+    assert root.customGraphicsGroups.count == 0
+
+    print("\n✅ Test 4 PASADO")
+    return True
+
+
+def test_incremental_regeneration():
+    """Test de la regeneración incremental con parámetros de usuario"""
+    print("\n" + "="*60)
+    print("TEST 5: Regeneración Incremental")
+    print("="*60)
+
+    adsk.reset()
+    design = adsk.core.Application.get().activeProduct
+    occurrences = design.rootComponent.occurrences
+    params = HarmonicDriveParams(teeth_cs=120, module=0.5, pressure_angle=30)
+
+    def regenerate(**options):
+        generator = HarmonicDriveGenerator(params)
+        steps = list(generator.generate_steps(tooth_mode='sketch', **options))
+        return generator, [step[0] for step in steps]
+
+    # Primera generación: tres componentes marcados y cotas con parámetros
+    regenerate(thickness_mm=20)
+    first = [occurrences.item(i) for i in range(occurrences.count)]
+    thickness = design.userParameters.itemByName('HD_thickness')
+    assert len(first) == 3 and thickness.expression == '20.0 mm'
+    assert design.userParameters.itemByName('HD_cup_length').expression == \
+        'HD_cup_base * HD_cup_factor'
+
+    # Cambiar espesor y copa sólo actualiza parámetros, sin sketches nuevos
+    sketches = adsk.recorder.counts['Sketches.add']
+    _, messages = regenerate(thickness_mm=30, cup_factor=1.2)
+    print(f"\nCambio de espesor: {messages}")
+    assert [occurrences.item(i) for i in range(occurrences.count)] == first
+    assert adsk.recorder.counts['Sketches.add'] == sketches
+    assert all(message.endswith('actualizado') for message in messages)
+    assert thickness.expression == '30.0 mm'
+    assert design.userParameters.itemByName('HD_cup_factor').expression == '1.2'
+
+    # Material y tolerancia no cambian la geometría: no se reconstruye nada
+    # (salvo el FS si pasa a TPU, que cambia su apariencia)
+    def regenerate_with(changed, **options):
+        generator = HarmonicDriveGenerator(changed)
+        return [step[0] for step in generator.generate_steps(tooth_mode='sketch', **options)]
+
+    options = dict(thickness_mm=30, cup_factor=1.2)
+    for changed in (replace(params, material='plastic'), replace(params, print_tolerance=0.3)):
+        messages = regenerate_with(changed, **options)
+        assert all(message.endswith('actualizado') for message in messages), messages
+        assert adsk.recorder.counts['Sketches.add'] == sketches
+    messages = regenerate_with(replace(params, material='tpu'), **options)
+    assert [m.endswith('actualizado') for m in messages if not m.startswith('Flex Spline:')] == \
+        [True, False, True]
+
+    # El ángulo de presión cambia los dientes pero no el WG
+    messages = regenerate_with(replace(params, pressure_angle=25), **options)
+    assert messages[0] != 'Circular Spline actualizado'
+    assert messages[-1] == 'Wave Generator actualizado'
+    regenerate(**options)
+    assert first[2] in [occurrences.item(i) for i in range(occurrences.count)]
+
+    # Cambiar el perfil reconstruye CS y FS pero conserva el WG
+    _, messages = regenerate(thickness_mm=30, cup_factor=1.2, tooth_profile='involute')
+    current = [occurrences.item(i) for i in range(occurrences.count)]
+    print(f"Cambio de perfil: {len(messages)} pasos")
+    assert len(current) == 3
+    assert first[2] in current and first[0] not in current and first[1] not in current
+
+    # Deshacer a medias conserva la generación anterior y sus parámetros
+    generator = HarmonicDriveGenerator(params)
+    steps = generator.generate_steps(thickness_mm=40, tooth_mode='sketch')
+    next(steps)
+    steps.close()
+    generator.rollback()
+    assert [occurrences.item(i) for i in range(occurrences.count)] == current
+    assert thickness.expression == '30.0 mm'
+
+    # Deshacer una regeneración completa devuelve a su lugar las
+    # ocurrencias que sólo se movieron
+    z = lambda occurrence: (occurrence.transform.translation or adsk.core.Vector3D.create()).z
+    before = [z(occurrence) for occurrence in current]
+    generator, messages = regenerate(thickness_mm=40, cup_factor=1.2, tooth_profile='involute')
+    assert all(message.endswith('actualizado') for message in messages)
+    assert [z(occurrence) for occurrence in current] != before
+    generator.rollback()
+    assert [z(occurrence) for occurrence in current] == before
+    assert thickness.expression == '30.0 mm'
+
+    # Cada HD tiene su propio prefijo de parámetros: el siguiente está libre
+    assert generator.parameter_prefixes() == {'HD'}
+    assert generator.next_parameter_prefix() == 'HD2'
+    assert generator.next_parameter_prefix(taken={'HD2'}) == 'HD3'
+
+    # Deshacer la primera generación elimina también los parámetros
+    adsk.reset()
+    design = adsk.core.Application.get().activeProduct
+    generator, _ = regenerate()
+    generator.rollback()
+    assert design.rootComponent.occurrences.count == 0
+    assert design.userParameters.itemByName('HD_thickness') is None
+
+    print("\n✅ Test 5 PASADO")
+    return True
+
+
+def _library_design(*drives):
+    """
+    Diseño biblioteca con los HD dados: (params, opciones); las opciones
+    'parameter_prefix' y 'origin' van al generador y el resto a generate.
+    Deja abierta una sesión nueva con un diseño vacío
+    """
+    adsk.reset()
+    design = adsk.core.Application.get().activeProduct
+    for params, options in drives:
+        options = dict(options)
+        generator = HarmonicDriveGenerator(params)
+        generator.parameter_prefix = options.pop('parameter_prefix', generator.parameter_prefix)
+        generator.origin = options.pop('origin', generator.origin)
+        assert generator.generate(tooth_mode='sketch', **options)
+    adsk.reset()
+    return design
+
+
+def test_content_reuse():
+    """Test de la reutilización de componentes idénticos por hash de contenido"""
+    print("\n" + "="*60)
+    print("TEST 6: Reutilización por Hash de Contenido")
+    print("="*60)
+
+    adsk.reset()
+    occurrences = adsk.core.Application.get().activeProduct.rootComponent.occurrences
+    params = HarmonicDriveParams(teeth_cs=120, module=0.5, pressure_angle=30)
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='sketch')
+    first = [occurrences.item(i) for i in range(occurrences.count)]
+
+    # Una copia nueva instancia los tres componentes sin construir nada
+    sketches = adsk.recorder.counts['Sketches.add']
+    steps = list(HarmonicDriveGenerator(params).generate_steps(
+        tooth_mode='sketch', new_copy=True
+    ))
+    print(f"\nCopia: {[step[0] for step in steps]}")
+    assert adsk.recorder.counts['Sketches.add'] == sketches
+    assert occurrences.count == 6
+    copies = [occurrences.item(i) for i in range(3, 6)]
+    assert [o.component for o in copies] == [o.component for o in first]
+
+    # Con otro perfil la copia es otro HD: sus propios parámetros y componentes
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='sketch', tooth_profile='involute', new_copy=True)
+    assert generator.parameter_prefix == 'HD2'
+    assert occurrences.count == 9
+    assert all(occurrences.item(i).component not in [o.component for o in first]
+               for i in range(6, 9))
+    generator.rollback()
+    assert occurrences.count == 6
+
+    # En modo directo no hay parámetros: se reutiliza el Wave Generator igual
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='sketch', build_mode='direct', new_copy=True)
+    wave_generator = occurrences.item(8).component
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='sketch', tooth_profile='involute',
+                              build_mode='direct', new_copy=True)
+    assert occurrences.count == 12
+    assert occurrences.item(11).component is wave_generator
+
+    # Deshacer una copia no elimina los componentes compartidos
+    generator.rollback()
+    assert occurrences.count == 9 and wave_generator.isValid
+
+    # Un diseño vacío inserta el HD idéntico de un documento biblioteca
+    library_design = _library_design((params, {}))
+    app = adsk.core.Application.get()
+    app._open_document('Catálogo HD', library_design)
+    root = app.activeProduct.rootComponent
+    assert HarmonicDriveGenerator(params).generate(
+        tooth_mode='sketch', library=('Catálogo HD',)
+    )
+    print(f"Biblioteca: {adsk.recorder.counts['Occurrences.addByInsert']} inserción")
+    assert root.occurrences.count == 1
+    inserted = root.occurrences.item(0)
+    assert inserted.isReferencedComponent
+    assert adsk.recorder.counts['Sketches.add'] == 0
+
+    # Repetir la generación reconoce el HD insertado y no lo duplica
+    for _ in range(2):
+        assert HarmonicDriveGenerator(params).generate(
+            tooth_mode='sketch', library=('Catálogo HD',)
+        )
+    assert root.occurrences.count == 1 and root.occurrences.item(0) is inserted
+    assert adsk.recorder.counts['Occurrences.addByInsert'] == 1
+
+    # Una copia idéntica instancia el documento ya insertado
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='sketch', new_copy=True)
+    assert root.occurrences.count == 2
+    assert root.occurrences.item(1).component is inserted.component
+    assert adsk.recorder.counts['Occurrences.addByInsert'] == 1
+    generator.rollback()
+
+    # Con otro espesor el documento no coincide: se construye en su lugar
+    assert HarmonicDriveGenerator(params).generate(
+        tooth_mode='sketch', thickness_mm=30, library=('Catálogo HD',)
+    )
+    assert root.occurrences.count == 3 and not inserted.isValid
+    assert adsk.recorder.counts['Sketches.add'] > 0
+
+    # Con otros parámetros también se reconstruye el mismo HD
+    other = HarmonicDriveParams(teeth_cs=118, module=0.5, pressure_angle=30)
+    assert HarmonicDriveGenerator(other).generate(
+        tooth_mode='sketch', library=('Catálogo HD',)
+    )
+    assert root.occurrences.count == 3
+
+    # El hash no depende del prefijo: sirve un documento con el HD en HD2,
+    # y se traslada para dejarlo en el origen aunque allí esté en otro lugar
+    library_design = _library_design((params, {'parameter_prefix': 'HD2', 'origin': (5.0, 0.0)}))
+    app = adsk.core.Application.get()
+    app._open_document('Catálogo HD2', library_design)
+    root = app.activeProduct.rootComponent
+    assert HarmonicDriveGenerator(params).generate(
+        tooth_mode='sketch', library=('Catálogo HD2',)
+    )
+    assert root.occurrences.count == 1
+    assert root.occurrences.item(0).transform.translation.x == -5.0
+
+    # Un documento con más de un HD no se usa: se insertaría entero
+    small = HarmonicDriveParams(teeth_cs=100, module=0.5, pressure_angle=30)
+    library_design = _library_design((params, {}), (small, {'new_copy': True}))
+    app = adsk.core.Application.get()
+    app._open_document('Catálogo mixto', library_design)
+    root = app.activeProduct.rootComponent
+    assert HarmonicDriveGenerator(params).generate(
+        tooth_mode='sketch', library=('Catálogo mixto',)
+    )
+    assert adsk.recorder.counts['Occurrences.addByInsert'] == 0
+    assert root.occurrences.count == 3
+
+    print("\n✅ Test 6 PASADO")
+    return True
+
+
+def test_batch_generation():
+    """Test de la generación de varias variantes en una corrida"""
+    print("\n" + "="*60)
+    print("TEST 7: Generación por Lotes")
+    print("="*60)
+
+    # La cuadrícula de valores no repite variantes
+    variants = batch_variants((20, 30, 31), (0.5,), ('plastic', 'tpu'))
+    assert len(variants) == 6
+    assert len(batch_variants((30, 30), (0.5, 0.5))) == 1
+
+    # En cuadrícula: un HD por variante válida, cada uno con sus parámetros
+    adsk.reset()
+    design = adsk.core.Application.get().activeProduct
+    batch = HarmonicDriveBatch(variants, 'grid', tooth_mode='pattern')
+    steps = list(batch.generate_steps())
+    print(f"\n{batch.report()}")
+    assert [step[1] for step in steps] == sorted(step[1] for step in steps)
+    assert steps[-1][1] == steps[-1][2]
+    assert len(batch.timings) == 4 and len(batch.skipped) == 2
+    assert design.rootComponent.occurrences.count == 12
+    assert design.userParameters.itemByName('HD4_thickness') is not None
+    assert '4 variantes generadas' in batch.report()
+    assert 'teeth_cs mínimo es 60' in batch.report()
+
+    # Una relación de contacto baja no impide generar, pero queda anotada
+    low_contact = HarmonicDriveParams(teeth_cs=60, module=0.3, pressure_angle=30, material='tpu')
+    assert HarmonicDriveBatch([low_contact], 'grid')._validate() == \
+        [(low_contact, 'relación de contacto baja')]
+
+    # Las variantes quedan en celdas distintas de la cuadrícula
+    occurrences = design.rootComponent.occurrences
+    translations = [occurrences.item(i).transform.translation for i in range(0, 12, 3)]
+    origins = {(t.x, t.y) if t else (0.0, 0.0) for t in translations}
+    assert len(origins) == 4
+
+    # Un segundo lote en el mismo diseño no toca los parámetros ni las
+    # celdas del primero
+    thickness = design.userParameters.itemByName('HD_thickness').expression
+    second = HarmonicDriveBatch(variants[2:4], 'grid', tooth_mode='pattern', thickness_mm=30)
+    for _ in second.generate_steps():
+        pass
+    assert [generator.parameter_prefix for generator in second._generators] == ['HD5', 'HD6']
+    assert design.userParameters.itemByName('HD_thickness').expression == thickness
+    assert design.userParameters.itemByName('HD5_thickness').expression == '30.0 mm'
+    assert occurrences.count == 18
+    second_origins = {generator.origin for generator in second._generators}
+    assert min(x for x, _ in second_origins) > max(x for x, _ in origins)
+    second.rollback()
+    assert occurrences.count == 12
+
+    # Deshacer el lote elimina todas las variantes
+    batch.rollback()
+    assert occurrences.count == 0
+
+    # Un documento por variante; deshacer los cierra
+    adsk.reset()
+    app = adsk.core.Application.get()
+    batch = HarmonicDriveBatch(variants[2:4], 'documents', tooth_mode='pattern')
+    for _ in batch.generate_steps():
+        pass
+    assert app.documents.count == 3
+    assert app.activeProduct.rootComponent.occurrences.count == 3
+    assert app.activeProduct.userParameters.itemByName('HD_thickness') is not None
+    batch.rollback()
+    assert app.documents.count == 1
+
+    print("\n✅ Test 7 PASADO")
+    return True
+
+
+def _ring_sketch(units):
+    """Sketch del CS importado por DXF con la unidad de diseño dada"""
+    adsk.reset()
+    adsk.core.Application.get().activeProduct.unitsManager.defaultLengthUnits = units
+    params = HarmonicDriveParams(teeth_cs=60, module=0.5, pressure_angle=30)
+    generator = HarmonicDriveGenerator(params)
+    assert generator.generate(tooth_mode='dxf', tooth_profile='trapezoid')
+    return generator.root.occurrences.item(0).component.sketches.item(0)
+
+
+def test_dxf_import():
+    """Test de los dientes importados desde un DXF"""
+    print("\n" + "="*60)
+    print("TEST 8: Importación DXF")
+    print("="*60)
+
+    # Una importación por anillo, sin importar el número de dientes
+    sketch_calls = _generate(160, tooth_mode='sketch', tooth_profile='trapezoid').total_calls
+    small = _generate(160, tooth_mode='dxf', tooth_profile='trapezoid')
+    large = _generate(320, tooth_mode='dxf', tooth_profile='trapezoid')
+    print(f"\nSketch 160T: {sketch_calls} llamadas, DXF 160T: {small.total_calls}, "
+          f"DXF 320T: {large.total_calls}")
+
+    assert small.total_calls == large.total_calls
+    assert large.counts['ImportManager.importToTarget'] == 2
+    assert large.counts['SketchLines.addByTwoPoints'] == 0
+    assert small.total_calls * 10 < sketch_calls
+
+    # Cada sketch importado se recalcula una vez con todas sus curvas
+    computes = [entry['items'] for entry in large.log if entry['call'] == 'Sketch.compute']
+    assert max(computes) == 4 * 320 + 1
+
+    # El DXF se escribe en la unidad del diseño: la geometría es la misma
+    reference = _ring_sketch('mm')
+    for units in ('cm', 'in'):
+        sketch = _ring_sketch(units)
+        assert sketch.profiles.item(1).profileLoops.count == 2
+        for curve, expected in zip(sketch._curves, reference._curves):
+            if curve._radius is not None:
+                assert abs(curve._radius - expected._radius) < 1e-5
+            else:
+                assert all(abs(a - b) < 1e-5 for a, b in zip(curve._start._xyz, expected._start._xyz))
+
+    print("\n✅ Test 8 PASADO")
+    return True
+
+
+def test_neighbour_precompute():
+    """Test del precálculo especulativo de los valores vecinos del diálogo"""
+    print("\n" + "="*60)
+    print("TEST 9: Precálculo de Valores Vecinos")
+    print("="*60)
+
+    params = HarmonicDriveParams(teeth_cs=194, module=0.6, pressure_angle=25,
+                                 material='plastic')
+    neighbours = neighbour_params(params)
+    values = [(n.teeth_cs // 2, n.module) for n in neighbours]
+    print(f"\nVecinos de 97:1 m0.6: {values}")
+
+    # Relaciones ±1..±5 y los módulos estándar de al lado, de cerca a lejos
+    assert values[:4] == [(98, 0.6), (96, 0.6), (97, 0.8), (97, 0.5)]
+    assert sorted(r for r, m in values if m == 0.6) == [92, 93, 94, 95, 96, 98, 99, 100, 101, 102]
+    assert all(n.pressure_angle == 25 and n.material == 'plastic' for n in neighbours)
+
+    # Los límites de los spinners recortan los vecinos
+    edge = neighbour_params(HarmonicDriveParams(teeth_cs=316, module=2.0, pressure_angle=30))
+    assert [(n.teeth_cs // 2, n.module) for n in edge][:4] == [
+        (159, 2.0), (157, 2.0), (158, 1.5), (160, 2.0)
+    ]
+    assert len(edge) == 8
+
+    # El hilo llena las cachés: el siguiente clic sólo encuentra aciertos
+    precompute = NeighbourPrecompute(delay=0)
+    precompute.schedule(params, {'points_per_tooth': 50, 'lod': 'manufacturing'})
+    assert precompute.wait(60)
+    assert precompute.computed == len(neighbours)
+
+    summary = HDriveGenerator._dialog_summary
+    for neighbour in neighbours:
+        hits = summary.cache_info().hits
+        assert 'Dientes CS' in summary(neighbour)
+        assert summary.cache_info().hits == hits + 1
+
+        hits = get_tooth_lod.cache_info().hits
+        get_tooth_lod(neighbour, 'cs', 'manufacturing')
+        assert get_tooth_lod.cache_info().hits == hits + 1
+
+    # Un cambio antes de que pase la espera descarta el trabajo anterior
+    precompute.delay = 5.0
+    precompute.schedule(HarmonicDriveParams(teeth_cs=120, module=1.25, pressure_angle=20),
+                        {'lod': 'visual'})
+    precompute.cancel()
+    assert precompute.wait(1)
+    assert precompute.computed == len(neighbours)
+
+    precompute.stop()
+    assert precompute._worker is None
+
+    print("\n✅ Test 9 PASADO")
+    return True
+
+
+def test_appearances():
+    """Test de las apariencias de los cuerpos y de sus fallos"""
+    print("\n" + "="*60)
+    print("TEST 10: Apariencias")
+    print("="*60)
+
+    # Las apariencias se copian de la biblioteca y quedan en el diseño
+    _generate(60)
+    app = adsk.core.Application.get()
+    appearances = app.activeProduct.appearances
+    names = [appearances.item(i).name for i in range(appearances.count)]
+    print(f"\nApariencias del diseño: {names}")
+    assert 'Steel' in names
+    assert 'Aluminum_Red' in names
+    assert not app._log
+
+    # Sin biblioteca la generación termina, pero el fallo queda registrado
+    adsk.reset()
+    app = adsk.core.Application.get()
+    app._libraries = adsk.core.MaterialLibraries([])
+    generator = HarmonicDriveGenerator(
+        HarmonicDriveParams(teeth_cs=60, module=0.5, pressure_angle=30)
+    )
+    assert generator.generate(), generator.ui.messages
+    print(f"Avisos: {generator.warnings}")
+    assert generator.warnings
+    assert app._log == generator.warnings
+    assert app.activeProduct.appearances.count == 0
+
+    print("\n✅ Test 10 PASADO")
+    return True
+
+
+def test_drive_copies():
+    """Test de copias de HD distintos en el mismo diseño"""
+    print("\n" + "="*60)
+    print("TEST 11: Copias de HD Distintos")
+    print("="*60)
+
+    adsk.reset()
+    design = adsk.core.Application.get().activeProduct
+    occurrences = design.rootComponent.occurrences
+    parameters = design.userParameters
+    small = HarmonicDriveParams(teeth_cs=120, module=0.5, pressure_angle=30)
+    large = HarmonicDriveParams(teeth_cs=200, module=1.0, pressure_angle=30)
+    x = lambda occurrence: (occurrence.transform.translation or adsk.core.Vector3D.create()).x
+
+    assert HarmonicDriveGenerator(small).generate(tooth_mode='sketch')
+    cup_base = parameters.itemByName('HD_cup_base').expression
+    wg_height = parameters.itemByName('HD_wg_height').expression
+
+    # La copia de otro HD no cambia los parámetros del primero y queda al lado
+    generator = HarmonicDriveGenerator(large)
+    assert generator.generate(tooth_mode='sketch', new_copy=True)
+    copies = [occurrences.item(i) for i in range(3, 6)]
+    print(f"\nCopia {generator.parameter_prefix} en x = {generator.origin[0]:.2f} cm")
+    assert generator.parameter_prefix == 'HD2'
+    assert parameters.itemByName('HD_cup_base').expression == cup_base
+    assert parameters.itemByName('HD_wg_height').expression == wg_height
+    assert parameters.itemByName('HD2_cup_base') is not None
+
+    small_radius = get_calculator(small).get_circular_spline_geometry()['outer_diameter'] / 20
+    large_radius = get_calculator(large).get_circular_spline_geometry()['outer_diameter'] / 20
+    assert all(x(occurrence) - large_radius > small_radius for occurrence in copies)
+
+    # Una copia idéntica comparte prefijo y componentes, en otro lugar
+    generator = HarmonicDriveGenerator(small)
+    assert generator.generate(tooth_mode='sketch', new_copy=True)
+    twins = [occurrences.item(i) for i in range(6, 9)]
+    assert generator.parameter_prefix == 'HD'
+    assert [o.component for o in twins] == [occurrences.item(i).component for i in range(3)]
+    assert all(x(twin) > x(copy) for twin, copy in zip(twins, copies))
+
+    # El hash no depende del prefijo: la copia idéntica del HD2 es del HD2
+    generator = HarmonicDriveGenerator(large)
+    sketches = adsk.recorder.counts['Sketches.add']
+    assert generator.generate(tooth_mode='sketch', new_copy=True)
+    assert generator.parameter_prefix == 'HD2'
+    assert adsk.recorder.counts['Sketches.add'] == sketches
+    assert occurrences.item(9).component is copies[0].component
+    generator.rollback()
+    assert occurrences.count == 9
+
+    # Regenerar el HD reemplaza todas sus ocurrencias, copias incluidas:
+    # CS y FS nuevos en los dos lugares, el WG sin cambios se conserva
+    originals = [occurrences.item(i) for i in range(3)]
+    generator = HarmonicDriveGenerator(small)
+    assert generator.generate(tooth_mode='sketch', tooth_profile='involute')
+    current = [occurrences.item(i) for i in range(occurrences.count)]
+    print(f"Tras regenerar: {len(current)} ocurrencias")
+    assert len(current) == 9
+    assert all(occurrence in current for occurrence in copies)
+    assert originals[2] in current and twins[2] in current
+    stale = originals[:2] + twins[:2]
+    assert not any(occurrence in current for occurrence in stale)
+    rebuilt = current[-4:]
+    assert sorted(x(occurrence) for occurrence in rebuilt) == [0.0, 0.0, x(twins[0]), x(twins[0])]
+    assert rebuilt[0].component is rebuilt[1].component
+    assert rebuilt[0].component is not originals[0].component
+
+    # Deshacer la regeneración devuelve las ocurrencias reemplazadas
+    parameters_before = parameters.itemByName('HD_thickness').expression
+    generator = HarmonicDriveGenerator(small)
+    steps = generator.generate_steps(tooth_mode='sketch', tooth_profile='trapezoid')
+    next(steps)
+    steps.close()
+    generator.rollback()
+    assert [occurrences.item(i) for i in range(occurrences.count)] == current
+    assert parameters.itemByName('HD_thickness').expression == parameters_before
+
+    print("\n✅ Test 11 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS SOBRE ADSK FALSO")
+    print("="*60)
+
+    tests = [
+        ("Modos de Generación", test_generation_modes),
+        ("Escalado de Llamadas", test_call_scaling),
+        ("Generación por Partes", test_chunked_generation),
+        ("Vista Previa", test_preview),
+        ("Regeneración Incremental", test_incremental_regeneration),
+        ("Reutilización por Hash", test_content_reuse),
+        ("Generación por Lotes", test_batch_generation),
+        ("Importación DXF", test_dxf_import),
+        ("Precálculo de Valores Vecinos", test_neighbour_precompute),
+        ("Apariencias", test_appearances),
+        ("Copias de HD Distintos", test_drive_copies)
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+test_involute.py - Tests del generador de perfil involuta
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+import math
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import HarmonicDriveParams
+from geometry.involute_profile import (
+    InvoluteGearProfile,
+    HarmonicDriveInvoluteProfile,
+    VirtualGearProfile,
+    get_profile_generator
+)
+
+
+def _reference_gear_profile(profile, is_internal):
+    """Replicación escalar original (diente a diente, punto a punto)"""
+    single_tooth = profile.get_single_tooth_profile()
+    tooth_pitch = 2 * math.pi / profile.teeth
+    
+    all_teeth = []
+    for i in range(profile.teeth):
+        angle = i * tooth_pitch
+        tooth_points = []
+        for x, y in single_tooth:
+            if is_internal:
+                r = math.sqrt(x**2 + y**2)
+                r_inverted = 2 * profile.pitch_radius - r
+                angle_point = math.atan2(y, x)
+                x = r_inverted * math.cos(angle_point)
+                y = r_inverted * math.sin(angle_point)
+            x_rot = x * math.cos(angle) - y * math.sin(angle)
+            y_rot = x * math.sin(angle) + y * math.cos(angle)
+            tooth_points.append((x_rot, y_rot))
+        all_teeth.append(tooth_points)
+    
+    return all_teeth
+
+
+def test_gear_array():
+    """Test de la replicación vectorizada de dientes"""
+    print("\n" + "="*60)
+    print("TEST 1: Replicación Vectorizada de Dientes")
+    print("="*60)
+    
+    for is_internal in (False, True):
+        profile = InvoluteGearProfile(module=0.5, teeth=160, pressure_angle=30)
+        gear = profile.get_gear_array(is_internal=is_internal)
+        reference = np.array(_reference_gear_profile(profile, is_internal))
+        
+        print(f"\n{'Interno' if is_internal else 'Externo'}:")
+        print(f"  Forma: {gear.shape}")
+        print(f"  Error máximo: {np.abs(gear - reference).max():.2e}")
+        
+        assert gear.shape == reference.shape, "La forma debe ser (dientes, puntos, 2)"
+        assert gear.flags['C_CONTIGUOUS'], "El array debe ser contiguo"
+        assert np.allclose(gear, reference, atol=1e-9), "Debe coincidir con la versión escalar"
+    
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_harmonic_drive_profile_arrays():
+    """Test de los perfiles CS/FS como arrays"""
+    print("\n" + "="*60)
+    print("TEST 2: Perfiles CS/FS como Arrays")
+    print("="*60)
+    
+    params = HarmonicDriveParams(teeth_cs=320, module=0.3, pressure_angle=30)
+    hd_profile = HarmonicDriveInvoluteProfile(params)
+    
+    cs = hd_profile.get_cs_profile_array()
+    fs = hd_profile.get_fs_profile_array()
+    
+    print(f"CS: {cs.shape}")
+    print(f"FS: {fs.shape}")
+    
+    assert cs.shape[0] == params.teeth_cs
+    assert fs.shape[0] == params.teeth_fs
+    
+    # Los dientes del CS apuntan hacia adentro: su punta queda bajo el primitivo
+    cs_radii = np.hypot(cs[..., 0], cs[..., 1])
+    fs_radii = np.hypot(fs[..., 0], fs[..., 1])
+    pitch_cs = hd_profile.cs_profile.pitch_radius
+    pitch_fs = hd_profile.fs_profile.pitch_radius
+    
+    assert cs_radii.min() < pitch_cs < cs_radii.max()
+    assert fs_radii.min() < pitch_fs < fs_radii.max()
+    
+    # Parámetros iguales comparten el generador
+    same = HarmonicDriveParams(teeth_cs=320, module=0.3, pressure_angle=30)
+    assert get_profile_generator(params) is get_profile_generator(same)
+    
+    # Otro material comparte los perfiles; el FS coincide con el CS de 318
+    other_material = HarmonicDriveParams(teeth_cs=320, module=0.3, pressure_angle=30,
+                                         material='tpu')
+    smaller = HarmonicDriveParams(teeth_cs=318, module=0.3, pressure_angle=30)
+    assert get_profile_generator(other_material).cs_profile is hd_profile.cs_profile
+    assert get_profile_generator(smaller).cs_profile is hd_profile.fs_profile
+    
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def test_virtual_gear_profile():
+    """Test del engranaje virtual (dientes bajo demanda)"""
+    print("\n" + "="*60)
+    print("TEST 3: Engranaje Virtual")
+    print("="*60)
+    
+    profile = InvoluteGearProfile(module=0.5, teeth=160, pressure_angle=30)
+    gear = profile.get_gear_profile(is_internal=True)
+    full = profile.get_gear_array(is_internal=True)
+    
+    print(f"Dientes: {len(gear)}")
+    print(f"Puntos por diente: {gear.points_per_tooth}")
+    
+    assert isinstance(gear, VirtualGearProfile)
+    assert len(gear) == 160
+    
+    # Indexado, índices negativos y slices
+    assert np.allclose(gear.tooth_array(7), full[7])
+    assert np.allclose(gear.tooth_array(-1), full[-1])
+    assert np.allclose(np.array(gear[3]), full[3])
+    assert np.allclose(gear.teeth_array(slice(10, 20, 3)), full[10:20:3])
+    assert len(gear[150:]) == 10
+    
+    # Streaming diente a diente y por lotes
+    streamed = np.array(list(gear.iter_arrays()))
+    batched = np.concatenate(list(gear.iter_arrays(batch_size=64)))
+    assert np.allclose(streamed, full)
+    assert np.allclose(batched, full)
+    
+    try:
+        gear.tooth_array(160)
+        assert False, "Debe lanzar IndexError"
+    except IndexError:
+        pass
+    
+    print("\n✅ Test 3 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DE PERFIL INVOLUTA")
+    print("="*60)
+    
+    tests = [
+        ("Replicación Vectorizada", test_gear_array),
+        ("Perfiles CS/FS Array", test_harmonic_drive_profile_arrays),
+        ("Engranaje Virtual", test_virtual_gear_profile)
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+    
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
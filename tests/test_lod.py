@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+test_lod.py - Tests del nivel de detalle automático de los dientes
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import HarmonicDriveParams
+from geometry.involute_profile import get_profile_generator
+from geometry.lod import (
+    LOD_TARGETS,
+    REPRESENTATIONS,
+    chord_tolerance,
+    get_tooth_lod,
+    lod_summary
+)
+
+
+def test_lod_selection():
+    """Test de la elección de representación por objetivo"""
+    print("\n" + "="*60)
+    print("TEST 1: Elección de Nivel de Detalle")
+    print("="*60)
+
+    for teeth_cs, module in ((60, 0.5), (160, 0.5), (320, 0.5), (60, 2.0)):
+        params = HarmonicDriveParams(teeth_cs=teeth_cs, module=module, pressure_angle=30)
+        summary = lod_summary(params)
+
+        for part in ('cs', 'fs'):
+            costs = []
+            for target in LOD_TARGETS:
+                lod = summary[target][part]
+                print(f"\n{teeth_cs}T m{module} {part} {target}: {lod.representation} "
+                      f"({lod.points_per_tooth} pt, error {lod.error:.5f} mm, "
+                      f"tolerancia {lod.tolerance:.4f} mm)")
+
+                assert lod.representation in REPRESENTATIONS
+                assert lod.error <= lod.tolerance
+                costs.append(lod.entities_per_tooth)
+
+            # Un objetivo más exigente nunca usa una representación más barata
+            assert costs == sorted(costs)
+
+        # Fabricación cumple la tolerancia del ajuste de flancos
+        assert summary['manufacturing']['cs'].tolerance == chord_tolerance('manufacturing', 1)
+
+    # Con muchos dientes pequeños la vista previa se queda en círculos
+    params = HarmonicDriveParams(teeth_cs=320, module=0.5, pressure_angle=30)
+    assert get_tooth_lod(params, 'fs', 'preview').representation == 'circle'
+
+    # Cada nivel se calcula una sola vez
+    assert get_tooth_lod(params, 'fs', 'visual') is get_tooth_lod(params, 'fs', 'visual')
+
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_tooth_polyline():
+    """Test de los flancos en polilínea"""
+    print("\n" + "="*60)
+    print("TEST 2: Flancos en Polilínea")
+    print("="*60)
+
+    params = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30)
+    profile_gen = get_profile_generator(params)
+
+    for is_internal in (True, False):
+        profile = profile_gen.cs_profile if is_internal else profile_gen.fs_profile
+        splines = profile.get_tooth_splines(is_internal, 20)
+        polyline = profile.get_tooth_polyline(is_internal, 20)
+
+        # Mismo diente que las splines: los extremos coinciden
+        assert np.allclose(polyline['right'][0], splines['right'].start_point)
+        assert np.allclose(polyline['right'][-1], splines['right'].end_point)
+        assert np.allclose(polyline['left'][0], splines['left'].start_point)
+        assert np.allclose(polyline['left'][-1], splines['left'].end_point)
+        assert len(polyline['right']) == 10
+        assert not polyline['right'].flags.writeable
+
+        # Con 2 puntos por flanco es un trapecio sobre la involuta
+        assert len(profile.get_tooth_polyline(is_internal, 4)['right']) == 2
+
+    # Los flancos quedan en caché
+    assert profile_gen.get_fs_tooth_splines(20)['right'] is profile_gen.get_fs_tooth_splines(20)['right']
+
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DE NIVEL DE DETALLE")
+    print("="*60)
+
+    tests = [
+        ("Elección de Nivel de Detalle", test_lod_selection),
+        ("Flancos en Polilínea", test_tooth_polyline)
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()
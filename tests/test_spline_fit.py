@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+test_spline_fit.py - Tests del ajuste de flancos y elipses NURBS
+Se puede ejecutar independientemente sin Fusion 360
+"""
+
+import sys
+import os
+import math
+
+import numpy as np
+
+# Agregar el directorio padre al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculations import HarmonicDriveParams
+from geometry.involute_profile import get_profile_generator
+from geometry.spline_fit import FLANK_FIT_TOLERANCE, ellipse_nurbs, fit_bspline
+
+
+def _max_distance(points, curve, samples=4000):
+    """Distancia máxima de los puntos a una curva muestreada densamente"""
+    dense = curve.evaluate(np.linspace(curve.knots[0], curve.knots[-1], samples))
+    diff = points[:, np.newaxis, :] - dense[np.newaxis, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1]).min(axis=1).max()
+
+
+def test_flank_fit():
+    """Test del ajuste de flancos de involuta"""
+    print("\n" + "="*60)
+    print("TEST 1: Ajuste de Flancos")
+    print("="*60)
+
+    params = HarmonicDriveParams(teeth_cs=160, module=0.5, pressure_angle=30)
+    profile_gen = get_profile_generator(params)
+    profile = profile_gen.fs_profile
+
+    for num_points in (10, 20, 50):
+        splines = profile_gen.get_fs_tooth_splines(num_points)
+        right = splines['right']
+
+        # La involuta exacta (densa) queda dentro de la tolerancia
+        exact = profile.get_involute_array(profile.root_radius, profile.outside_radius, 500)
+        shift = -profile.involute_function(profile.pressure_angle_rad)
+        c, s = math.cos(shift), math.sin(shift)
+        exact = exact @ np.array([[c, s], [-s, c]])
+        deviation = _max_distance(exact, right)
+
+        print(f"\n{num_points} puntos/diente: {len(right.control_points)} puntos de control, "
+              f"desviación {deviation * 1000:.2f} µm")
+
+        assert len(right.control_points) <= num_points // 2
+        assert right.max_error <= FLANK_FIT_TOLERANCE
+        assert deviation <= 5 * FLANK_FIT_TOLERANCE
+
+        # Extremos exactos en raíz y punta
+        assert math.isclose(np.hypot(*right.start_point), splines['root_radius'])
+        assert math.isclose(np.hypot(*right.end_point), splines['tip_radius'])
+
+        # El flanco izquierdo es el reflejo y los dientes no se cruzan
+        left = splines['left']
+        assert math.isclose(np.hypot(*left.start_point), splines['tip_radius'])
+        right_tip = math.atan2(right.end_point[1], right.end_point[0])
+        left_tip = math.atan2(left.start_point[1], left.start_point[0])
+        left_root = math.atan2(left.end_point[1], left.end_point[0])
+        right_root = math.atan2(right.start_point[1], right.start_point[0])
+        assert right_tip < left_tip
+        assert left_root < right_root + splines['tooth_pitch']
+
+    # Engranaje interno: la punta queda dentro y la raíz fuera
+    cs = profile_gen.get_cs_tooth_splines(20)
+    assert cs['tip_radius'] < profile_gen.cs_profile.pitch_radius < cs['root_radius']
+
+    # Con tantos puntos de control como puntos la curva interpola
+    points = np.random.default_rng(0).random((6, 2))
+    curve = fit_bspline(points, tolerance=0.0)
+    assert curve.max_error < 1e-9
+
+    print("\n✅ Test 1 PASADO")
+    return True
+
+
+def test_ellipse_nurbs():
+    """Test de la elipse NURBS exacta"""
+    print("\n" + "="*60)
+    print("TEST 2: Elipse NURBS Exacta")
+    print("="*60)
+
+    curve = ellipse_nurbs(3.0, 2.0)
+    points = curve.evaluate(np.linspace(0, 1, 361))
+    error = np.abs((points[:, 0] / 3.0) ** 2 + (points[:, 1] / 2.0) ** 2 - 1).max()
+
+    print(f"\nPuntos de control: {len(curve.control_points)}")
+    print(f"Error de la ecuación implícita: {error:.2e}")
+
+    assert len(curve.control_points) == 9
+    assert error < 1e-12
+    assert np.allclose(points[0], points[-1])
+
+    # Las transformaciones rígidas conservan la curva
+    rotated = curve.rotated(math.pi / 2).evaluate(np.linspace(0, 1, 50))
+    assert np.allclose((rotated[:, 0] / 2.0) ** 2 + (rotated[:, 1] / 3.0) ** 2, 1)
+    reversed_points = curve.reversed().evaluate(np.linspace(0, 1, 50))
+    assert np.allclose(reversed_points, curve.evaluate(np.linspace(1, 0, 50)))
+
+    print("\n✅ Test 2 PASADO")
+    return True
+
+
+def run_all_tests():
+    """Ejecuta todos los tests"""
+    print("\n" + "="*60)
+    print("EJECUTANDO TESTS DEL AJUSTE DE SPLINES")
+    print("="*60)
+
+    tests = [
+        ("Ajuste de Flancos", test_flank_fit),
+        ("Elipse NURBS Exacta", test_ellipse_nurbs)
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            if result:
+                passed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR en {name}: {str(e)}")
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"✅ Pasados: {passed}")
+    print(f"❌ Fallados: {failed}")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    run_all_tests()